@@ -1,3 +1,6 @@
+import hashlib
+import os
+
 from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives.asymmetric import rsa
 
@@ -6,13 +9,24 @@ private_key = rsa.generate_private_key(
     key_size=4096,
 )
 
-with open("private.pem", "wb") as f:
+with open("private.pem.tmp", "wb") as f:
     f.write(private_key.private_bytes(
         encoding=serialization.Encoding.PEM,
         format=serialization.PrivateFormat.TraditionalOpenSSL,
         encryption_algorithm=serialization.NoEncryption()
     ))
 
+# Rotación: private.pem se renombra a private.prev.pem y el servidor la sigue
+# aceptando durante RSA_KEY_ROTATION_WINDOW, sin reiniciar gunicorn. El renombre
+# se hace con un enlace y dos os.replace (atómicos) para que private.pem nunca
+# falte mientras el servidor lo está leyendo.
+if os.path.exists("private.pem"):
+    if os.path.exists("private.prev.pem.tmp"):
+        os.remove("private.prev.pem.tmp")
+    os.link("private.pem", "private.prev.pem.tmp")
+    os.replace("private.prev.pem.tmp", "private.prev.pem")
+os.replace("private.pem.tmp", "private.pem")
+
 public_key = private_key.public_key()
 with open("public.pem", "wb") as f:
     f.write(public_key.public_bytes(
@@ -20,4 +34,14 @@ with open("public.pem", "wb") as f:
         format=serialization.PublicFormat.SubjectPublicKeyInfo
     ))
 
+key_id = hashlib.sha256(public_key.public_bytes(
+    encoding=serialization.Encoding.DER,
+    format=serialization.PublicFormat.SubjectPublicKeyInfo
+)).hexdigest()[:16]
+
 print("¡Listo! Claves generadas: private.pem y public.pem")
+print(f"Key id (kid): {key_id}")
+print(
+    "El frontend toma la clave pública y el kid vigentes de las props de Inertia "
+    "(encryption_key); la clave incluida en el bundle solo se usa si faltan."
+)
@@ -46,6 +46,16 @@ else
     pnpm run build
 
     cd /app/plataforma
+
+    # Primer arranque con SQLITE_PATH (volumen db_data): si la base aún no
+    # existe en el volumen se copia la de la ubicación anterior
+    LEGACY_DB=/app/plataforma/config/db.sqlite3
+    if [ -n "$SQLITE_PATH" ] && [ ! -f "$SQLITE_PATH" ] && [ -f "$LEGACY_DB" ]; then
+        echo "Copying $LEGACY_DB to $SQLITE_PATH..."
+        mkdir -p "$(dirname "$SQLITE_PATH")"
+        cp "$LEGACY_DB" "$SQLITE_PATH"
+    fi
+
     python manage.py makemigrations --settings=config.settings.prod
     python manage.py migrate --settings=config.settings.prod
     python manage.py collectstatic --noinput --clear --settings=config.settings.prod
@@ -0,0 +1,237 @@
+import base64
+import hashlib
+import os
+import threading
+import time
+from types import MappingProxyType
+
+from django.conf import settings
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import padding
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.backends import default_backend
+
+
+# =============================================================================
+# Keyring RSA: se carga una vez por worker y se recarga al rotar claves
+# =============================================================================
+OAEP_PADDING = padding.OAEP(
+    mgf=padding.MGF1(algorithm=hashes.SHA256()),
+    algorithm=hashes.SHA256(),
+    label=None,
+)
+
+
+class UnknownKeyError(ValueError):
+    """El payload fue cifrado con una clave que el servidor ya no acepta."""
+
+
+def compute_key_id(public_key):
+    """
+    Identificador corto de una clave: primeros 16 hex del SHA-256 del
+    SubjectPublicKeyInfo (DER). El frontend calcula el mismo valor.
+    """
+    der = public_key.public_bytes(
+        encoding=serialization.Encoding.DER,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo,
+    )
+    return hashlib.sha256(der).hexdigest()[:16]
+
+
+def _read_private_key(path):
+    with open(path, "rb") as key_file:
+        return serialization.load_pem_private_key(
+            key_file.read(),
+            password=None,
+            backend=default_backend(),
+        )
+
+
+class PrivateKeyRing:
+    """
+    Mantiene en memoria la clave privada actual y, durante la ventana de
+    rotación, la anterior. El mtime de los archivos se revisa como máximo
+    cada `stat_interval` segundos para no tocar disco en cada petición.
+
+    Las claves y el kid actual se publican juntos como una sola tupla
+    inmutable (`_snapshot`); cada lectura toma la tupla una vez, así una
+    recarga concurrente nunca deja ver claves de una versión y kid de otra.
+    """
+
+    def __init__(self, current_path, previous_path, rotation_window, stat_interval):
+        self.current_path = str(current_path)
+        self.previous_path = str(previous_path)
+        self.rotation_window = rotation_window
+        self.stat_interval = stat_interval
+
+        self._lock = threading.Lock()
+        self._snapshot = (MappingProxyType({}), None)
+        self._public_info = None
+        self._signature = None
+        self._next_stat = 0.0
+
+    @staticmethod
+    def _mtime(path):
+        try:
+            return os.stat(path).st_mtime
+        except FileNotFoundError:
+            return None
+
+    def _load(self, signature):
+        current_mtime, previous_mtime = signature
+        if current_mtime is None:
+            raise FileNotFoundError(self.current_path)
+
+        old_keys, old_kid = self._snapshot
+        current_key = _read_private_key(self.current_path)
+        current_kid = compute_key_id(current_key.public_key())
+        keys = {current_kid: current_key}
+
+        # La clave anterior solo se acepta mientras dure la ventana de rotación,
+        # contada desde que se escribió la clave actual.
+        rotation_open = time.time() - current_mtime < self.rotation_window
+        if previous_mtime is not None and rotation_open:
+            previous_key = _read_private_key(self.previous_path)
+            keys.setdefault(compute_key_id(previous_key.public_key()), previous_key)
+        elif old_kid and old_kid != current_kid and rotation_open:
+            # Rotación sin archivo .prev: conservar la clave que ya teníamos.
+            keys.setdefault(old_kid, old_keys[old_kid])
+
+        self._snapshot = (MappingProxyType(keys), current_kid)
+        self._signature = signature
+
+    def _refresh(self):
+        """Retorna el snapshot (claves, kid actual) vigente."""
+        now = time.monotonic()
+        snapshot = self._snapshot
+        if now < self._next_stat and snapshot[0]:
+            return snapshot
+
+        with self._lock:
+            if not (now < self._next_stat and self._snapshot[0]):
+                signature = (self._mtime(self.current_path), self._mtime(self.previous_path))
+                if signature != self._signature or self._rotation_expired(signature):
+                    self._load(signature)
+                self._next_stat = now + self.stat_interval
+            return self._snapshot
+
+    def _rotation_expired(self, signature):
+        current_mtime = signature[0]
+        return (
+            len(self._snapshot[0]) > 1
+            and current_mtime is not None
+            and time.time() - current_mtime >= self.rotation_window
+        )
+
+    @property
+    def current_kid(self):
+        return self._refresh()[1]
+
+    def current_key(self):
+        keys, current_kid = self._refresh()
+        return keys[current_kid]
+
+    def public_key_info(self):
+        """{"kid", "spki"} de la clave actual (SPKI DER en base64) para el frontend."""
+        keys, current_kid = self._refresh()
+        info = self._public_info
+        if info is None or info["kid"] != current_kid:
+            der = keys[current_kid].public_key().public_bytes(
+                encoding=serialization.Encoding.DER,
+                format=serialization.PublicFormat.SubjectPublicKeyInfo,
+            )
+            info = {"kid": current_kid, "spki": base64.b64encode(der).decode()}
+            self._public_info = info
+        return info
+
+    def candidates(self, kid=None):
+        """
+        Claves a probar para descifrar. Con `kid` se devuelve solo la clave
+        indicada; sin él (clientes antiguos) la actual primero y luego la anterior.
+        """
+        keys, current_kid = self._refresh()
+        if kid:
+            if kid not in keys:
+                raise UnknownKeyError(f"Clave desconocida: {kid}")
+            return [keys[kid]]
+        current = keys[current_kid]
+        return [current] + [k for k in keys.values() if k is not current]
+
+    def decrypt(self, encrypted_bytes, kid=None):
+        last_error = None
+        for private_key in self.candidates(kid):
+            try:
+                return private_key.decrypt(encrypted_bytes, OAEP_PADDING)
+            except ValueError as e:
+                last_error = e
+        raise last_error
+
+
+_keyring = None
+_keyring_lock = threading.Lock()
+
+
+def get_keyring():
+    global _keyring
+    if _keyring is None:
+        with _keyring_lock:
+            if _keyring is None:
+                _keyring = PrivateKeyRing(
+                    current_path=settings.RSA_PRIVATE_KEY_PATH,
+                    previous_path=settings.RSA_PREVIOUS_PRIVATE_KEY_PATH,
+                    rotation_window=settings.RSA_KEY_ROTATION_WINDOW,
+                    stat_interval=settings.RSA_KEYRING_STAT_INTERVAL,
+                )
+    return _keyring
+
+
+# =============================================================================
+# Modo híbrido: clave AES-GCM por sesión envuelta con RSA
+# =============================================================================
+SESSION_PAYLOAD_ENC = "A256GCM"
+SESSION_PAYLOAD_KEY = "payload_key"
+
+
+def _wrapped_key_ref(wrapped_b64):
+    return hashlib.sha256(wrapped_b64.encode("ascii")).hexdigest()[:32]
+
+
+def get_session_payload_key(request, wrapped_b64, kid=None):
+    """
+    Devuelve la clave AES de la sesión. El cliente envía siempre la clave
+    envuelta con RSA, pero solo se desenvuelve (operación RSA) la primera vez
+    que aparece en la sesión; después basta comparar su huella.
+    """
+    ref = _wrapped_key_ref(wrapped_b64)
+    stored = request.session.get(SESSION_PAYLOAD_KEY)
+    if stored and stored.get("ref") == ref:
+        return base64.b64decode(stored["key"])
+
+    key = get_keyring().decrypt(base64.b64decode(wrapped_b64), kid=kid)
+    if len(key) != 32:
+        raise ValueError("Invalid session key length")
+
+    request.session[SESSION_PAYLOAD_KEY] = {
+        "ref": ref,
+        "key": base64.b64encode(key).decode("ascii"),
+    }
+    return key
+
+
+def decrypt_session_payload(request, body):
+    """
+    Descifra un payload en modo híbrido:
+    {"enc": "A256GCM", "ek": <clave AES envuelta>, "iv": <nonce>, "payload": <cifrado+tag>}
+    """
+    wrapped_b64 = body.get("ek")
+    iv_b64 = body.get("iv")
+    if not wrapped_b64 or not iv_b64:
+        raise ValueError("Missing session key or iv")
+
+    key = get_session_payload_key(request, wrapped_b64, kid=body.get("kid"))
+    return AESGCM(key).decrypt(
+        base64.b64decode(iv_b64),
+        base64.b64decode(body["payload"]),
+        None,
+    )
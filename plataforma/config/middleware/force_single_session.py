@@ -1,5 +1,5 @@
 from django.contrib.auth import logout
-from users_app.models import SessionUser
+from users_app.services.session_service import SessionService
 
 
 def force_single_session(get_response):
@@ -8,14 +8,13 @@ def force_single_session(get_response):
         if user and user.is_authenticated:
             current_session_id = request.session.get("session_user_id")
 
-            latest_session = (
-                SessionUser.objects.filter(user=user).order_by("-login_time").first()
-            )
+            # Memoria del worker -> cache -> BD (solo si el cache no la tiene)
+            latest_session_id = SessionService.get_latest_session_id(user.pk)
 
-            if not current_session_id or not latest_session:
+            if not current_session_id or not latest_session_id:
                 return get_response(request)
 
-            if str(latest_session.id) != current_session_id:
+            if latest_session_id != current_session_id:
                 logout(request)
 
         return get_response(request)
@@ -1,6 +1,8 @@
 from django.conf import settings
 from inertia import share
 
+from config.crypto import get_keyring
+
 
 def inertia_share(get_response):
     def middleware(request):
@@ -32,6 +34,8 @@ def inertia_share(get_response):
                 "role": role_data,
             },
             errors=lambda: request.session.pop("errors", {}),
+            # Clave pública RSA vigente (cambia al rotar con clavegen.py)
+            encryption_key=lambda: get_keyring().public_key_info(),
         )
 
         return get_response(request)
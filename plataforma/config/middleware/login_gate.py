@@ -0,0 +1,54 @@
+import logging
+
+from django.conf import settings
+from django.http import HttpResponse
+
+from config.ratelimit import rate_limiter
+from config.utils import get_client_ip
+
+logger = logging.getLogger(__name__)
+
+
+def login_gate(get_response):
+    """
+    Filtro previo para las rutas de autenticación anónimas (login, registro,
+    2FA). Corta con un 429 barato los flujos abusivos por IP y por subred antes
+    de cargar la sesión, descifrar RSA, llamar a hCaptcha o hashear contraseñas,
+    y rechaza cuerpos más grandes que LOGIN_GATE_MAX_BODY sin leerlos. Un POST
+    sin Content-Length (p.ej. Transfer-Encoding: chunked) no se puede acotar
+    de antemano y se rechaza con 411; los formularios siempre lo envían.
+    Las tasas son las políticas "login_gate" de RATE_LIMIT_POLICIES.
+    """
+
+    gated_paths = frozenset(settings.LOGIN_GATE_PATHS)
+    max_body = settings.LOGIN_GATE_MAX_BODY
+
+    def middleware(request):
+        if request.method != "POST" or request.path not in gated_paths:
+            return get_response(request)
+
+        raw_length = request.META.get("CONTENT_LENGTH")
+        if not raw_length:
+            return HttpResponse("Falta la cabecera Content-Length.", status=411)
+        try:
+            content_length = int(raw_length)
+        except ValueError:
+            content_length = max_body + 1
+        if content_length > max_body:
+            return HttpResponse("Solicitud demasiado grande.", status=413)
+
+        result = rate_limiter.check("login_gate", request)
+        if result.limited:
+            logger.warning(
+                f"Login gate: {get_client_ip(request)} bloqueada en {request.path} "
+                f"(política {result.policy.name})"
+            )
+            response = HttpResponse(
+                "Demasiados intentos. Intenta nuevamente más tarde.", status=429
+            )
+            response["Retry-After"] = str(result.retry_after)
+            return response
+
+        return get_response(request)
+
+    return middleware
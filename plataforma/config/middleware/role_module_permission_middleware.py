@@ -1,140 +1,68 @@
 from django.shortcuts import redirect
-from django.urls import resolve
 
-def role_module_permission_middleware(get_response):
-    """
-    Middleware que valida permisos basados en roles y acciones CRUD
-    """
-    
-    # Rutas públicas que no requieren autenticación ni permisos
-    PUBLIC_ROUTES = [
-        
-        # Auth Routes
-        'index',
-        'login',
-        'register',
-        'check_email',
-        'verify_code',
-        'resend_code',
-        'login_2fa',
-        'verify_2fa',
-        'resend_2fa',
-    ]
-    
-    # Rutas accesibles para usuarios autenticados sin restricción de rol
-    AUTHENTICATED_ROUTES = [        
-        # Profile & Dashboard
-        'dashboard',
-        'profile_index',
-        'profile_update',
-        'profile_change_password',
-        'profile_delete_account',
-        'logout',
-    ]
-    
-    # Módulos accesibles por todos los usuarios autenticados
-    GLOBAL_MODULES = {
-        "dashboard", "profile"
-    }
-    
-    # Mapeo de acciones a permisos
-    ACTION_MAP = {
-        "index": "can_read",
-        "show": "can_read",
-        "store": "can_create",
-        "create": "can_create",
-        "update": "can_update",
-        "edit": "can_update",
-        "destroy": "can_delete",
-        "delete": "can_delete",
-    }
-    
-    # Roles permitidos por módulo (solo para rutas restringidas)
-    MODULE_ROLES = {
-        "users_admin": ["ADMIN"],
-        "roles_admin": ["ADMIN"],
-        "customers_seller": ["ADMIN"], # Restricted to ADMIN as per safety default. Can add CLIENTE if needed later.
-    }
-
-    def middleware(request):
-        # Resolver la ruta actual
-        try:
-            resolver_match = resolve(request.path)
-        except Exception:
-            return get_response(request)
-            
-        if not resolver_match:
-            return get_response(request)
+from config.permissions import (
+    AUTHENTICATED,
+    MODULE,
+    PUBLIC,
+    UNRESTRICTED,
+    classify_route,
+    compile_permission_table,
+)
+from users_app.services.role_registry import RoleRegistry
 
-        view_name = resolver_match.url_name
-        if not view_name:
-            return get_response(request)
 
-        # Permitir acceso a rutas públicas sin restricciones
-        if view_name in PUBLIC_ROUTES:
-            return get_response(request)
+class RoleModulePermissionMiddleware:
+    """
+    Middleware que valida permisos basados en roles y acciones CRUD.
 
-        # Si no está autenticado y no es ruta pública, redirigir a login o dejar que AuthMiddleware maneje
-        if not request.user.is_authenticated:
-            # Si quiere acceder a una ruta protegida y no está logueado, usualmente el login_required lo maneja
-            # Pero podemos forzarlo aquí si queremos
-            return get_response(request)
+    La tabla url_name -> permiso se compila una sola vez al cargar el
+    middleware; en cada petición se consulta en O(1) con el resolver_match
+    que Django ya calculó, sin volver a resolver la ruta.
+    """
 
-        # Permitir acceso a rutas autenticadas sin verificar rol
-        if view_name in AUTHENTICATED_ROUTES:
-            return get_response(request)
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.table = compile_permission_table()
 
-        # Separar el nombre de la vista: "users_admin_show" → ["users", "admin", "show"]
-        # Estrategia: Buscar la acción al final
-        parts = view_name.split("_")
+    def __call__(self, request):
+        return self.get_response(request)
 
-        # Identificar la acción (create, index, update, etc.)
-        action = None
-        # Recorremos en reverso para encontrar la última coincidencia con una acción conocida
-        for part in reversed(parts):
-            if part in ACTION_MAP:
-                action = part
-                break
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        resolver_match = request.resolver_match
+        view_name = resolver_match.url_name if resolver_match else None
+        if not view_name:
+            return None
 
-        # Si no hay acción reconocida, permitir (puede ser una ruta personalizada - fallback seguro o inseguro?)
-        # Referencia dice "permitir".
-        if not action:
-            return get_response(request)
+        route = self.table.get(view_name)
+        if route is None:
+            route = self.table.setdefault(view_name, classify_route(view_name))
 
-        # Extraer el nombre del módulo
-        # module_name será todo lo que está antes de la acción.
-        # Ejemplo: "users_admin_show" -> action="show", module="users_admin"
-        try:
-            action_index = len(parts) - 1 - parts[::-1].index(action) # Find last index of action
-            module_parts = parts[:action_index]
-            module_name = "_".join(module_parts)
-        except ValueError:
-             return get_response(request)
+        # Permitir acceso a rutas públicas y personalizadas sin restricciones
+        if route.kind in (PUBLIC, UNRESTRICTED):
+            return None
 
-        if not module_name:
-            return get_response(request)
+        # Si no está autenticado, login_required de la vista lo maneja
+        if not request.user.is_authenticated:
+            return None
 
-        # Si es un módulo global, permitir acceso
-        if module_name in GLOBAL_MODULES:
-            return get_response(request)
+        # Rutas autenticadas y módulos globales: sin verificar rol
+        if route.kind == AUTHENTICATED:
+            return None
 
-        # Obtener el rol del usuario
-        user_role = getattr(request.user, "current_role", None)
-        
         # Superusuarios tienen acceso total
         if request.user.is_superuser:
-            return get_response(request)
-        
-        # Si no tiene rol asignado, redirigir al dashboard
-        if not user_role:
-            return redirect("dashboard")
+            return None
 
-        # Verificar si el rol tiene acceso al módulo
-        allowed_roles = MODULE_ROLES.get(module_name, [])
-        if user_role.name not in allowed_roles:
-             # Opcional: Loggear intento de acceso no autorizado
+        # Obtener el rol del usuario (solo el id, sin cargar el Role);
+        # sin rol, redirigir al dashboard
+        role_id = getattr(request.user, "current_role_id", None)
+        if not role_id:
             return redirect("dashboard")
 
-        return get_response(request)
+        # Verificar en la matriz rol x módulo x acción (en memoria, sin BD)
+        if route.kind == MODULE and not RoleRegistry.has_permission(
+            role_id, route.module, route.permission
+        ):
+            return redirect("dashboard")
 
-    return middleware
+        return None
@@ -0,0 +1,128 @@
+from collections import namedtuple
+
+from django.urls import URLPattern, URLResolver, get_resolver
+
+
+# =============================================================================
+# Tabla de permisos por ruta, compilada una vez desde el URLconf
+# =============================================================================
+
+# Rutas públicas que no requieren autenticación ni permisos
+PUBLIC_ROUTES = frozenset([
+    # Auth Routes
+    "index",
+    "login",
+    "register",
+    "check_email",
+    "verify_code",
+    "resend_code",
+    "login_2fa",
+    "verify_2fa",
+    "resend_2fa",
+])
+
+# Rutas accesibles para usuarios autenticados sin restricción de rol
+AUTHENTICATED_ROUTES = frozenset([
+    # Profile & Dashboard
+    "dashboard",
+    "profile_index",
+    "profile_update",
+    "profile_change_password",
+    "profile_delete_account",
+    "logout",
+])
+
+# Módulos accesibles por todos los usuarios autenticados
+GLOBAL_MODULES = frozenset(["dashboard", "profile"])
+
+# Mapeo de acciones a permisos
+ACTION_MAP = {
+    "index": "can_read",
+    "show": "can_read",
+    "store": "can_create",
+    "create": "can_create",
+    "update": "can_update",
+    "edit": "can_update",
+    "destroy": "can_delete",
+    "delete": "can_delete",
+    "autocomplete": "can_read",
+}
+
+# Roles con acceso completo por defecto a cada módulo restringido. Solo se usa
+# para sembrar RolePermission (seed_prod); los permisos vigentes están en BD
+# y se consultan con users_app.services.role_registry.RoleRegistry.
+DEFAULT_MODULE_ROLES = {
+    "users_admin": ["ADMIN"],
+    "roles_admin": ["ADMIN"],
+    "customers_seller": ["ADMIN"], # Restricted to ADMIN as per safety default. Can add CLIENTE if needed later.
+}
+
+# Tipos de ruta
+PUBLIC = "public"
+AUTHENTICATED = "authenticated"
+MODULE = "module"
+UNRESTRICTED = "unrestricted"
+
+RoutePermission = namedtuple(
+    "RoutePermission", ["url_name", "kind", "module", "action", "permission"]
+)
+
+
+def classify_route(url_name):
+    """
+    Clasifica un url_name. Las rutas de módulo se nombran
+    "<modulo>_<accion>", p.ej. "users_admin_show" -> ("users_admin", "show").
+    """
+    if url_name in PUBLIC_ROUTES:
+        return RoutePermission(url_name, PUBLIC, None, None, None)
+    if url_name in AUTHENTICATED_ROUTES:
+        return RoutePermission(url_name, AUTHENTICATED, None, None, None)
+
+    parts = url_name.split("_")
+
+    # Última parte que coincide con una acción conocida
+    action_index = None
+    for index in range(len(parts) - 1, -1, -1):
+        if parts[index] in ACTION_MAP:
+            action_index = index
+            break
+
+    # Sin acción reconocida (ruta personalizada) o sin módulo: se permite
+    if action_index is None:
+        return RoutePermission(url_name, UNRESTRICTED, None, None, None)
+
+    action = parts[action_index]
+    module_name = "_".join(parts[:action_index])
+    if not module_name:
+        return RoutePermission(url_name, UNRESTRICTED, None, None, None)
+
+    if module_name in GLOBAL_MODULES:
+        return RoutePermission(url_name, AUTHENTICATED, module_name, action, None)
+
+    return RoutePermission(
+        url_name,
+        MODULE,
+        module_name,
+        action,
+        ACTION_MAP[action],
+    )
+
+
+def iter_url_names(patterns):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from iter_url_names(pattern.url_patterns)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            yield pattern.name
+
+
+def get_restricted_modules(urlconf=None):
+    """Módulos con permisos por rol, en orden alfabético."""
+    table = compile_permission_table(urlconf)
+    return sorted({route.module for route in table.values() if route.kind == MODULE})
+
+
+def compile_permission_table(urlconf=None):
+    """Devuelve {url_name: RoutePermission} para todas las rutas con nombre."""
+    resolver = get_resolver(urlconf)
+    return {name: classify_route(name) for name in iter_url_names(resolver.url_patterns)}
@@ -0,0 +1,131 @@
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+from config.utils import get_client_ip, get_client_subnet, get_redis_connection_or_none
+
+
+# =============================================================================
+# Motor de rate limit: ventanas fijas con INCR atómico, una sola ida y vuelta
+# =============================================================================
+UNITS = {"s": 1, "m": 60, "h": 60 * 60, "d": 24 * 60 * 60}
+
+RateLimitPolicy = namedtuple(
+    "RateLimitPolicy", ["name", "limit", "window", "scope", "strikes"]
+)
+RateLimitResult = namedtuple("RateLimitResult", ["limited", "policy", "retry_after"])
+
+NOT_LIMITED = RateLimitResult(False, None, None)
+
+
+def parse_rate(rate):
+    """
+    Convierte "7/m", "1/s" o "1/3s" en (límite, ventana en segundos).
+    Mismo formato que django_ratelimit.
+    """
+    count, period = rate.split("/")
+    multiplier = period[:-1]
+    window = UNITS[period[-1]] * (int(multiplier) if multiplier else 1)
+    return int(count), window
+
+
+def build_policy(config):
+    limit, window = parse_rate(config["rate"])
+    return RateLimitPolicy(
+        name=config["name"],
+        limit=limit + config.get("burst", 0),
+        window=window,
+        scope=config.get("scope", "user"),
+        strikes=config.get("strikes"),
+    )
+
+
+class RateLimiter:
+    """
+    Evalúa todas las políticas de un módulo (RATE_LIMIT_POLICIES) en una sola
+    llamada. Con Redis se usa un pipeline (SET NX EX + INCR por política); con
+    LocMem, add + incr del cache, que son atómicos dentro del proceso.
+    """
+
+    def __init__(self):
+        self._policies = {}
+
+    def get_policies(self, module_name):
+        policies = self._policies.get(module_name)
+        if policies is None:
+            configured = settings.RATE_LIMIT_POLICIES
+            configs = configured.get(module_name, configured["default"])
+            policies = [build_policy(config) for config in configs]
+            self._policies[module_name] = policies
+        return policies
+
+    @staticmethod
+    def _identity(scope, request):
+        if scope == "user":
+            user = getattr(request, "user", None)
+            if user is not None and user.is_authenticated:
+                return f"user:{user.pk}"
+            scope = "ip"
+        if scope == "subnet":
+            subnet = get_client_subnet(get_client_ip(request))
+            return f"net:{subnet}" if subnet else None
+        ip = get_client_ip(request)
+        return f"ip:{ip}" if ip else None
+
+    def _increment(self, keys):
+        client = get_redis_connection_or_none()
+        if client is not None:
+            pipe = client.pipeline(transaction=False)
+            for key, window in keys:
+                raw_key = cache.make_key(key)
+                pipe.set(raw_key, 0, ex=window, nx=True)
+                pipe.incr(raw_key)
+            return pipe.execute()[1::2]
+
+        counts = []
+        for key, window in keys:
+            cache.add(key, 0, timeout=window)
+            try:
+                counts.append(cache.incr(key))
+            except ValueError:
+                # La clave expiró entre add e incr: empieza una ventana nueva
+                cache.add(key, 1, timeout=window)
+                counts.append(1)
+        return counts
+
+    def check(self, module_name, request):
+        now = time.time()
+        policies = []
+        keys = []
+        for policy in self.get_policies(module_name):
+            identity = self._identity(policy.scope, request)
+            if identity is None:
+                continue
+            bucket = int(now // policy.window)
+            policies.append(policy)
+            keys.append((f"rl:{module_name}:{policy.name}:{identity}:{bucket}", policy.window))
+
+        if not keys:
+            return NOT_LIMITED
+
+        for policy, count in zip(policies, self._increment(keys)):
+            if count > policy.limit:
+                retry_after = int(policy.window - (now % policy.window)) + 1
+                return RateLimitResult(True, policy, retry_after)
+        return NOT_LIMITED
+
+    @staticmethod
+    def add_strike(module_name, policy, identity):
+        """Cuenta cuántas veces se excedió una política en el último minuto."""
+        key = f"rl:strikes:{module_name}:{policy.name}:{identity}"
+        cache.add(key, 0, timeout=60)
+        try:
+            return cache.incr(key)
+        except ValueError:
+            cache.add(key, 1, timeout=60)
+            return 1
+
+
+rate_limiter = RateLimiter()
@@ -60,6 +60,7 @@ SILENCED_SYSTEM_CHECKS = ["django_ratelimit.E003", "django_ratelimit.W001"]
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "config.middleware.login_gate.login_gate",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -70,7 +71,7 @@ MIDDLEWARE = [
     "inertia.middleware.InertiaMiddleware",
     "config.middleware.inertia_share.inertia_share",
     "config.middleware.force_single_session.force_single_session",
-    "config.middleware.role_module_permission_middleware.role_module_permission_middleware",
+    "config.middleware.role_module_permission_middleware.RoleModulePermissionMiddleware",
 ]
 
 CORS_ALLOWED_ORIGINS = [
@@ -130,6 +131,9 @@ AUTH_PASSWORD_VALIDATORS = [
 
 # CUSTOM USER MODEL
 AUTH_USER_MODEL = "users_app.User"
+# Carga request.user desde una copia en cache (o una sola consulta con su rol)
+AUTHENTICATION_BACKENDS = ["users_app.backends.SnapshotModelBackend"]
+USER_SNAPSHOT_TIMEOUT = 60 * 30
 USERNAME_FIELD = "email"
 REQUIRED_FIELDS = ["username"]
 # Internationalization
@@ -164,8 +168,17 @@ INERTIA_VERSION = "1.0"
 INERTIA_SSR_ENABLED = False
 INERTIA_SSR_URL = "http://localhost:13714"
 
+# Segundos entre revisiones de la versión de roles/permisos (RoleRegistry)
+ROLE_REGISTRY_CHECK_INTERVAL = 1
+
 # Duración de la sesión en segundos (3 horas)
 SESSION_COOKIE_AGE = 10800
+# Sesiones leídas desde el cache (escritura también en BD)
+SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+
+# Segundos que cada worker recuerda en memoria la última sesión de un usuario
+# (force_single_session) antes de volver a consultar el cache
+SESSION_VALIDITY_LOCAL_TTL = 5
 
 # Aumentar el timeout para peticiones
 DATA_UPLOAD_MAX_MEMORY_SIZE = 52428800  # 50MB
@@ -182,9 +195,43 @@ HCAPTCHA_SECRET = get_secret("HCAPTCHA_SECRET")
 HCAPTCHA_PROXIES = {
     "http": "http://127.0.0.1:8000",
 }
-HCAPTCHA_TIMEOUT = 5
+# Presupuesto de latencia de la verificación (segundos): lectura y conexión
+HCAPTCHA_TIMEOUT = 3
+HCAPTCHA_CONNECT_TIMEOUT = 1
 HCAPTCHA_JS_API_URL = "https://hcaptcha.com/1/api.js"
-HCAPTCHA_VERIFY_URL = "https://hcaptcha.com/siteverify"
+# Para pruebas de carga: HCAPTCHA_VERIFY_URL=http://127.0.0.1:8001/siteverify
+# con `python manage.py fake_hcaptcha`
+HCAPTCHA_VERIFY_URL = get_secret("HCAPTCHA_VERIFY_URL", default="https://hcaptcha.com/siteverify")
+# Circuit breaker: errores seguidos antes de abrir y segundos hasta reintentar
+HCAPTCHA_CIRCUIT_FAILURES = 5
+HCAPTCHA_CIRCUIT_RESET = 30
+HCAPTCHA_POOL_SIZE = 10
+
+
+# RSA KEYRING
+# Rotación: clavegen.py renombra private.pem a private.prev.pem al instalar la
+# nueva; la anterior se acepta durante RSA_KEY_ROTATION_WINDOW segundos. La clave
+# pública vigente y su kid llegan al frontend en la prop compartida
+# "encryption_key", así un bundle compilado antes de rotar sigue funcionando.
+RSA_PRIVATE_KEY_PATH = BASE_APP / "private.pem"
+RSA_PREVIOUS_PRIVATE_KEY_PATH = BASE_APP / "private.prev.pem"
+RSA_KEY_ROTATION_WINDOW = 60 * 60
+RSA_KEYRING_STAT_INTERVAL = 2
+
+
+# LOGIN GATE
+# Filtro previo por IP y subred para las rutas de autenticación anónimas.
+# Sus tasas son las políticas "login_gate" de RATE_LIMIT_POLICIES.
+CLIENT_IP_HEADER = None
+LOGIN_GATE_PATHS = [
+    "/login/",
+    "/register/",
+    "/verify-2fa/",
+    "/resend-2fa/",
+    "/verify-code/",
+    "/resend-code/",
+]
+LOGIN_GATE_MAX_BODY = 16 * 1024  # 16KB
 
 
 # RATELIMIT
@@ -192,6 +239,22 @@ RATELIMIT_USE_CACHE = "default"
 RATELIMIT_ENABLE = True
 RATELIMIT_SKIP_CHECKS = True
 
+# Políticas por módulo para config.ratelimit (protected_post, login_gate).
+# rate: "N/periodo" (s, m, h, d; p.ej. "1/3s"), burst: extra permitido sobre
+# rate, scope: user | ip | subnet, strikes: excesos en un minuto antes de
+# desactivar al usuario. Los módulos sin entrada usan "default".
+RATE_LIMIT_POLICIES = {
+    "default": [
+        {"name": "second", "rate": "1/s", "scope": "user", "strikes": 2},
+        {"name": "short", "rate": "1/3s", "scope": "user"},
+        {"name": "minute", "rate": "7/m", "scope": "user"},
+    ],
+    "login_gate": [
+        {"name": "ip", "rate": "20/m", "scope": "ip"},
+        {"name": "subnet", "rate": "100/m", "scope": "subnet"},
+    ],
+}
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
@@ -255,3 +318,64 @@ EMAIL_USE_SSL = get_secret("EMAIL_USE_SSL")
 EMAIL_HOST_USER = get_secret("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = get_secret("EMAIL_HOST_PASSWORD")
 DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
+# URL pública del sitio (p.ej. https://aciertaperu.com) para los enlaces absolutos
+# de los correos. Sin ella se usa el host de la petición (solo desarrollo)
+SITE_URL = get_secret("SITE_URL", default="")
+
+# GEOIP
+# Tabla binaria de rangos IPv4 generada con `manage.py build_geoip <csv>`
+GEOIP_DATABASE_PATH = BASE_DIR / "geoip" / "ip_ranges.bin"
+GEOIP_CACHE_SIZE = 4096
+
+# TRUSTED DEVICES
+# Tras un 2FA correcto el navegador queda como dispositivo de confianza durante
+# TRUSTED_DEVICE_AGE segundos (0 desactiva) y omite el correo 2FA
+TRUSTED_DEVICE_COOKIE_NAME = "trusted_device"
+TRUSTED_DEVICE_AGE = 60 * 60 * 24 * 30
+TRUSTED_DEVICE_MAX_PER_USER = 5
+
+# OTP (códigos de registro y 2FA): intentos fallidos antes de descartar el código
+OTP_MAX_ATTEMPTS = 5
+
+# EMAIL OUTBOX (worker: python manage.py send_outbox)
+EMAIL_OUTBOX_BATCH_SIZE = 50
+EMAIL_OUTBOX_POLL_INTERVAL = 1
+EMAIL_OUTBOX_MAX_ATTEMPTS = 6
+# Reintentos: EMAIL_OUTBOX_RETRY_BASE * 2^(n-1) segundos, hasta EMAIL_OUTBOX_RETRY_MAX
+EMAIL_OUTBOX_RETRY_BASE = 5
+EMAIL_OUTBOX_RETRY_MAX = 600
+# Segundos que un lote queda reservado (ENVIANDO) antes de que otro worker lo retome
+EMAIL_OUTBOX_LEASE = 300
+# Segundos sin correos tras los que se cierra la conexión SMTP
+EMAIL_OUTBOX_IDLE_CLOSE = 60
+
+# PAGINATION
+# Tope de per_page para los listados; con ?cursor= se usa paginación por keyset
+PAGINATION_DEFAULT_PER_PAGE = 10
+PAGINATION_MAX_PER_PAGE = 100
+# Totales de listados: COUNT exacto hasta LISTING_COUNT_EXACT_LIMIT filas; por
+# encima, estimación del planner si la tabla supera LISTING_COUNT_ESTIMATE_MIN_ROWS
+LISTING_COUNT_EXACT_LIMIT = 1000
+LISTING_COUNT_ESTIMATE_MIN_ROWS = 100000
+# Vigencia de los contadores de usuarios por (rol, estado)
+USER_COUNT_CACHE_TIMEOUT = 600
+# Conteos por estado/rol de un listado con búsqueda (barra lateral)
+LISTING_FACETS_CACHE_TIMEOUT = 60
+# Páginas de los listados de administración; se invalidan al crear, editar o
+# eliminar usuarios/roles, el timeout solo acota cambios hechos fuera del ORM
+LISTING_CACHE_TIMEOUT = 300
+
+# USER SEARCH
+# "auto": pg_trgm en Postgres / FTS5 en SQLite si la migración 0005 los creó;
+# "icontains": siempre LIKE '%término%'
+USER_SEARCH_BACKEND = "auto"
+# Máximo de coincidencias que se ordenan por relevancia (bm25) en FTS5
+USER_SEARCH_RANK_LIMIT = 2000
+
+# USER AUTOCOMPLETE
+# Sugerencias por prefijo (email/nombre/apellido) de los buscadores de usuarios
+USER_AUTOCOMPLETE_MIN_LENGTH = 2
+USER_AUTOCOMPLETE_LIMIT = 10
+# Solo se cachean los prefijos cortos (los más repetidos y costosos)
+USER_AUTOCOMPLETE_CACHE_MAX_LENGTH = 4
+USER_AUTOCOMPLETE_CACHE_TIMEOUT = 30
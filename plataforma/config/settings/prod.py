@@ -17,6 +17,13 @@ ALLOWED_HOSTS = [
     '*',  # Aceptar cualquier host para Dokploy
 ]
 
+# Nginx envía la IP real del cliente en X-Real-IP
+CLIENT_IP_HEADER = 'HTTP_X_REAL_IP'
+
+# Con ALLOWED_HOSTS abierto el Host de la petición no es confiable: los enlaces
+# de los correos se arman con esta URL (obligatoria en producción)
+SITE_URL = get_secret('SITE_URL')
+
 # =============================================================================
 # Database - SQLite por defecto, PostgreSQL/MySQL si se configura
 # =============================================================================
@@ -45,11 +52,12 @@ elif _db_engine and 'mysql' in _db_engine:
         }
     }
 else:
-    # SQLite por defecto
+    # SQLite por defecto. SQLITE_PATH permite ubicarla en un volumen
+    # compartido entre web y el worker de correos (mailer)
     DATABASES = {
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
-            'NAME': BASE_DIR / 'db.sqlite3',
+            'NAME': get_secret('SQLITE_PATH', default=str(BASE_DIR / 'db.sqlite3')),
         }
     }
 
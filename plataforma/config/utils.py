@@ -1,4 +1,6 @@
+import ipaddress
 import json
+import logging
 from django.shortcuts import render as render_html
 import os
 import time
@@ -10,14 +12,11 @@ from inertia import render
 from functools import wraps
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_http_methods
-from django_ratelimit.core import is_ratelimited
 import secrets
 from django.core.cache import cache
 import base64
-from cryptography.hazmat.primitives import serialization
-from cryptography.hazmat.primitives.asymmetric import padding
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.backends import default_backend
+from django.conf import settings
+from config.crypto import SESSION_PAYLOAD_ENC, decrypt_session_payload, get_keyring
 
 
 # =============================================================================
@@ -66,6 +65,44 @@ def get_secret(secret_name, default=None):
     raise ImproperlyConfigured(msg)
 
 
+def get_client_ip(request):
+    """
+    IP del cliente. Detrás de nginx se usa la cabecera configurada en
+    CLIENT_IP_HEADER (X-Real-IP), que el proxy sobrescribe en cada petición.
+    """
+    header = getattr(settings, "CLIENT_IP_HEADER", None)
+    if header:
+        ip = request.META.get(header)
+        if ip:
+            return ip.split(",")[0].strip()
+    return request.META.get("REMOTE_ADDR")
+
+
+def get_client_subnet(ip):
+    """Agrupa la IP en su /24 (IPv4) o /64 (IPv6)."""
+    try:
+        address = ipaddress.ip_address(ip)
+    except (TypeError, ValueError):
+        return None
+    prefix = 24 if address.version == 4 else 64
+    return str(ipaddress.ip_network(f"{address}/{prefix}", strict=False))
+
+
+def get_redis_connection_or_none(alias="default"):
+    """
+    Cliente Redis crudo si el cache configurado es django_redis; None con
+    LocMem (local) para que el llamador use la API genérica del cache.
+    """
+    from django.core.cache import caches
+
+    if not type(caches[alias]).__module__.startswith("django_redis"):
+        return None
+
+    from django_redis import get_redis_connection
+
+    return get_redis_connection(alias)
+
+
 def role_required(role):
     """
     Decorador para verificar que el usuario tiene el rol requerido.
@@ -108,46 +145,15 @@ def require_valid_token(view_func):
 
     return wrapper
 
-MAX_REQUESTS = 7
-WINDOW_SECONDS = 60
-
-def is_user_rate_limited(user_id):
-    cache_key = f"user_rate_limit:{user_id}"
-    now = int(time.time())
-
-    timestamps = cache.get(cache_key, [])
-    valid_timestamps = [ts for ts in timestamps if now - ts < WINDOW_SECONDS]
-
-    valid_timestamps.append(now)
-    cache.set(cache_key, valid_timestamps, timeout=WINDOW_SECONDS)
-
-    if valid_timestamps:
-        elapsed_since_first = now - valid_timestamps[0]
-    else:
-        elapsed_since_first = 0
-
-    if len(valid_timestamps) > MAX_REQUESTS:
-        retry_after = WINDOW_SECONDS - elapsed_since_first
-        return True, retry_after, elapsed_since_first
-
-    return False, None, elapsed_since_first
-
-
-def is_user_rate_limited_3s(user_id):
-    cache_key = f"user_rate_limit_3s:{user_id}"
-    now = int(time.time())
-
-    last_ts = cache.get(cache_key)
-    if last_ts:
-        elapsed = now - last_ts
-        if elapsed < 3:
-            retry_after = 3 - elapsed
-            return True, retry_after, elapsed
-    cache.set(cache_key, now, timeout=3)
-    return False, None, 0
-
-
 def protected_post(module_name, redirect_url=None):
+    """
+    Protege una vista POST con las políticas de RATE_LIMIT_POLICIES del módulo.
+    Todas las políticas se evalúan en una sola llamada al motor de rate limit.
+    Las políticas con `strikes` desactivan al usuario si las excede varias veces
+    en el mismo minuto.
+    """
+    from config.ratelimit import rate_limiter
+
     def decorator(view_func):
         view_func.is_protected_post = True
 
@@ -156,31 +162,21 @@ def protected_post(module_name, redirect_url=None):
         @require_http_methods(['POST'])
         def wrapped_view(request, *args, **kwargs):
             user = request.user
-            user_key = f"ratelimit_exceed_count:{user.id}"
-
-            #per_minute_limited = is_ratelimited(request=request,fn=view_func,key=lambda group, req: f"user:{req.user.id}",rate='7/m',method='POST',increment=True)
-            
-            per_second_limited = is_ratelimited(request=request,fn=view_func,key=lambda group, req: f"user:{req.user.id}",rate='1/s',method='POST',increment=True)
-            if per_second_limited:
-                current_count = cache.get(user_key, 0) + 1
-                cache.set(user_key, current_count, timeout=60)
-
-                if current_count >= 2:
-                    user.is_active = False
-                    user.save()
-                    #logout(request)
-                    return redirect("/")
-
-                return render_html(request, "rate_limit_warning.html", status=429)
-
-            per_3_second_limited, _, _ = is_user_rate_limited_3s(user.id)
-            if per_3_second_limited:
-                return render_html(request, 'rate_limit_warning.html', status=429)
-
-            per_minute_limited, _, _ = is_user_rate_limited(user.id)
-            if per_minute_limited:
-                return render_html(request, 'rate_limit_warning.html', status=429)
-            
+
+            result = rate_limiter.check(module_name, request)
+            if result.limited:
+                policy = result.policy
+                if policy.strikes:
+                    strikes = rate_limiter.add_strike(module_name, policy, f"user:{user.id}")
+                    if strikes >= policy.strikes:
+                        user.is_active = False
+                        user.save()
+                        return redirect("/")
+
+                response = render_html(request, 'rate_limit_warning.html', status=429)
+                response["Retry-After"] = str(result.retry_after)
+                return response
+
             return view_func(request, *args, **kwargs)
 
         wrapped_view.is_protected_post = True
@@ -190,34 +186,30 @@ def protected_post(module_name, redirect_url=None):
 
 
 
+# Campos del sobre cifrado que no forman parte de los datos del formulario
+ENVELOPE_FIELDS = ("payload", "kid", "enc", "ek", "iv")
+
+
 def load_private_key():
-    key_path = os.path.join(settings.BASE_APP, 'private.pem')
-    with open(key_path, 'rb') as key_file:
-        private_key = serialization.load_pem_private_key(
-            key_file.read(),
-            password=None,  
-            backend=default_backend()
-        )
-    return private_key
-
-
-def decrypt_payload(payload_b64):
-    private_key = load_private_key()
+    """
+    Devuelve la clave privada actual desde el keyring del worker.
+    El PEM solo se lee y parsea cuando cambia en disco.
+    """
+    return get_keyring().current_key()
+
+
+def decrypt_payload(payload_b64, kid=None):
     encrypted_data = base64.b64decode(payload_b64)
-    decrypted_data = private_key.decrypt(
-        encrypted_data,
-        padding.OAEP(
-            mgf=padding.MGF1(algorithm=hashes.SHA256()),
-            algorithm=hashes.SHA256(),
-            label=None
-        )
-    )
+    decrypted_data = get_keyring().decrypt(encrypted_data, kid=kid)
     return decrypted_data.decode('utf-8')
 
     
 def create_decrypted_data(request):
     """
     Devuelve un dict con los datos desencriptados y los que vienen en claro.
+    El campo opcional `kid` indica con qué clave del keyring se cifró el payload.
+    Con `enc` = "A256GCM" el payload viene cifrado con la clave AES de la
+    sesión; sin `enc` se usa el RSA directo de siempre.
     """
     try:
         body_unicode = request.body.decode("utf-8")
@@ -227,28 +219,23 @@ def create_decrypted_data(request):
         if not payload_b64:
             raise ValueError("Missing payload")
 
-        encrypted_bytes = base64.b64decode(payload_b64)
-        private_key = load_private_key()
-
-        decrypted_bytes = private_key.decrypt(
-            encrypted_bytes,
-            padding.OAEP(
-                mgf=padding.MGF1(hashes.SHA256()),
-                algorithm=hashes.SHA256(),
-                label=None,
-            ),
-        )
-        decrypted_json = decrypted_bytes.decode("utf-8")
+        if body.get("enc") == SESSION_PAYLOAD_ENC:
+            decrypted_json = decrypt_session_payload(request, body).decode("utf-8")
+        else:
+            decrypted_json = decrypt_payload(payload_b64, kid=body.get("kid"))
         data = json.loads(decrypted_json)
 
+        # Bundles anteriores codificaban el JSON dos veces; se aceptan hasta
+        # que los clientes recarguen la página
         if isinstance(data, str):
+            logging.info("Payload cifrado con doble codificación JSON (cliente antiguo)")
             data = json.loads(data)
 
         if not isinstance(data, dict):
             raise ValueError("Decrypted data is not a dictionary")
 
         for key, value in body.items():
-            if key != "payload":
+            if key not in ENVELOPE_FIELDS:
                 data[key] = value
 
         return data
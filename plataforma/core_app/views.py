@@ -14,10 +14,14 @@ def health_check(request):
         from django.db import connection
         with connection.cursor() as cursor:
             cursor.execute("SELECT 1")
-        
+
+        # Métricas del verificador hCaptcha (por worker)
+        from users_app.services.hcaptcha_service import get_hcaptcha_verifier
+
         return JsonResponse({
             'status': 'healthy',
             'database': 'connected',
+            'hcaptcha': get_hcaptcha_verifier().stats(),
         })
     except Exception as e:
         return JsonResponse({
@@ -317,7 +317,7 @@ const EnhancedDataTable: React.FC<EnhancedDataTableProps> = ({
             {data?.total > 0 && (
                 <div className="flex flex-wrap items-center justify-between gap-4 pt-2">
                     <span className="text-sm text-slate-600 dark:text-slate-400 font-medium">
-                        Mostrando {data.from} a {data.to} de {data.total} registros
+                        Mostrando {data.from} a {data.to} de {data.total_exact === false ? 'aprox. ' : ''}{data.total} registros
                     </span>
                     <Paginator 
                         rows={data.per_page} 
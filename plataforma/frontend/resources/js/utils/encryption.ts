@@ -1,6 +1,8 @@
 import forge from 'node-forge';
 
-const publicKeyBase64 = `
+// Key bundled at build time; only used until the server shares the current one
+// (the "encryption_key" Inertia prop), which keeps working after a key rotation
+let publicKeyBase64 = `
 MIICIjANBgkqhkiG9w0BAQEFAAOCAg8AMIICCgKCAgEAmntF4svNUhA+Vr1l08Rf
 kBRpHkVPSO6vmeQmcYcVNYJHWudthsLOnL27aFTEEhD5TFO/nmJstnAGv4qVYHON
 FeVQL38doDwdut5CAp39Ymxs9sJeu2+STkVq+O5fDWZiZNjYjrN+qNitFN4t3zWV
@@ -47,6 +49,90 @@ ${publicKeyBase64.match(/.{1,64}/g)?.join('\n')}
     return forge.util.encode64(encrypted);
 }
 
+// Identificador de la clave pública (primeros 16 hex del SHA-256 del SPKI),
+// el mismo que calcula el keyring del servidor.
+let publicKeyIdPromise: Promise<string> | null = null;
+
+async function computePublicKeyId(): Promise<string> {
+    if (window.crypto?.subtle) {
+        const digest = await window.crypto.subtle.digest('SHA-256', base64ToArrayBuffer(publicKeyBase64));
+        return Array.from(new Uint8Array(digest))
+            .map((b) => b.toString(16).padStart(2, '0'))
+            .join('')
+            .slice(0, 16);
+    }
+    const md = forge.md.sha256.create();
+    md.update(forge.util.decode64(publicKeyBase64));
+    return md.digest().toHex().slice(0, 16);
+}
+
+// Server-provided current public key (SPKI, base64). Switching keys drops the
+// cached kid and the wrapped session key, which were derived from the old one.
+export function setPublicKey(spki: string | undefined | null) {
+    if (!spki || spki === publicKeyBase64) return;
+    publicKeyBase64 = spki;
+    publicKeyIdPromise = null;
+    sessionKeyPromise = null;
+}
+
+export function getPublicKeyId(): Promise<string> {
+    if (!publicKeyIdPromise) {
+        publicKeyIdPromise = computePublicKeyId();
+    }
+    return publicKeyIdPromise;
+}
+
+// Modo híbrido: una clave AES-GCM por sesión, envuelta con RSA una sola vez.
+// El servidor solo desenvuelve la clave la primera vez que la ve en la sesión.
+export const SESSION_PAYLOAD_ENC = 'A256GCM';
+
+type SessionKey = { key: CryptoKey; wrapped: string };
+let sessionKeyPromise: Promise<SessionKey> | null = null;
+
+function arrayBufferToBase64(buffer: ArrayBuffer): string {
+    const bytes = new Uint8Array(buffer);
+    let binary = '';
+    for (let i = 0; i < bytes.length; i += 0x8000) {
+        binary += String.fromCharCode(...bytes.subarray(i, i + 0x8000));
+    }
+    return btoa(binary);
+}
+
+async function createSessionKey(): Promise<SessionKey> {
+    const key = await window.crypto.subtle.generateKey({ name: 'AES-GCM', length: 256 }, true, ['encrypt']);
+    const raw = await window.crypto.subtle.exportKey('raw', key);
+    const publicKey = await window.crypto.subtle.importKey('spki', base64ToArrayBuffer(publicKeyBase64), { name: 'RSA-OAEP', hash: 'SHA-256' }, false, ['encrypt']);
+    const wrapped = await window.crypto.subtle.encrypt({ name: 'RSA-OAEP' }, publicKey, raw);
+    return { key, wrapped: arrayBufferToBase64(wrapped) };
+}
+
+function getSessionKey(): Promise<SessionKey> {
+    if (!sessionKeyPromise) {
+        sessionKeyPromise = createSessionKey().catch((err) => {
+            sessionKeyPromise = null;
+            throw err;
+        });
+    }
+    return sessionKeyPromise;
+}
+
+export function supportsSessionEncryption(): boolean {
+    return Boolean(window.crypto?.subtle);
+}
+
+export async function encryptWithSessionKey(payload: any): Promise<{ enc: string; ek: string; iv: string; payload: string }> {
+    const { key, wrapped } = await getSessionKey();
+    const iv = window.crypto.getRandomValues(new Uint8Array(12));
+    const encoded = new TextEncoder().encode(JSON.stringify(payload));
+    const encrypted = await window.crypto.subtle.encrypt({ name: 'AES-GCM', iv }, key, encoded);
+    return {
+        enc: SESSION_PAYLOAD_ENC,
+        ek: wrapped,
+        iv: arrayBufferToBase64(iv.buffer),
+        payload: arrayBufferToBase64(encrypted)
+    };
+}
+
 export async function encryptWithRSA(payload: any): Promise<string> {
     try {
         if (window.crypto?.subtle) {
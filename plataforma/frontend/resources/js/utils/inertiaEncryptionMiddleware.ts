@@ -1,8 +1,20 @@
 import { router } from '@inertiajs/react';
-import { encryptWithRSA } from '@/utils/encryption';
+import { encryptWithRSA, encryptWithSessionKey, getPublicKeyId, setPublicKey, supportsSessionEncryption } from '@/utils/encryption';
+
+// Current RSA public key shared by the server: initial page data, then every visit
+const readSharedKey = (props: any) => setPublicKey(props?.encryption_key?.spki);
+
+try {
+    const initialPage = document.getElementById('app')?.dataset.page;
+    if (initialPage) readSharedKey(JSON.parse(initialPage).props);
+} catch (err) {
+    console.warn('Could not read the initial encryption key', err);
+}
+router.on('navigate', (event) => readSharedKey(event.detail.page.props));
 
 const originalVisit = router.visit;
 
+// Límite por campo solo para el modo RSA directo (el payload debe caber en un bloque RSA)
 const MAX_FIELD_LENGTH = 190;
 
 // Override the visit method
@@ -15,6 +27,7 @@ router.visit = function (url: string | URL, options: any = {}) {
         }
 
         const plainData = typeof options.data === 'function' ? options.data() : options.data || {};
+        const sessionMode = supportsSessionEncryption();
         const payload: Record<string, any> = {};
         const passthrough: Record<string, any> = {};
 
@@ -28,17 +41,31 @@ router.visit = function (url: string | URL, options: any = {}) {
                 continue;
             }
 
-            if (valueStr && valueStr.length <= MAX_FIELD_LENGTH) {
+            if (valueStr && (sessionMode || valueStr.length <= MAX_FIELD_LENGTH)) {
                 payload[key] = value;
             } else {
                 passthrough[key] = value;
             }
         }
 
-        encryptWithRSA(JSON.stringify(payload))
-            .then((encryptedPayload) => {
+        // Both encrypt helpers JSON-encode the payload themselves; passing a string
+        // here would encode it twice
+        const encrypt = async () => {
+            const kid = await getPublicKeyId();
+            if (sessionMode) {
+                try {
+                    return { ...(await encryptWithSessionKey(payload)), kid };
+                } catch (err) {
+                    console.warn('Cifrado de sesión no disponible, usando RSA', err);
+                }
+            }
+            return { payload: await encryptWithRSA(payload), kid };
+        };
+
+        encrypt()
+            .then((envelope) => {
                 options.data = {
-                    payload: encryptedPayload,
+                    ...envelope,
                     ...passthrough
                 };
                 originalVisit.call(router, url, options);
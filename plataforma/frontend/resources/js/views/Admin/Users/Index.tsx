@@ -43,6 +43,12 @@ const UsersIndex: React.FC<Props> = ({ users, estado_choices, roles, ranks }) =>
 
     const getSeverity = (estado: string) => (estado === "ACTIVO" ? "success" : "danger");
 
+    // Show per-estado counts (listing facets) next to each filter option
+    const estadoOptions = estado_choices.map(([value, label]) => [
+        value,
+        users?.facets ? `${label} (${users.facets.estado[value] ?? 0})` : label,
+    ]);
+
     const openCreateDrawer = () => setShowAdd(true);
 
     const openEditDrawer = (id: number) => {
@@ -95,7 +101,7 @@ const UsersIndex: React.FC<Props> = ({ users, estado_choices, roles, ranks }) =>
                                 <label className="text-sm font-medium text-slate-700 dark:text-slate-300 mb-1 block">Estado</label>
                                 <Dropdown 
                                     value={filters.status} 
-                                    options={estado_choices} 
+                                    options={estadoOptions} 
                                     optionLabel="1"
                                     optionValue="0" 
                                     placeholder="Todos" 
@@ -18,7 +18,8 @@ interface Props {
 
 const Login2FAPage = ({ email, errors: propErrors, success }: Props) => {
     const { data, setData, post, processing, errors, clearErrors } = useForm({
-        code: ''
+        code: '',
+        remember_device: false
     });
 
     const resendForm = useForm({});
@@ -203,6 +204,17 @@ const Login2FAPage = ({ email, errors: propErrors, success }: Props) => {
                         </CSSTransition>
                     </div>
 
+                    <label htmlFor="remember_device" className="flex items-center gap-2 text-sm text-slate-700 dark:text-slate-300 ml-1 cursor-pointer">
+                        <input
+                            id="remember_device"
+                            type="checkbox"
+                            checked={data.remember_device}
+                            onChange={(e) => setData('remember_device', e.target.checked)}
+                            className="h-4 w-4 rounded border-gray-300 dark:border-gray-600 text-brand-primary focus:ring-brand-primary"
+                        />
+                        Recordar este dispositivo (no volver a pedir el código en este navegador)
+                    </label>
+
                     <CSSTransition nodeRef={nodeRefAllError} in={!!errors.__all__} timeout={300} classNames="slide-down" unmountOnExit>
                         <div ref={nodeRefAllError} className="bg-red-50 dark:bg-red-900/20 text-red-600 dark:text-red-400 p-3 rounded-lg text-sm flex items-center gap-2">
                             <i className="pi pi-exclamation-triangle"></i>
@@ -3,6 +3,7 @@ import { Card } from 'primereact/card';
 
 interface Session {
     ip_address: string;
+    location: string;
     login_time: string;
     // Add other fields if present in user_details object
 }
@@ -26,6 +27,7 @@ const ActiveSessions: React.FC<ActiveSessionsProps> = ({ current_session, previo
                             <i className="pi pi-shield text-3xl mt-1 text-green-500"></i>
                             <div className="ml-4 flex-grow">
                                 <p className="font-semibold text-slate-700 dark:text-slate-200">IP: {current_session.ip_address}</p>
+                                <p className="text-sm text-slate-500 dark:text-slate-400 mt-1"><i className="pi pi-map-marker mr-1"></i>{current_session.location}</p>
                                 <p className="text-sm text-slate-500 dark:text-slate-400 mt-1">{current_session.login_time}</p>
                             </div>
                         </div>
@@ -41,6 +43,7 @@ const ActiveSessions: React.FC<ActiveSessionsProps> = ({ current_session, previo
                             <i className="pi pi-shield text-3xl mt-1 text-slate-500"></i>
                             <div className="ml-4 flex-grow">
                                 <p className="font-semibold text-slate-700 dark:text-slate-200">IP: {previous_session.ip_address}</p>
+                                <p className="text-sm text-slate-500 dark:text-slate-400 mt-1"><i className="pi pi-map-marker mr-1"></i>{previous_session.location}</p>
                                 <p className="text-sm text-slate-500 dark:text-slate-400 mt-1">{previous_session.login_time}</p>
                             </div>
                         </div>
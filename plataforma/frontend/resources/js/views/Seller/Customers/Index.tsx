@@ -38,6 +38,12 @@ const CustomerIndex: React.FC<CustomerIndexProps> = ({ customers, estado_choices
 
     const getSeverity = (estado: string) => (estado === "ACTIVO" ? "success" : "danger");
 
+    // Show per-estado counts (listing facets) next to each filter option
+    const estadoOptions = estado_choices.map(([value, label]) => [
+        value,
+        customers?.facets ? `${label} (${customers.facets.estado[value] ?? 0})` : label,
+    ]);
+
     const openEditDrawer = (id: number) => {
         form.get(`/vendedor/clientes/show/${id}/`, {
             preserveState: true,
@@ -77,7 +83,7 @@ const CustomerIndex: React.FC<CustomerIndexProps> = ({ customers, estado_choices
                                 <label className="text-sm font-medium text-slate-700 dark:text-slate-300 mb-1 block">Estado</label>
                                 <Dropdown 
                                     value={filters.status} 
-                                    options={estado_choices} 
+                                    options={estadoOptions} 
                                     optionLabel="1" 
                                     optionValue="0" 
                                     placeholder="Todos" 
@@ -0,0 +1,24 @@
+from django.contrib.auth.backends import ModelBackend
+
+from users_app.models import User
+from users_app.services.user_snapshot_service import UserSnapshotService
+
+
+class SnapshotModelBackend(ModelBackend):
+    """
+    ModelBackend que arma request.user desde UserSnapshotService. Si no hay
+    copia en cache, hace una sola consulta con select_related('current_role')
+    y la guarda para las siguientes peticiones.
+    """
+
+    def get_user(self, user_id):
+        user = UserSnapshotService.load(user_id)
+        if user is None:
+            # La versión se lee antes de la consulta (ver UserSnapshotService)
+            version = UserSnapshotService.version(user_id)
+            try:
+                user = User.objects.select_related("current_role").get(pk=user_id)
+            except User.DoesNotExist:
+                return None
+            UserSnapshotService.store(user, version)
+        return user if self.user_can_authenticate(user) else None
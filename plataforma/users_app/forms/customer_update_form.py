@@ -1,6 +1,7 @@
 from django import forms
 from django.contrib.auth.hashers import make_password
-from users_app.models import User, Role
+from users_app.models import User
+from users_app.services.role_registry import RoleRegistry
 
 
 class CustomerUpdateForm(forms.ModelForm):
@@ -61,9 +62,8 @@ class CustomerUpdateForm(forms.ModelForm):
         if self.cleaned_data.get("password"):
             user.password = make_password(self.cleaned_data["password"])
 
-        try:
-            cliente_role = Role.objects.get(name__iexact="CLIENTE")
-        except Role.DoesNotExist:
+        cliente_role = RoleRegistry.get_by_name("CLIENTE")
+        if cliente_role is None:
             raise forms.ValidationError("El rol CLIENTE no existe en el sistema.")
 
         user.current_role = cliente_role
@@ -1,6 +1,7 @@
 from django import forms
 from django.contrib.auth.hashers import make_password
-from users_app.models import User, Role
+from users_app.models import User
+from users_app.services.role_registry import RoleRegistry
 
 
 class UserForm(forms.ModelForm):
@@ -164,11 +165,10 @@ class UserRegistrationForm(forms.ModelForm):
         user.password = make_password(self.cleaned_data["password"])
         
         # Asignar valores por defecto
-        try:
-            default_role = Role.objects.get(name="CLIENTE")
-            user.current_role = default_role
-        except Role.DoesNotExist:
+        default_role = RoleRegistry.get_by_name("CLIENTE")
+        if default_role is None:
             raise forms.ValidationError("No se encontró el rol CLIENTE. Contacte al administrador.")
+        user.current_role = default_role
                 
         # Valores por defecto para otros campos
         user.estado = "ACTIVO"
@@ -0,0 +1,50 @@
+import os
+import threading
+import time
+import uuid
+
+# Contador de 42 bits (rand_a + parte alta de rand_b) para ordenar los ids
+# generados dentro del mismo milisegundo
+_COUNTER_MAX = (1 << 42) - 1
+
+_lock = threading.Lock()
+_last_timestamp = -1
+_last_counter = 0
+
+
+def _random_counter():
+    # 41 bits: el bit alto queda en 0 para dejar margen a los incrementos
+    return int.from_bytes(os.urandom(6), "big") & ((1 << 41) - 1)
+
+
+def uuid7():
+    """
+    UUID versión 7 (RFC 9562): milisegundos Unix en los 48 bits altos, así
+    los ids nuevos quedan en orden de creación y se insertan al final del
+    índice de la clave primaria en lugar de dispersarse como uuid4.
+    Dentro de un mismo milisegundo se incrementa un contador, por lo que
+    los ids de un proceso son estrictamente crecientes aunque el reloj
+    retroceda. (Python 3.14 trae uuid.uuid7; este proyecto usa 3.11.)
+    """
+    global _last_timestamp, _last_counter
+
+    with _lock:
+        timestamp = time.time_ns() // 1_000_000
+        if timestamp > _last_timestamp:
+            counter = _random_counter()
+        else:
+            timestamp = _last_timestamp
+            counter = _last_counter + 1
+            if counter > _COUNTER_MAX:
+                timestamp += 1
+                counter = _random_counter()
+        _last_timestamp, _last_counter = timestamp, counter
+
+    tail = int.from_bytes(os.urandom(4), "big")
+    value = (timestamp & 0xFFFF_FFFF_FFFF) << 80
+    value |= 0x7 << 76                          # versión
+    value |= (counter >> 30) << 64              # rand_a: 12 bits altos del contador
+    value |= 0b10 << 62                         # variante RFC
+    value |= (counter & 0x3FFF_FFFF) << 32      # 30 bits bajos del contador
+    value |= tail
+    return uuid.UUID(int=value)
@@ -0,0 +1,68 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+from django.templatetags.static import static
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from users_app.models import User
+from users_app.services.email_renderer import EMAIL_SPECS, EmailRenderer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara el costo por mensaje de renderizar los correos con código: "
+        "render_to_string + static() en cada envío vs EmailRenderer"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=2000)
+
+    # Se mide el camino de producción: en DEBUG EmailRenderer recompila siempre
+    @override_settings(DEBUG=False)
+    def handle(self, *args, **options):
+        iterations = options["iterations"]
+        request = RequestFactory().get("/", HTTP_HOST="localhost")
+        user = User(email="bench@example.com", username="bench", first_name="Bench")
+        extra = {
+            "ip_address": "190.0.0.1",
+            "login_time": timezone.now().strftime("%d/%m/%Y %H:%M:%S"),
+            "location": "Lima, Perú",
+        }
+
+        def legacy():
+            context = {
+                "user_name": user.first_name or user.username,
+                "verification_code": "ABC123",
+                "user_email": user.email,
+                "logo_url": request.build_absolute_uri(static("logo.png")),
+                **extra,
+            }
+            html = render_to_string("emails/login_2fa_code.html", context)
+            # Mismo cuerpo de texto completo que EmailRenderer: solo cambia el HTML
+            text = EMAIL_SPECS["2fa"].text.format(**context)
+            return html, text
+
+        def renderer():
+            return EmailRenderer.render("2fa", request, user, "ABC123", **extra)
+
+        # Calentamiento: compila plantillas y llena caches en ambos caminos
+        legacy()
+        renderer()
+
+        results = []
+        for name, func in (("render_to_string (antes)", legacy), ("EmailRenderer (después)", renderer)):
+            start = time.perf_counter()
+            for _ in range(iterations):
+                func()
+            elapsed = time.perf_counter() - start
+            results.append(elapsed)
+            self.stdout.write(
+                f"{name:<28} {elapsed * 1e6 / iterations:10.1f} µs/mensaje  ({iterations} iteraciones)"
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Mejora: {results[0] / results[1]:.2f}x (mismo texto y HTML en ambos caminos)"
+        ))
@@ -0,0 +1,89 @@
+import ipaddress
+import os
+import random
+import resource
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from users_app.services.geoip_service import GeoIPDatabase, write_database
+
+
+def rss_kb():
+    """RSS actual del proceso en KB (Linux)."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * (resource.getpagesize() // 1024)
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide tiempo de carga, memoria por worker y costo por búsqueda de la base "
+        "GeoIP. Con --synthetic N genera una tabla de prueba de N rangos"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default=str(settings.GEOIP_DATABASE_PATH))
+        parser.add_argument("--synthetic", type=int, default=0)
+        parser.add_argument("--lookups", type=int, default=200000)
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        temp_dir = None
+        if options["synthetic"]:
+            temp_dir = tempfile.TemporaryDirectory()
+            path = os.path.join(temp_dir.name, "synthetic.bin")
+            step = 0xFFFFFFFF // options["synthetic"]
+            write_database(path, (
+                (i * step, i * step + step - 1, f"Ciudad {i % 5000}, Región {i % 300}, País {i % 200}")
+                for i in range(options["synthetic"])
+            ))
+
+        rss_before = rss_kb()
+        start = time.perf_counter()
+        database = GeoIPDatabase(path)
+        load_ms = (time.perf_counter() - start) * 1000
+        rss_after_load = rss_kb()
+
+        addresses = [random.getrandbits(32) for _ in range(options["lookups"])]
+        # Primera pasada: incluye los page faults de páginas aún no leídas
+        start = time.perf_counter()
+        for address in addresses:
+            database.lookup(address)
+        cold_ns = (time.perf_counter() - start) * 1e9 / len(addresses)
+        rss_after_lookups = rss_kb()
+
+        start = time.perf_counter()
+        for address in addresses:
+            database.lookup(address)
+        lookup_ns = (time.perf_counter() - start) * 1e9 / len(addresses)
+
+        # Camino completo con LRU (direcciones repetidas, como en logins reales)
+        from users_app.services.geoip_service import GeoIPService
+        hot = [str(ipaddress.IPv4Address(address)) for address in addresses[:1000]]
+        GeoIPService._database, GeoIPService._loaded = database, True
+        GeoIPService.lookup.cache_clear()
+        for address in hot:
+            GeoIPService.lookup(address)
+        start = time.perf_counter()
+        for _ in range(100):
+            for address in hot:
+                GeoIPService.lookup(address)
+        cached_ns = (time.perf_counter() - start) * 1e9 / (100 * len(hot))
+        GeoIPService.reset()
+
+        self.stdout.write(f"Archivo:                 {path} ({os.path.getsize(path) / 1024:.0f} KB, {database.count} rangos)")
+        self.stdout.write(f"Carga (mmap):            {load_ms:.2f} ms")
+        self.stdout.write(f"RSS tras cargar:         +{rss_after_load - rss_before} KB")
+        self.stdout.write(f"RSS tras {len(addresses)} búsquedas: +{rss_after_lookups - rss_before} KB (páginas compartidas del page cache)")
+        self.stdout.write(f"Búsqueda en frío:        {cold_ns:.0f} ns")
+        self.stdout.write(f"Búsqueda (bisect):       {lookup_ns:.0f} ns")
+        self.stdout.write(f"Búsqueda con LRU:        {cached_ns:.0f} ns")
+
+        if temp_dir:
+            del database
+            temp_dir.cleanup()
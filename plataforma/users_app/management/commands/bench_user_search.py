@@ -0,0 +1,101 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from users_app.models import User
+from users_app.services.pagination_service import PaginationService
+from users_app.services.user_search_service import IcontainsSearchBackend, UserSearchService
+
+FIRST_NAMES = [
+    "Juan", "María", "José", "Rosa", "Luis", "Ana", "Carlos", "Lucía", "Jorge", "Carmen",
+    "Miguel", "Elena", "Pedro", "Sofía", "Diego", "Valeria", "Andrés", "Camila", "Raúl", "Paola",
+]
+LAST_NAMES = [
+    "Quispe", "Flores", "Sánchez", "Rodríguez", "García", "Huamán", "Mamani", "Chávez",
+    "Torres", "Ramírez", "Vargas", "Castillo", "Mendoza", "Rojas", "Gutiérrez", "Salazar",
+]
+DOMAINS = ["gmail.com", "hotmail.com", "outlook.com", "yahoo.es", "aciertaperu.pe"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide la latencia de la búsqueda de usuarios (página + COUNT acotado, como "
+        "el listado) con icontains vs el backend activo sobre N usuarios sintéticos. "
+        "Todo corre dentro de una transacción que se revierte al terminar."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=100_000)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--per-page", type=int, default=10)
+        parser.add_argument(
+            "--terms", default="quispe,maría,rodri,user12345,gmail,zzzz",
+            help="Términos separados por coma",
+        )
+
+    def _populate(self, total):
+        rng = random.Random(42)
+        batch_size = 10_000
+        start_time = time.perf_counter()
+        for offset in range(0, total, batch_size):
+            User.objects.bulk_create(
+                [
+                    User(
+                        email=f"user{i}@{rng.choice(DOMAINS)}",
+                        username=f"user{i}",
+                        first_name=rng.choice(FIRST_NAMES),
+                        last_name=f"{rng.choice(LAST_NAMES)} {rng.choice(LAST_NAMES)}",
+                    )
+                    for i in range(offset, min(offset + batch_size, total))
+                ],
+                batch_size=1000,
+            )
+        indexed = UserSearchService.rebuild()
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE usuarios")
+        self.stdout.write(
+            f"{total} usuarios creados ({indexed} indexados) en {time.perf_counter() - start_time:.1f}s"
+        )
+
+    def _measure(self, backend, term, options):
+        def run():
+            qs, rank_field = backend.search(User.objects.all(), term)
+            order = PaginationService.get_ordering(
+                User, rank_field or "id", descending=bool(rank_field),
+                unique=UserSearchService.is_unique_rank(rank_field),
+            )
+            rows = list(qs.order_by(*order).values_list("id", "email")[:options["per_page"]])
+            total = qs.order_by()[:1001].count()
+            return len(rows), total
+
+        found = run()
+        timings = []
+        for _ in range(options["repeat"]):
+            start_time = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - start_time)
+        return statistics.median(timings) * 1000, found
+
+    def handle(self, *args, **options):
+        backend = UserSearchService.get_backend()
+        baseline = IcontainsSearchBackend()
+        terms = [term.strip() for term in options["terms"].split(",") if term.strip()]
+        self.stdout.write(f"Backend activo: {backend.name} ({connection.vendor})")
+
+        with transaction.atomic():
+            self._populate(options["users"])
+
+            self.stdout.write(f"{'término':<12} {'icontains ms':>13} {backend.name + ' ms':>20} {'filas (≤1001)':>14}")
+            for term in terms:
+                baseline_ms, (_, baseline_total) = self._measure(baseline, term, options)
+                backend_ms, (_, backend_total) = self._measure(backend, term, options)
+                mismatch = "" if baseline_total == backend_total else f"  (icontains: {baseline_total})"
+                self.stdout.write(
+                    f"{term:<12} {baseline_ms:>13.2f} {backend_ms:>20.2f} {backend_total:>14}{mismatch}"
+                )
+
+            transaction.set_rollback(True)
@@ -0,0 +1,68 @@
+import csv
+import ipaddress
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from users_app.services.geoip_service import write_database
+
+
+def parse_ipv4(value):
+    value = value.strip()
+    if value.isdigit():
+        number = int(value)
+        return number if number <= 0xFFFFFFFF else None
+    try:
+        return int(ipaddress.IPv4Address(value))
+    except ValueError:
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Convierte un CSV de rangos IP (p.ej. IP2Location LITE DB3: ip_from, ip_to, "
+        "country_code, country, region, city) en la tabla binaria de GeoIPService"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("csv_path")
+        parser.add_argument("--output", default=str(settings.GEOIP_DATABASE_PATH))
+        parser.add_argument(
+            "--label-columns", default="5,4,3",
+            help="Columnas (desde 0) que forman la etiqueta, en orden. Por defecto ciudad, región, país",
+        )
+
+    def handle(self, *args, **options):
+        label_columns = [int(column) for column in options["label_columns"].split(",")]
+        start_time = time.perf_counter()
+
+        ranges = []
+        skipped = 0
+        try:
+            with open(options["csv_path"], newline="", encoding="utf-8") as source:
+                for row in csv.reader(source):
+                    if len(row) <= max(label_columns):
+                        skipped += 1
+                        continue
+                    start, end = parse_ipv4(row[0]), parse_ipv4(row[1])
+                    if start is None or end is None:
+                        # Cabecera, IPv6 o fila inválida
+                        skipped += 1
+                        continue
+                    parts = [row[column].strip() for column in label_columns]
+                    label = ", ".join(part for part in parts if part and part != "-")
+                    if label:
+                        ranges.append((start, end, label))
+        except FileNotFoundError:
+            raise CommandError(f"No existe {options['csv_path']}")
+
+        if not ranges:
+            raise CommandError("El CSV no contiene rangos IPv4 válidos")
+
+        count, labels = write_database(options["output"], ranges)
+        elapsed = time.perf_counter() - start_time
+        self.stdout.write(self.style.SUCCESS(
+            f"{count} rangos y {labels} ubicaciones escritos en {options['output']} "
+            f"({skipped} filas omitidas, {elapsed:.1f}s). Reinicie los workers para cargarla."
+        ))
@@ -0,0 +1,173 @@
+import uuid
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from users_app.forms.users_form import UserForm
+from users_app.models import Role, User
+from users_app.services.customers_seller_service import CustomerSellerService
+from users_app.services.helpers import exists_login_block_record, get_last_reset_or_24h
+from users_app.services.login_risk_service import LoginRiskTracker
+from users_app.services.role_registry import RoleRegistry
+from users_app.services.session_service import SessionService
+from users_app.services.user_autocomplete_service import UserAutocompleteService
+from users_app.services.users_admin_service import UsersAdminService
+
+# Marca de recorrido secuencial en el plan de cada motor
+SEQUENTIAL_SCAN_MARKERS = {
+    "sqlite": "SCAN",
+    "postgresql": "Seq Scan",
+    "mysql": "Table scan",
+}
+
+# Sin cache los servicios van siempre a la base, que es lo que se quiere medir
+NO_CACHE = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+
+
+class Command(BaseCommand):
+    help = (
+        "Ejecuta EXPLAIN sobre las consultas frecuentes de los servicios y helpers "
+        "(login, sesiones, bloqueos, listados) y marca las que recorren la tabla "
+        "completa. En Postgres con tablas chicas el planner prefiere Seq Scan; "
+        "--no-seqscan lo desalienta para ver si el índice es utilizable."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--no-seqscan", action="store_true",
+            help="Postgres: SET LOCAL enable_seqscan = off durante los EXPLAIN",
+        )
+        parser.add_argument(
+            "--strict", action="store_true",
+            help="Termina con error si alguna consulta recorre una tabla completa",
+        )
+
+    def _hot_queries(self):
+        """
+        (descripción, función) que llaman al mismo código de los servicios,
+        helpers y formularios; se explica cada SELECT que ejecutan.
+        """
+        # Un id que no esté en la memoria local de SessionService
+        user_id = uuid.uuid4()
+        # Se crea dentro de la transacción (que se revierte) si la base no lo tiene
+        cliente_role = RoleRegistry.get_by_name("CLIENTE") or Role.objects.create(name="CLIENTE")
+        params = {}
+
+        def user_by_email():
+            try:
+                User.objects.get_by_natural_key("user@example.com")
+            except User.DoesNotExist:
+                pass
+
+        return [
+            ("auth_service: usuario por email", user_by_email),
+            (
+                "forms: email y username repetidos",
+                lambda: UserForm({"email": "user@example.com", "username": "user"}).is_valid(),
+            ),
+            (
+                "users_admin: listado por estado",
+                lambda: UsersAdminService._get_users_page(params, "", "", "asc", "BANEADO"),
+            ),
+            (
+                "customers_seller: listado por rol",
+                lambda: CustomerSellerService._get_customers_page(
+                    params, "", "", "asc", "", cliente_role
+                ),
+            ),
+            (
+                "customers_seller: listado por rol y estado",
+                lambda: CustomerSellerService._get_customers_page(
+                    params, "", "", "asc", "BANEADO", cliente_role
+                ),
+            ),
+            (
+                "user_autocomplete: prefijo por rol",
+                lambda: UserAutocompleteService._search(
+                    "qui", cliente_role.id_rol, settings.USER_AUTOCOMPLETE_LIMIT
+                ),
+            ),
+            ("session_service: última sesión", lambda: SessionService.get_latest_session_id(user_id)),
+            ("login_risk: intentos fallidos e IPs recientes", lambda: LoginRiskTracker._hydrate(user_id)),
+            ("helpers: último reinicio de bloqueo", lambda: get_last_reset_or_24h(user_id, True)),
+            ("helpers: bloqueo vigente", lambda: exists_login_block_record(user_id, True)),
+        ]
+
+    def _capture(self, func):
+        """SELECTs que ejecuta `func`, con los parámetros ya interpolados."""
+        with CaptureQueriesContext(connection) as captured:
+            func()
+        return [
+            query["sql"] for query in captured.captured_queries
+            if query["sql"].lstrip().upper().startswith("SELECT")
+        ]
+
+    def _explain(self, sql):
+        prefix = connection.ops.explain_query_prefix(
+            format="TREE" if connection.vendor == "mysql" else None
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(f"{prefix} {sql}")
+            return "\n".join(str(row[-1]) for row in cursor.fetchall())
+
+    def _scans(self, plan, marker, tables):
+        # En SQLite "SCAN ... USING INDEX" también recorre toda la tabla (en
+        # el orden del índice); solo se acepta leer el índice completo. Los
+        # "SCAN subquery" recorren el resultado de una subconsulta, no una tabla
+        scans = []
+        for line in plan.splitlines():
+            if marker not in line or "COVERING INDEX" in line:
+                continue
+            target = line.split(marker, 1)[1].split()
+            if connection.vendor == "sqlite" and target and target[0] not in tables:
+                continue
+            scans.append(line)
+        return scans
+
+    def handle(self, *args, **options):
+        marker = SEQUENTIAL_SCAN_MARKERS.get(connection.vendor)
+        if marker is None:
+            raise CommandError(f"Motor no soportado: {connection.vendor}")
+
+        tables = set(connection.introspection.table_names())
+        flagged = []
+        with override_settings(CACHES=NO_CACHE), transaction.atomic():
+            if options["no_seqscan"] and connection.vendor == "postgresql":
+                with connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL enable_seqscan = off")
+
+            for label, func in self._hot_queries():
+                queries = self._capture(func)
+                if not queries:
+                    # Sin consultas no hay nada que revisar: el chequeo perdió cobertura
+                    flagged.append(label)
+                    self.stdout.write(self.style.WARNING(f"[--]   {label}: no ejecutó consultas"))
+                    continue
+
+                plans = [(sql, self._explain(sql)) for sql in queries]
+                if any(self._scans(plan, marker, tables) for _, plan in plans):
+                    flagged.append(label)
+                    self.stdout.write(self.style.WARNING(f"[SCAN] {label}"))
+                else:
+                    self.stdout.write(self.style.SUCCESS(f"[OK]   {label}"))
+                for sql, plan in plans:
+                    if self._scans(plan, marker, tables) or options["verbosity"] > 1:
+                        self.stdout.write(f"       {sql}")
+                        for line in plan.splitlines():
+                            self.stdout.write(f"         {line}")
+
+            # Solo se lee; el rol CLIENTE creado para el chequeo no debe quedar
+            transaction.set_rollback(True)
+        # El snapshot de roles se armó sin cache y con el rol revertido
+        RoleRegistry.reset()
+
+        self.stdout.write("")
+        if flagged:
+            message = f"{len(flagged)} consulta(s) con recorrido secuencial o sin consultas: {', '.join(flagged)}"
+            if options["strict"]:
+                raise CommandError(message)
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS("Todas las consultas usan índices"))
@@ -0,0 +1,74 @@
+import json
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Levanta un servidor local que imita /siteverify de hCaptcha para pruebas "
+        "de carga. Usar con HCAPTCHA_VERIFY_URL=http://127.0.0.1:<port>/siteverify"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8001)
+        parser.add_argument(
+            "--latency", type=int, default=0,
+            help="Latencia simulada en milisegundos",
+        )
+        parser.add_argument(
+            "--error-rate", type=float, default=0.0,
+            help="Fracción de respuestas 503 (0.0 - 1.0)",
+        )
+
+    def handle(self, *args, **options):
+        latency = options["latency"] / 1000
+        error_rate = options["error_rate"]
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, como el servicio real
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                data = parse_qs(self.rfile.read(length).decode())
+                if latency:
+                    time.sleep(latency)
+
+                if random.random() < error_rate:
+                    self._send(503, {"success": False})
+                    return
+
+                # El token "fail" simula un captcha inválido
+                token = data.get("response", [""])[0]
+                success = bool(token) and token != "fail"
+                payload = {"success": success}
+                if not success:
+                    payload["error-codes"] = ["invalid-input-response"]
+                self._send(200, payload)
+
+            def _send(self, status, payload):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((options["host"], options["port"]), Handler)
+        self.stdout.write(self.style.SUCCESS(
+            f"hCaptcha falso en http://{options['host']}:{options['port']}/siteverify "
+            f"(latencia {options['latency']}ms, errores {error_rate:.0%})"
+        ))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
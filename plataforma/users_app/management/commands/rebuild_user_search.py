@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from users_app.services.user_search_service import UserSearchService
+
+
+class Command(BaseCommand):
+    help = (
+        "Regenera el índice de búsqueda de usuarios (FTS5 en SQLite) desde la tabla "
+        "usuarios; útil tras cargas masivas o escrituras que no pasan por save()"
+    )
+
+    def handle(self, *args, **options):
+        backend = UserSearchService.get_backend()
+        start_time = time.perf_counter()
+        with transaction.atomic():
+            indexed = UserSearchService.rebuild()
+        elapsed = time.perf_counter() - start_time
+        self.stdout.write(self.style.SUCCESS(
+            f"Backend {backend.name}: {indexed} usuarios indexados en {elapsed:.2f}s"
+        ))
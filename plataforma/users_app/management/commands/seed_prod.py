@@ -1,7 +1,9 @@
 from django.core.management.base import BaseCommand
 from django.contrib.auth.hashers import make_password
 from django.db import transaction
-from users_app.models import Role, User
+from config.permissions import DEFAULT_MODULE_ROLES
+from users_app.models import Role, RolePermission, User
+from users_app.services.role_registry import PERMISSION_BITS, RoleRegistry
 
 class Command(BaseCommand):
     help = "Inserta roles y usuario inicial para Producción"
@@ -17,6 +19,16 @@ class Command(BaseCommand):
                     role_objs[role_name] = role
                 self.stdout.write(self.style.SUCCESS("Roles creados/verificados."))
 
+                # Permisos por defecto de los módulos restringidos
+                for module, role_names in DEFAULT_MODULE_ROLES.items():
+                    for role_name in role_names:
+                        RolePermission.objects.get_or_create(
+                            role=role_objs[role_name],
+                            module=module,
+                            defaults={field: True for field in PERMISSION_BITS},
+                        )
+                self.stdout.write(self.style.SUCCESS("Permisos creados/verificados."))
+
                 # Usuario inicial
                 role_admin = role_objs["ADMIN"]
                 user, created = User.objects.get_or_create(
@@ -39,4 +51,5 @@ class Command(BaseCommand):
             self.stdout.write(self.style.ERROR(f"Error en el seeder de producción: {e}"))
             raise e
 
+        RoleRegistry.invalidate()
         self.stdout.write(self.style.SUCCESS("Seed de Producción completado."))
@@ -0,0 +1,72 @@
+import logging
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from users_app.services.email_outbox_service import EmailOutboxService
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Worker que envía los correos encolados en correos_salida (2FA primero)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once", action="store_true",
+            help="Procesa los correos pendientes y termina",
+        )
+        parser.add_argument("--batch-size", type=int, default=settings.EMAIL_OUTBOX_BATCH_SIZE)
+        parser.add_argument(
+            "--poll-interval", type=float, default=settings.EMAIL_OUTBOX_POLL_INTERVAL,
+            help="Segundos entre consultas cuando la cola está vacía",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        poll_interval = options["poll_interval"]
+
+        # Una sola conexión SMTP para todos los lotes; se cierra tras un
+        # periodo sin correos para no mantenerla abierta indefinidamente
+        connection = EmailOutboxService.get_connection()
+        idle_since = None
+        total_sent = total_failed = 0
+
+        self.stdout.write(self.style.SUCCESS("Worker de correos iniciado."))
+        try:
+            while True:
+                close_old_connections()
+                try:
+                    sent, failed = EmailOutboxService.send_batch(connection, batch_size)
+                except Exception as e:
+                    logger.error(f"Error procesando la cola de correos: {e}")
+                    connection.close()
+                    if options["once"]:
+                        raise
+                    time.sleep(settings.EMAIL_OUTBOX_RETRY_BASE)
+                    continue
+
+                total_sent += sent
+                total_failed += failed
+                if sent or failed:
+                    idle_since = None
+                    if sent + failed >= batch_size:
+                        continue
+                elif idle_since is None:
+                    idle_since = time.monotonic()
+                elif time.monotonic() - idle_since > settings.EMAIL_OUTBOX_IDLE_CLOSE:
+                    connection.close()
+
+                if options["once"]:
+                    break
+                time.sleep(poll_interval)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            connection.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Correos enviados: {total_sent}, con error: {total_failed}."
+        ))
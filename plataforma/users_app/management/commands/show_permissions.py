@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from config.permissions import MODULE, compile_permission_table
+from users_app.services.role_registry import RoleRegistry
+
+
+class Command(BaseCommand):
+    help = "Muestra la tabla de permisos por ruta que usa role_module_permission_middleware"
+
+    def handle(self, *args, **kwargs):
+        table = compile_permission_table()
+
+        header = f"{'URL NAME':<36} {'TIPO':<14} {'MODULO':<20} {'ACCION':<8} {'PERMISO':<11} ROLES"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+
+        for name in sorted(table):
+            route = table[name]
+            if route.kind == MODULE:
+                roles = ", ".join(sorted(
+                    role.name
+                    for role in RoleRegistry.roles_with_permission(route.module, route.permission)
+                ))
+            else:
+                roles = "-"
+            self.stdout.write(
+                f"{name:<36} {route.kind:<14} {route.module or '-':<20} "
+                f"{route.action or '-':<8} {route.permission or '-':<11} {roles or '(ninguno)'}"
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"{len(table)} rutas compiladas."))
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.5 on 2026-10-18 08:31
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+# Permisos que antes estaban fijos en MODULE_ROLES del middleware
+DEFAULT_MODULE_ROLES = {
+    "users_admin": ["ADMIN"],
+    "roles_admin": ["ADMIN"],
+    "customers_seller": ["ADMIN"],
+}
+
+
+def seed_default_permissions(apps, schema_editor):
+    Role = apps.get_model("users_app", "Role")
+    RolePermission = apps.get_model("users_app", "RolePermission")
+    for module, role_names in DEFAULT_MODULE_ROLES.items():
+        for role in Role.objects.filter(name__in=role_names):
+            RolePermission.objects.get_or_create(
+                role=role,
+                module=module,
+                defaults={
+                    "can_read": True,
+                    "can_create": True,
+                    "can_update": True,
+                    "can_delete": True,
+                },
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RolePermission',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('module', models.CharField(db_column='modulo', max_length=50)),
+                ('can_read', models.BooleanField(default=False)),
+                ('can_create', models.BooleanField(default=False)),
+                ('can_update', models.BooleanField(default=False)),
+                ('can_delete', models.BooleanField(default=False)),
+                ('role', models.ForeignKey(db_column='id_rol', on_delete=django.db.models.deletion.CASCADE, related_name='permissions', to='users_app.role')),
+            ],
+            options={
+                'db_table': 'roles_permisos',
+                'constraints': [models.UniqueConstraint(fields=('role', 'module'), name='unique_role_module')],
+            },
+        ),
+        migrations.RunPython(seed_default_permissions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.5 on 2026-10-18 08:37
+
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users_app', '0002_role_permission'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmailOutbox',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('to_email', models.EmailField(db_column='destinatario', max_length=254)),
+                ('subject', models.CharField(db_column='asunto', max_length=255)),
+                ('body_text', models.TextField()),
+                ('body_html', models.TextField(blank=True, default='')),
+                ('priority', models.PositiveSmallIntegerField(choices=[(0, '2FA'), (10, 'Verificación'), (20, 'Normal')], db_column='prioridad', default=20)),
+                ('estado', models.CharField(choices=[('PENDIENTE', 'Pendiente'), ('ENVIADO', 'Enviado'), ('FALLIDO', 'Fallido')], default='PENDIENTE', max_length=20)),
+                ('attempts', models.PositiveSmallIntegerField(db_column='intentos', default=0)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('created_date', models.DateTimeField(auto_now_add=True, db_column='fecha_registro')),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'correos_salida',
+                'indexes': [models.Index(fields=['estado', 'priority', 'next_attempt_at'], name='outbox_pending_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 08:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users_app', '0003_email_outbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sessionuser',
+            name='location',
+            field=models.CharField(blank=True, db_column='ubicacion', default='', max_length=150),
+        ),
+    ]
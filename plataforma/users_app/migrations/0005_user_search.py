@@ -0,0 +1,76 @@
+from django.db import DatabaseError, migrations, transaction
+
+
+POSTGRES_INDEXES = (
+    ("usuarios_nombre_trgm", "nombre"),
+    ("usuarios_apellido_trgm", "last_name"),
+    ("usuarios_email_trgm", "email"),
+)
+
+SQLITE_TABLES = (
+    "CREATE TABLE usuarios_busqueda ("
+    "id INTEGER PRIMARY KEY, user_id char(32) NOT NULL UNIQUE)",
+    "CREATE VIRTUAL TABLE usuarios_fts USING fts5("
+    "nombre, apellido, email, tokenize = 'trigram')",
+)
+
+SQLITE_BACKFILL = (
+    "INSERT INTO usuarios_busqueda (user_id) SELECT id FROM usuarios",
+    "INSERT INTO usuarios_fts (rowid, nombre, apellido, email) "
+    "SELECT b.id, u.nombre, u.last_name, u.email "
+    "FROM usuarios_busqueda b JOIN usuarios u ON u.id = b.user_id",
+)
+
+
+def create_search_index(apps, schema_editor):
+    """
+    Postgres: pg_trgm + GIN sobre UPPER(columna), la expresión que genera
+    icontains. SQLite: tabla FTS5 trigram. Si la base no lo soporta (sin
+    permisos para la extensión, SQLite < 3.34) se omite y la búsqueda queda
+    con icontains.
+    """
+    connection = schema_editor.connection
+
+    if connection.vendor == "postgresql":
+        try:
+            with transaction.atomic(using=connection.alias):
+                schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        except DatabaseError:
+            return
+        for name, column in POSTGRES_INDEXES:
+            schema_editor.execute(
+                f'CREATE INDEX IF NOT EXISTS {name} ON usuarios '
+                f'USING gin (UPPER("{column}"::text) gin_trgm_ops)'
+            )
+
+    elif connection.vendor == "sqlite":
+        try:
+            with transaction.atomic(using=connection.alias):
+                for statement in SQLITE_TABLES:
+                    schema_editor.execute(statement)
+        except DatabaseError:
+            return
+        for statement in SQLITE_BACKFILL:
+            schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+
+    if connection.vendor == "postgresql":
+        for name, _ in POSTGRES_INDEXES:
+            schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+    elif connection.vendor == "sqlite":
+        schema_editor.execute("DROP TABLE IF EXISTS usuarios_fts")
+        schema_editor.execute("DROP TABLE IF EXISTS usuarios_busqueda")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users_app', '0004_session_location'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.5 on 2026-10-18 09:10
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+# En Postgres el índice LOWER(campo) con la collation por defecto no sirve para
+# LIKE 'prefijo%'; se agrega una variante text_pattern_ops
+POSTGRES_PATTERN_INDEXES = (
+    ("usuarios_email_prefix_idx", "email"),
+    ("usuarios_nombre_prefix_idx", "nombre"),
+    ("usuarios_apellido_prefix_idx", "last_name"),
+)
+
+
+def create_pattern_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, column in POSTGRES_PATTERN_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON usuarios (LOWER("{column}") text_pattern_ops)'
+        )
+
+
+def drop_pattern_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, _ in POSTGRES_PATTERN_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users_app', '0005_user_search'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(django.db.models.functions.text.Lower('email'), name='usuarios_email_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(django.db.models.functions.text.Lower('first_name'), name='usuarios_nombre_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(django.db.models.functions.text.Lower('last_name'), name='usuarios_apellido_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(models.F('current_role'), django.db.models.functions.text.Lower('email'), name='usuarios_rol_email_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(models.F('current_role'), django.db.models.functions.text.Lower('first_name'), name='usuarios_rol_nombre_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(models.F('current_role'), django.db.models.functions.text.Lower('last_name'), name='usuarios_rol_apellido_idx'),
+        ),
+        migrations.RunPython(create_pattern_indexes, drop_pattern_indexes),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.5 on 2026-10-18 09:14
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users_app', '0006_user_prefix_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='logblockeduser',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='loginincorrect',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='sessionuser',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='current_role',
+            field=models.ForeignKey(blank=True, db_column='id_rol', db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, to='users_app.role'),
+        ),
+        migrations.AddIndex(
+            model_name='logblockeduser',
+            index=models.Index(fields=['user', 'is_login_attempt', 'is_active', 'login_time'], name='bloqueos_usuario_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='logblockeduser',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['user', 'is_login_attempt', 'login_time'], name='bloqueos_activos_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='loginincorrect',
+            index=models.Index(fields=['user', 'login_time'], name='intentos_usuario_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sessionuser',
+            index=models.Index(fields=['user', 'login_time'], name='sesiones_usuario_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['estado', 'id'], name='usuarios_estado_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['current_role', 'id'], name='usuarios_rol_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['current_role', 'estado', 'id'], name='usuarios_rol_estado_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['username'], name='usuarios_username_idx'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.5 on 2026-10-18 09:15
+
+import users_app.ids
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users_app', '0007_hot_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='user',
+            options={'ordering': ['created_date', 'id']},
+        ),
+        # El default de la PK solo se usa en Python: no hay nada que cambiar
+        # en la base y los ids existentes (uuid4) se conservan. Sin esto,
+        # SQLite reconstruiría cada tabla para un cambio que no la afecta.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='logblockeduser',
+                    name='id',
+                    field=models.UUIDField(default=users_app.ids.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+                migrations.AlterField(
+                    model_name='loginincorrect',
+                    name='id',
+                    field=models.UUIDField(default=users_app.ids.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+                migrations.AlterField(
+                    model_name='sessionuser',
+                    name='id',
+                    field=models.UUIDField(default=users_app.ids.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+                migrations.AlterField(
+                    model_name='user',
+                    name='id',
+                    field=models.UUIDField(default=users_app.ids.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['created_date', 'id'], name='usuarios_registro_idx'),
+        ),
+    ]
@@ -0,0 +1,126 @@
+# Generated by Django 5.2.5 on 2026-10-18 09:47
+
+from django.db import migrations, models
+
+
+# Los índices text_pattern_ops de 0006 pasan a las columnas en minúsculas
+POSTGRES_PATTERN_INDEXES = (
+    ("usuarios_email_prefix_idx", "email", "email_lower"),
+    ("usuarios_nombre_prefix_idx", "nombre", "first_name_lower"),
+    ("usuarios_apellido_prefix_idx", "last_name", "last_name_lower"),
+)
+
+LOWERCASE_FIELDS = {
+    "email": "email_lower",
+    "first_name": "first_name_lower",
+    "last_name": "last_name_lower",
+}
+
+
+def fill_lowercase_columns(apps, schema_editor):
+    # Mismo str.lower que User.save(); el modelo histórico no tiene ese save()
+    User = apps.get_model("users_app", "User")
+    batch = []
+    for user in User.objects.only(*LOWERCASE_FIELDS).iterator(chunk_size=2000):
+        for field, lower_field in LOWERCASE_FIELDS.items():
+            setattr(user, lower_field, (getattr(user, field) or "").lower())
+        batch.append(user)
+        if len(batch) >= 2000:
+            User.objects.bulk_update(batch, list(LOWERCASE_FIELDS.values()))
+            batch = []
+    if batch:
+        User.objects.bulk_update(batch, list(LOWERCASE_FIELDS.values()))
+
+
+def move_pattern_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, _, column in POSTGRES_PATTERN_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+        schema_editor.execute(f'CREATE INDEX {name} ON usuarios ("{column}" varchar_pattern_ops)')
+
+
+def restore_pattern_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, column, _ in POSTGRES_PATTERN_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+        schema_editor.execute(
+            f'CREATE INDEX {name} ON usuarios (LOWER("{column}") text_pattern_ops)'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users_app', '0009_email_outbox_lease'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='user',
+            name='usuarios_email_lower_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='user',
+            name='usuarios_nombre_lower_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='user',
+            name='usuarios_apellido_lower_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='user',
+            name='usuarios_rol_email_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='user',
+            name='usuarios_rol_nombre_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='user',
+            name='usuarios_rol_apellido_idx',
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='email_lower',
+            field=models.CharField(blank=True, default='', editable=False, max_length=150),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='first_name_lower',
+            field=models.CharField(blank=True, default='', editable=False, max_length=150),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='last_name_lower',
+            field=models.CharField(blank=True, default='', editable=False, max_length=150),
+        ),
+        migrations.RunPython(fill_lowercase_columns, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['email_lower'], name='usuarios_email_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['first_name_lower'], name='usuarios_nombre_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['last_name_lower'], name='usuarios_apellido_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['current_role', 'email_lower'], name='usuarios_rol_email_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['current_role', 'first_name_lower'], name='usuarios_rol_nombre_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['current_role', 'last_name_lower'], name='usuarios_rol_apellido_idx'),
+        ),
+        migrations.RunPython(move_pattern_indexes, restore_pattern_indexes),
+    ]
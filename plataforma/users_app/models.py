@@ -1,9 +1,11 @@
 import uuid
 from django.db import models
+from django.db.models import Q
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
 from django.utils import timezone
 from django.contrib.auth.validators import UnicodeUsernameValidator
 
+from users_app.ids import uuid7
 from users_app.managers import UserManager
 
 # En users_app/models.py
@@ -21,8 +23,31 @@ class Role(models.Model):
         return self.name
 
 
-class User(AbstractBaseUser, PermissionsMixin):
+class RolePermission(models.Model):
+    """Permisos CRUD de un rol sobre un módulo (p.ej. "users_admin")."""
+
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    role = models.ForeignKey(
+        Role, on_delete=models.CASCADE, related_name="permissions", db_column="id_rol"
+    )
+    module = models.CharField(max_length=50, db_column="modulo")
+    can_read = models.BooleanField(default=False)
+    can_create = models.BooleanField(default=False)
+    can_update = models.BooleanField(default=False)
+    can_delete = models.BooleanField(default=False)
+
+    class Meta:
+        db_table = "roles_permisos"
+        constraints = [
+            models.UniqueConstraint(fields=["role", "module"], name="unique_role_module"),
+        ]
+
+    def __str__(self):
+        return f"{self.role} - {self.module}"
+
+
+class User(AbstractBaseUser, PermissionsMixin):
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     email = models.EmailField(
         ("email"),
         max_length=150,
@@ -81,6 +106,8 @@ class User(AbstractBaseUser, PermissionsMixin):
         null=True,
         blank=True,
         db_column="id_rol",
+        # Lo cubren los índices compuestos que empiezan por el rol (Meta.indexes)
+        db_index=False,
     )
 
     is_superuser = models.BooleanField(("superuser status"), default=False)
@@ -88,38 +115,172 @@ class User(AbstractBaseUser, PermissionsMixin):
     antispam = models.PositiveIntegerField(default=60)
     user_keys = models.PositiveIntegerField(default=0)
 
+    # Copias en minúsculas (str.lower de Python) para el autocompletado por
+    # prefijo: LOWER() de SQLite solo pasa a minúsculas letras ASCII
+    email_lower = models.CharField(max_length=150, blank=True, default="", editable=False)
+    first_name_lower = models.CharField(max_length=150, blank=True, default="", editable=False)
+    last_name_lower = models.CharField(max_length=150, blank=True, default="", editable=False)
+
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = ["username"]
 
     objects = UserManager()
 
     class Meta:
-        ordering = ["id"]
+        # Orden de registro: los ids uuid7 ya son crecientes, pero los usuarios
+        # anteriores conservan su uuid4 aleatorio
+        ordering = ["created_date", "id"]
         db_table = "usuarios"
+        indexes = [
+            models.Index(fields=["created_date", "id"], name="usuarios_registro_idx"),
+            # Autocompletado por prefijo (UserAutocompleteService): sin rol
+            # para administración y con rol delante para clientes
+            models.Index(fields=["email_lower"], name="usuarios_email_lower_idx"),
+            models.Index(fields=["first_name_lower"], name="usuarios_nombre_lower_idx"),
+            models.Index(fields=["last_name_lower"], name="usuarios_apellido_lower_idx"),
+            models.Index(fields=["current_role", "email_lower"], name="usuarios_rol_email_idx"),
+            models.Index(fields=["current_role", "first_name_lower"], name="usuarios_rol_nombre_idx"),
+            models.Index(fields=["current_role", "last_name_lower"], name="usuarios_rol_apellido_idx"),
+            # Listados filtrados por estado y/o rol, paginados en orden de id
+            models.Index(fields=["estado", "id"], name="usuarios_estado_idx"),
+            models.Index(fields=["current_role", "id"], name="usuarios_rol_idx"),
+            models.Index(fields=["current_role", "estado", "id"], name="usuarios_rol_estado_idx"),
+            # Validación de username repetido en los formularios
+            models.Index(fields=["username"], name="usuarios_username_idx"),
+        ]
 
     def __str__(self):
         return f"Usuario: {self.first_name} {self.last_name}"
 
+    # Campo original -> copia en minúsculas
+    LOWERCASE_FIELDS = {
+        "email": "email_lower",
+        "first_name": "first_name_lower",
+        "last_name": "last_name_lower",
+    }
+
+    def fill_lowercase_fields(self):
+        for field, lower_field in self.LOWERCASE_FIELDS.items():
+            setattr(self, lower_field, (getattr(self, field) or "").lower())
+
+    def save(self, *args, update_fields=None, **kwargs):
+        self.fill_lowercase_fields()
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            update_fields.update(
+                self.LOWERCASE_FIELDS[field] for field in self.LOWERCASE_FIELDS if field in update_fields
+            )
+        super().save(*args, update_fields=update_fields, **kwargs)
+
+    def get_session_auth_hash(self):
+        # UserSnapshotService no guarda la contraseña sino este hash; se usa
+        # mientras la contraseña siga sin cargarse (campo diferido)
+        snapshot_hash = self.__dict__.get("_snapshot_auth_hash")
+        if snapshot_hash and "password" not in self.__dict__:
+            return snapshot_hash
+        return super().get_session_auth_hash()
+
 
 class SessionUser(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
     login_time = models.DateTimeField(auto_now_add=True)
     user_agent = models.CharField(max_length=255, blank=True, null=True)
     ip_address = models.GenericIPAddressField(blank=True, null=True)
+    location = models.CharField(max_length=150, blank=True, default="", db_column="ubicacion")
+
+    class Meta:
+        indexes = [
+            # Última sesión e IPs recientes del usuario (SessionService, LoginRiskService)
+            models.Index(fields=["user", "login_time"], name="sesiones_usuario_idx"),
+        ]
 
 
 class LogBlockedUser(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
     ip_address = models.GenericIPAddressField(blank=True, null=True)
     is_login_attempt = models.BooleanField(default=False)
     is_active = models.BooleanField(default=True)
     login_time = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Último reinicio del contador (helpers.get_last_reset_or_24h). Django
+            # compila los booleanos como expresión ("NOT is_active") y SQLite solo
+            # aprovecha el prefijo user; Postgres y MySQL usan las cuatro columnas
+            models.Index(
+                fields=["user", "is_login_attempt", "is_active", "login_time"],
+                name="bloqueos_usuario_idx",
+            ),
+            # Bloqueo vigente, consultado en cada login; solo filas activas.
+            # En bases sin índices parciales (MySQL) se omite y sirve el anterior
+            models.Index(
+                fields=["user", "is_login_attempt", "login_time"],
+                condition=Q(is_active=True),
+                name="bloqueos_activos_idx",
+            ),
+        ]
+
 
 class LoginIncorrect(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
     ip_address = models.GenericIPAddressField(blank=True, null=True)
     login_time = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Intentos fallidos dentro de la ventana (LoginRiskService)
+            models.Index(fields=["user", "login_time"], name="intentos_usuario_idx"),
+        ]
+
+
+class EmailOutbox(models.Model):
+    """
+    Correo pendiente de envío. Las vistas solo encolan; el comando
+    send_outbox los envía por lotes en orden de prioridad.
+    """
+
+    PRIORIDAD_2FA = 0
+    PRIORIDAD_VERIFICACION = 10
+    PRIORIDAD_NORMAL = 20
+    PRIORIDAD_CHOICES = [
+        (PRIORIDAD_2FA, "2FA"),
+        (PRIORIDAD_VERIFICACION, "Verificación"),
+        (PRIORIDAD_NORMAL, "Normal"),
+    ]
+
+    ESTADO_CHOICES = [
+        ("PENDIENTE", "Pendiente"),
+        ("ENVIANDO", "Enviando"),
+        ("ENVIADO", "Enviado"),
+        ("FALLIDO", "Fallido"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    to_email = models.EmailField(db_column="destinatario")
+    subject = models.CharField(max_length=255, db_column="asunto")
+    body_text = models.TextField()
+    body_html = models.TextField(blank=True, default="")
+    priority = models.PositiveSmallIntegerField(
+        choices=PRIORIDAD_CHOICES, default=PRIORIDAD_NORMAL, db_column="prioridad"
+    )
+    estado = models.CharField(max_length=20, choices=ESTADO_CHOICES, default="PENDIENTE")
+    attempts = models.PositiveSmallIntegerField(default=0, db_column="intentos")
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default="")
+    created_date = models.DateTimeField(auto_now_add=True, db_column="fecha_registro")
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "correos_salida"
+        indexes = [
+            models.Index(
+                fields=["estado", "priority", "next_attempt_at"],
+                name="outbox_pending_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.to_email} ({self.estado})"
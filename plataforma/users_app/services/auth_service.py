@@ -1,25 +1,20 @@
 import logging
 from django.forms import ValidationError
-import requests
-from django.conf import settings
 from django.utils import timezone
 from django.shortcuts import redirect
 from django.contrib.auth import login as auth_login, logout
 
-from users_app.services.email_service import send_verification_code, send_2fa_code
+from users_app.services.email_service import send_verification_code, send_2fa_code, VERIFY_CODE_TIMEOUT
 from users_app.forms.users_form import UserRegistrationForm
-from users_app.models import User, SessionUser, LogBlockedUser, LoginIncorrect
+from users_app.models import User
+from users_app.services.session_service import SessionService
+from users_app.services.hcaptcha_service import get_hcaptcha_verifier
+from users_app.services.login_risk_service import LoginRiskTracker
+from users_app.services.pending_registration_service import PendingRegistrationService
+from users_app.services.trusted_device_service import TrustedDeviceService
 from users_app.forms.login_form import LoginForm
 from config.utils import create_decrypted_data
 
-# helpers
-from users_app.services.helpers import (
-    has_logged_incorrect_too_many_times,
-    get_remaining_block_time,
-    has_logged_in_multiple_ips,
-    exists_login_block_record,
-)
-
 logger = logging.getLogger(__name__)
 
 
@@ -48,7 +43,7 @@ def authenticate_user(request):
     ip_address = form.cleaned_data["ip_address"]
 
     try:
-        user = User.objects.get(email=email)
+        user = User.objects.get_by_natural_key(email)
 
         # --- Validaciones de estado ---
         if not user.is_active:
@@ -60,34 +55,24 @@ def authenticate_user(request):
             return False
 
         if getattr(user, "is_enable_bloked", False):
-            if has_logged_incorrect_too_many_times(user.id):
-                remaining = get_remaining_block_time(user.id)
+            risk = LoginRiskTracker.get_state(user.id)
+            if LoginRiskTracker.is_locked_out(risk):
+                remaining = LoginRiskTracker.remaining_block_time(risk)
                 hours = remaining.total_seconds() // 3600
                 minutes = (remaining.total_seconds() % 3600) // 60
 
-                if not exists_login_block_record(user.id, is_login_attempt=True):
-                    LogBlockedUser.objects.create(
-                        user=user,
-                        ip_address=ip_address,
-                        is_login_attempt=True,
-                        is_active=True,
-                    )
+                LoginRiskTracker.record_lockout(user, ip_address, risk)
 
                 request.session["errors"] = {
                     "__all__": f"Has excedido los intentos. Intenta nuevamente en {int(hours)}h {int(minutes)}m."
                 }
                 return False
 
-            if has_logged_in_multiple_ips(user.id):
+            if LoginRiskTracker.has_multiple_ips(risk):
                 user.estado = "BANEADO"
                 user.save()
 
-                LogBlockedUser.objects.create(
-                    user=user,
-                    ip_address=ip_address,
-                    is_login_attempt=False,
-                    is_active=True,
-                )
+                LoginRiskTracker.record_ban(user, ip_address)
                 logger.warning(f"Usuario {user.email} baneado por múltiples IPs.")
                 request.session["errors"] = {
                     "__all__": "Tu cuenta ha sido baneada por actividad sospechosa."
@@ -95,22 +80,32 @@ def authenticate_user(request):
                 return False
         # --- Validación de contraseña ---
         if user.check_password(password):
+            user_agent = request.META.get("HTTP_USER_AGENT", "")[:255]
+
+            # Dispositivo de confianza (2FA ya verificado antes): login directo
+            if TrustedDeviceService.is_trusted(request, user):
+                session_user = SessionService.register_login(user, ip_address, user_agent)
+                request.session["session_user_id"] = str(session_user.id)
+                auth_login(request, user)
+                logger.info(f"Login desde dispositivo de confianza: {user.email} desde {ip_address}")
+                return True
+
             # En lugar de hacer login directo, guardamos info en sesión y enviamos código 2FA
             request.session['pending_2fa_user_email'] = user.email
             request.session['pending_2fa_ip'] = ip_address
-            request.session['pending_2fa_user_agent'] = request.META.get("HTTP_USER_AGENT", "")[:255]
+            request.session['pending_2fa_user_agent'] = user_agent
             
             try:
-                # Enviar código 2FA
+                # Encolar código 2FA
                 send_2fa_code(request, user, ip_address)
-                logger.info(f"Código 2FA enviado a {user.email} desde {ip_address}")
+                logger.info(f"Código 2FA encolado para {user.email} desde {ip_address}")
                 return "2fa_required"  # Indicar que se necesita 2FA
             except Exception as e:
                 logger.error(f"Error enviando código 2FA a {user.email}: {e}")
                 request.session["errors"] = {"__all__": f"Error enviando código: {str(e)}"}
                 return False
         else:
-            LoginIncorrect.objects.create(user=user, ip_address=ip_address)
+            LoginRiskTracker.record_failure(user, ip_address)
             logger.info(f"Login Incorrecto: {user.email} desde {ip_address}")
             request.session["errors"] = {"__all__": "Correo o contraseña inválidos"}
             return False
@@ -125,9 +120,11 @@ def authenticate_user(request):
         return False
 
 
-def complete_2fa_login(request, code):
+def complete_2fa_login(request, code, remember_device=False):
     """
-    Completa el login después de verificar el código 2FA
+    Completa el login después de verificar el código 2FA. Con remember_device
+    (casilla "Recordar este dispositivo") se emite el token de dispositivo de
+    confianza.
     """
     # Obtener datos de la sesión
     email = request.session.get('pending_2fa_user_email')
@@ -139,22 +136,22 @@ def complete_2fa_login(request, code):
         return False, "Sesión expirada. Vuelve a iniciar sesión."
     
     try:
-        user = User.objects.get(email=email)
+        user = User.objects.get_by_natural_key(email)
         
         # Verificar código 2FA
         from users_app.services.email_service import verify_2fa_code
         if verify_2fa_code(user, code):
             # Crear sesión de usuario
-            session_user = SessionUser.objects.create(
-                user=user,
-                login_time=timezone.now(),
-                ip_address=ip_address,
-                user_agent=user_agent,
-            )
+            session_user = SessionService.register_login(user, ip_address, user_agent)
             request.session["session_user_id"] = str(session_user.id)
             
             # Hacer login
             auth_login(request, user)
+
+            # Recordar el dispositivo solo si el usuario lo pidió; la vista
+            # agrega la cookie a la respuesta
+            if remember_device and TrustedDeviceService.is_enabled():
+                request.trusted_device_token = TrustedDeviceService.issue(request, user)
             
             # Limpiar datos de 2FA de la sesión
             if 'pending_2fa_user_email' in request.session:
@@ -191,24 +188,25 @@ def register_user(data, request):
     if not success:
         raise ValidationError({'__all__': [error_message]})
     
-    # Crear usuario pero sin activar
+    # El usuario no se guarda todavía: queda pendiente en cache hasta
+    # verificar el correo (contraseña ya hasheada por el formulario)
     user = form.save(commit=False)
-    user.is_active = False  # Usuario inactivo hasta verificar email
-    user.save()
+    if not request.session.session_key:
+        request.session.save()
+    PendingRegistrationService.save(
+        user, timeout=VERIFY_CODE_TIMEOUT, owner=request.session.session_key
+    )
     
     # Guardar email en la sesión para el proceso de verificación
     request.session['pending_user_email'] = user.email
     
-    # Enviar código de verificación
+    # Encolar código de verificación. Si falla, puede pedir el reenvío desde
+    # la pantalla de verificación mientras el registro siga pendiente
     try:
         send_verification_code(request, user)
-        logger.info(f"Usuario registrado y código enviado a {user.email}")
+        logger.info(f"Registro pendiente y código encolado para {user.email}")
     except Exception as e:
-        logger.error(f"Error enviando código a {user.email}: {e}")
-        # En caso de error, eliminar el usuario creado
-        user.delete()
-        if 'pending_user_email' in request.session:
-            del request.session['pending_user_email']
+        logger.error(f"Error encolando código para {user.email}: {e}")
         raise ValidationError({"__all__": ["Error enviando código de verificación. Intente más tarde."]})
     
     return user
@@ -233,15 +231,21 @@ def complete_registration_verification(request, code):
     if not pending_email:
         return False, "Sesión expirada. Vuelve a registrarte."
         
-    try:
-        user = User.objects.get(email=pending_email)
+    pending = PendingRegistrationService.get(pending_email)
+    if pending is None:
+        return False, "El registro expiró. Vuelve a registrarte."
         
+    try:
         # Verificar código usando el servicio de email
         from users_app.services.email_service import verify_code
-        if verify_code(user, code):
-            # Código correcto - activar usuario
-            user.is_active = True
-            user.save()
+        if verify_code(PendingRegistrationService.build_user(pending), code):
+            # Código correcto - recién ahora se crea el usuario
+            try:
+                user = PendingRegistrationService.create_user(pending)
+            except ValidationError as e:
+                PendingRegistrationService.discard(pending_email)
+                return False, e.messages[0]
+            PendingRegistrationService.discard(pending_email)
             
             # Limpiar sesión
             if 'pending_user_email' in request.session:
@@ -254,8 +258,6 @@ def complete_registration_verification(request, code):
         else:
             return False, "Código incorrecto o expirado"
             
-    except User.DoesNotExist:
-        return False, "Usuario no encontrado"
     except Exception as e:
         logger.error(f"Error verificando código de registro: {e}")
         return False, "Error interno. Intente más tarde."
@@ -271,17 +273,19 @@ def resend_registration_code_service(request):
     if not pending_email:
         return False, "Sesión expirada. Vuelve a registrarte."
         
-    try:
-        user = User.objects.get(email=pending_email)
+    pending = PendingRegistrationService.get(pending_email)
+    if pending is None:
+        return False, "El registro expiró. Vuelve a registrarte."
         
+    try:
         from users_app.services.email_service import resend_verification_code
-        if resend_verification_code(request, user):
+        if resend_verification_code(request, PendingRegistrationService.build_user(pending)):
+            # Si se generó un código nuevo, el registro dura lo mismo que el código
+            PendingRegistrationService.touch(pending_email, timeout=VERIFY_CODE_TIMEOUT)
             return True, "Código reenviado exitosamente"
         else:
             return False, "Error reenviando código. Intente más tarde."
             
-    except User.DoesNotExist:
-        return False, "Usuario no encontrado"
     except Exception as e:
         logger.error(f"Error reenviando código de registro: {e}")
         return False, "Error interno. Intente más tarde."
@@ -299,7 +303,7 @@ def resend_2fa_code_service(request):
         return False, "Sesión expirada. Vuelve a iniciar sesión."
     
     try:
-        user = User.objects.get(email=pending_email)
+        user = User.objects.get_by_natural_key(pending_email)
         
         from users_app.services.email_service import resend_2fa_code
         if resend_2fa_code(request, user, ip_address):
@@ -315,15 +319,4 @@ def resend_2fa_code_service(request):
 
 
 def verify_hcaptcha(token: str):
-    try:
-        response = requests.post(
-            "https://hcaptcha.com/siteverify",
-            data={"secret": settings.HCAPTCHA_SECRET, "response": token},
-            timeout=5,
-        ).json()
-        if response.get("success"):
-            return True, None
-        return False, "Verificación Captcha fallida"
-    except requests.RequestException as e:
-        logger.error(f"Error verificando hCaptcha: {e}")
-        return False, "Error al verificar Captcha"
\ No newline at end of file
+    return get_hcaptcha_verifier().verify(token)
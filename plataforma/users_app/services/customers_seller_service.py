@@ -1,19 +1,28 @@
-from django.db.models import Q
 from users_app.forms.customer_update_form import CustomerUpdateForm
 from users_app.forms.customer_form import CustomerForm
+from users_app.services.listing_cache_service import ListingCacheService
 from users_app.services.pagination_service import PaginationService
-from users_app.models import User, Role
+from users_app.models import Role, User
+from users_app.services.role_registry import RoleRegistry
+from users_app.services.user_autocomplete_service import UserAutocompleteService
+from users_app.services.user_count_service import UserCountService
+from users_app.services.user_search_service import UserSearchService
+from django.conf import settings
 from django.core.exceptions import ValidationError
 
 
+# Columnas del listado (en el orden en que se desempaquetan las filas)
+LIST_FIELDS = ("id", "first_name", "last_name", "email", "current_role__name", "estado", "credits")
+
+
 class CustomerSellerService:
 
     @staticmethod
     def _get_cliente_role():
-        try:
-            return Role.objects.get(name__iexact="CLIENTE")
-        except Role.DoesNotExist:
+        role = RoleRegistry.get_by_name("CLIENTE")
+        if role is None:
             raise ValidationError({"role": ["El rol CLIENTE no existe en el sistema."]})
+        return role
 
     @staticmethod
     def create_customer(data):
@@ -30,7 +39,7 @@ class CustomerSellerService:
             raise ValidationError({"id": ["Usuario no encontrado."]})
 
         cliente_role = CustomerSellerService._get_cliente_role()
-        if not user.current_role or user.current_role != cliente_role:
+        if user.current_role_id != cliente_role.id_rol:
             raise ValidationError({"id": ["Usuario no autorizado."]})
 
         if not data.get("password"):
@@ -47,7 +56,7 @@ class CustomerSellerService:
         try:
             user = User.objects.get(id=user_id)
             cliente_role = CustomerSellerService._get_cliente_role()
-            if not user.current_role or user.current_role != cliente_role:
+            if user.current_role_id != cliente_role.id_rol:
                 raise ValidationError({"id": ["Usuario no autorizado."]})
             user.delete()
         except User.DoesNotExist:
@@ -61,7 +70,7 @@ class CustomerSellerService:
             raise ValidationError({"id": ["Usuario no encontrado."]})
 
         cliente_role = CustomerSellerService._get_cliente_role()
-        if not user.current_role or user.current_role != cliente_role:
+        if user.current_role_id != cliente_role.id_rol:
             raise ValidationError({"id": ["Usuario no autorizado."]})
 
         return {
@@ -74,58 +83,106 @@ class CustomerSellerService:
             "phone_number": user.phone_number,
             "estado": user.estado,
             "is_superuser": user.is_superuser,
-            "current_rank": str(user.current_rank.id) if user.current_rank else None,
-            "current_role": str(user.current_role.id_rol) if user.current_role else None,
+            "current_rank": None,  # aún no existe un modelo de rangos
+            "current_role": str(user.current_role_id) if user.current_role_id else None,
         }
 
     @staticmethod
     def get_customers_for_frontend(params):
-        page = int(params.get("page", 1))
-        per_page = int(params.get("per_page", 10))
+        per_page = PaginationService.get_per_page(params)
         search = params.get("search", "")
-        sort_by = params.get("sort_by", "id")
+        sort_by = params.get("sort_by", "")
         sort_direction = params.get("sort_direction", "asc")
         estado = params.get("status", "")
 
+        allowed_sort_fields = ["id", "first_name", "email", "estado"]
+        if sort_by not in allowed_sort_fields:
+            sort_by = ""
+
         cliente_role = CustomerSellerService._get_cliente_role()
+
+        # Mismo resultado para los mismos filtros hasta que cambie un usuario o un rol
+        paginated = ListingCacheService.get_or_set(
+            "customers_seller",
+            {
+                "search": search,
+                "status": estado,
+                "sort_by": sort_by,
+                "sort_direction": sort_direction,
+                "per_page": per_page,
+                **PaginationService.get_position(params),
+            },
+            lambda: CustomerSellerService._get_customers_page(
+                params, search, sort_by, sort_direction, estado, cliente_role
+            ),
+            timeout=settings.LISTING_CACHE_TIMEOUT,
+            models=(User, Role),
+        )
+
+        # Fuera del cache: devuelve los filtros tal como llegaron (la clave ignora mayúsculas)
+        paginated["filters"] = {
+            "search": search,
+            "per_page": per_page,
+            "sort_by": sort_by,
+            "sort_direction": sort_direction,
+            "estado": estado,
+        }
+
+        return paginated
+
+    @staticmethod
+    def _get_customers_page(params, search, sort_by, sort_direction, estado, cliente_role):
         qs = User.objects.filter(current_role=cliente_role)
 
+        rank_field = None
         if search:
-            qs = qs.filter(
-                Q(first_name__icontains=search)
-                | Q(last_name__icontains=search)
-                | Q(email__icontains=search)
-            )
+            qs, rank_field = UserSearchService.search(qs, search)
+        facets = UserCountService.facets(
+            "customers_seller", qs, search=search, role_id=cliente_role.id_rol, estado=estado
+        )
         if estado:
             qs = qs.filter(estado=estado)
 
-        allowed_sort_fields = ["id", "first_name", "email", "estado"]
-        if sort_by not in allowed_sort_fields:
-            sort_by = "id"
-        order = f"{'-' if sort_direction == 'desc' else ''}{sort_by}"
-        qs = qs.order_by(order)
-
-        paginated = PaginationService.paginate_queryset(qs, page, per_page)
+        sort_field = sort_by or "id"
+        descending = sort_direction == "desc"
+        unique_sort = False
+        # Sin orden explícito, los resultados de una búsqueda van por relevancia
+        if not sort_by and rank_field and not PaginationService.is_cursor_mode(params):
+            sort_field, descending = rank_field, True
+            unique_sort = UserSearchService.is_unique_rank(rank_field)
+
+        paginated = PaginationService.paginate(
+            qs,
+            params,
+            sort_field,
+            descending=descending,
+            unique_sort=unique_sort,
+            fields=LIST_FIELDS,
+            count=lambda queryset: UserCountService.count(
+                queryset, filtered=bool(search), role_id=cliente_role.id_rol, estado=estado
+            ),
+        )
 
         paginated["data"] = [
             {
-                "id": str(u.id),
-                "name": f"{u.first_name} {u.last_name}",
-                "email": u.email,
-                "role": u.current_role.name if u.current_role else "Sin rol",
-                "rank": u.current_rank.name if u.current_rank else "Sin rango",
-                "estado": u.estado,
-                "credits": u.credits,
+                "id": str(user_id),
+                "name": f"{first_name} {last_name}",
+                "email": email,
+                "role": role_name or "Sin rol",
+                "rank": "Sin rango",
+                "estado": estado,
+                "credits": credits,
             }
-            for u in paginated["data"]
+            for user_id, first_name, last_name, email, role_name, estado, credits in paginated["data"]
         ]
 
-        paginated["filters"] = {
-            "search": search,
-            "per_page": per_page,
-            "sort_by": sort_by,
-            "sort_direction": sort_direction,
-            "estado": estado,
-        }
+        paginated["facets"] = facets
 
-        return paginated
\ No newline at end of file
+        return paginated
+
+    @staticmethod
+    def autocomplete(term):
+        cliente_role = CustomerSellerService._get_cliente_role()
+        return UserAutocompleteService.suggest(
+            term, scope="customers_seller", role_id=cliente_role.id_rol
+        )
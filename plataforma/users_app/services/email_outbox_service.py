@@ -0,0 +1,143 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from users_app.models import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+
+class EmailOutboxService:
+    """
+    Cola durable de correos (tabla correos_salida). enqueue() se usa desde las
+    vistas y solo inserta una fila; send_batch() lo ejecuta el comando
+    send_outbox reutilizando una conexión SMTP abierta entre mensajes.
+    """
+
+    @staticmethod
+    def enqueue(to_email, subject, body_text, body_html="", priority=EmailOutbox.PRIORIDAD_NORMAL):
+        return EmailOutbox.objects.create(
+            to_email=to_email,
+            subject=subject,
+            body_text=body_text,
+            body_html=body_html,
+            priority=priority,
+        )
+
+    @staticmethod
+    def get_backoff(attempts):
+        """Espera exponencial antes del siguiente intento: base * 2^(n-1), con tope."""
+        delay = settings.EMAIL_OUTBOX_RETRY_BASE * (2 ** (attempts - 1))
+        return timedelta(seconds=min(delay, settings.EMAIL_OUTBOX_RETRY_MAX))
+
+    @staticmethod
+    def _build_message(item, connection):
+        message = EmailMultiAlternatives(
+            subject=item.subject,
+            body=item.body_text,
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[item.to_email],
+            connection=connection,
+        )
+        if item.body_html:
+            message.attach_alternative(item.body_html, "text/html")
+        return message
+
+    @staticmethod
+    def get_connection():
+        return get_connection(fail_silently=False)
+
+    @staticmethod
+    def claim(batch_size):
+        """
+        Reserva hasta batch_size correos vencidos, 2FA primero, en una
+        transacción corta: pasan a ENVIANDO con next_attempt_at como fin de la
+        reserva. Si el worker muere a mitad del lote, al vencer la reserva los
+        vuelve a tomar otro. Cada fila se reserva con un UPDATE condicionado a
+        su estado leído, así dos workers no toman la misma aunque el motor no
+        soporte SKIP LOCKED (SQLite).
+        """
+        now = timezone.now()
+        lease_until = now + timedelta(seconds=settings.EMAIL_OUTBOX_LEASE)
+        claimed = []
+        with transaction.atomic():
+            items = list(
+                EmailOutbox.objects.select_for_update(skip_locked=True)
+                .filter(estado__in=["PENDIENTE", "ENVIANDO"], next_attempt_at__lte=now)
+                .order_by("priority", "next_attempt_at")[:batch_size]
+            )
+            for item in items:
+                updated = EmailOutbox.objects.filter(
+                    pk=item.pk, estado=item.estado, next_attempt_at=item.next_attempt_at,
+                ).update(estado="ENVIANDO", next_attempt_at=lease_until)
+                if updated:
+                    item.estado = "ENVIANDO"
+                    item.next_attempt_at = lease_until
+                    claimed.append(item)
+        return claimed
+
+    @staticmethod
+    def release(items):
+        """Devuelve a la cola los correos reservados que no se llegaron a enviar."""
+        EmailOutbox.objects.filter(
+            pk__in=[item.pk for item in items], estado="ENVIANDO",
+        ).update(estado="PENDIENTE", next_attempt_at=timezone.now())
+
+    @staticmethod
+    def send_batch(connection, batch_size):
+        """
+        Envía un lote reservado con claim(). Los envíos SMTP ocurren fuera de
+        cualquier transacción y cada fila se actualiza por separado al
+        terminar. Al quedar ENVIADO o FALLIDO se borra el cuerpo (contiene el
+        código en claro). Retorna (enviados, fallidos).
+        """
+        sent = failed = 0
+        items = EmailOutboxService.claim(batch_size)
+        if not items:
+            return sent, failed
+
+        try:
+            connection.open()
+        except Exception:
+            EmailOutboxService.release(items)
+            raise
+
+        for index, item in enumerate(items):
+            try:
+                EmailOutboxService._build_message(item, connection).send()
+            except Exception as e:
+                failed += 1
+                item.attempts += 1
+                item.last_error = str(e)[:1000]
+                if item.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+                    item.estado = "FALLIDO"
+                    item.body_text = item.body_html = ""
+                    logger.error(f"Correo a {item.to_email} descartado tras {item.attempts} intentos: {e}")
+                else:
+                    item.estado = "PENDIENTE"
+                    item.next_attempt_at = timezone.now() + EmailOutboxService.get_backoff(item.attempts)
+                    logger.warning(f"Error enviando correo a {item.to_email} (intento {item.attempts}): {e}")
+                item.save(update_fields=[
+                    "attempts", "last_error", "estado", "next_attempt_at", "body_text", "body_html",
+                ])
+                # La conexión puede haber quedado inutilizable; se reabre y,
+                # si el servidor no responde, el resto vuelve a la cola
+                connection.close()
+                try:
+                    connection.open()
+                except Exception as e:
+                    logger.error(f"No se pudo reabrir la conexión SMTP: {e}")
+                    EmailOutboxService.release(items[index + 1:])
+                    break
+            else:
+                sent += 1
+                item.estado = "ENVIADO"
+                item.sent_at = timezone.now()
+                item.attempts += 1
+                item.body_text = item.body_html = ""
+                item.save(update_fields=["estado", "sent_at", "attempts", "body_text", "body_html"])
+        return sent, failed
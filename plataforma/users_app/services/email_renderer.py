@@ -0,0 +1,165 @@
+import re
+import threading
+from collections import namedtuple
+from textwrap import dedent
+from urllib.parse import urljoin
+
+from django.conf import settings
+from django.template.loader import get_template
+from django.templatetags.static import static
+from django.utils.html import escape
+
+from users_app.models import EmailOutbox
+
+
+RenderedEmail = namedtuple("RenderedEmail", ["subject", "body_text", "body_html", "priority"])
+
+EmailSpec = namedtuple(
+    "EmailSpec",
+    ["template", "subject", "resend_subject", "text", "resend_text", "priority"],
+)
+
+
+# Variables por mensaje de las plantillas de correo
+MESSAGE_FIELDS = (
+    "user_name",
+    "verification_code",
+    "user_email",
+    "logo_url",
+    "ip_address",
+    "login_time",
+    "location",
+)
+
+_FIELD_MARK = "@@{}@@"
+_FIELD_RE = re.compile(r"@@(\w+)@@")
+
+
+# Correos con código (OTP). Los textos planos se rellenan con str.format.
+EMAIL_SPECS = {
+    "verification": EmailSpec(
+        template="emails/verification_code.html",
+        subject="Código de Verificación - AciertaPeru",
+        resend_subject="Código de Verificación (Reenviado) - AciertaPeru",
+        text=dedent("""
+            Hola {user_name},
+
+            Tu código de verificación para AciertaPeru es: {verification_code}
+
+            Este código expirará en 20 minutos.
+
+            Si no solicitaste este código, puedes ignorar este mensaje.
+
+            Saludos,
+            Equipo AciertaPeru
+        """),
+        resend_text=dedent("""
+            Hola {user_name},
+
+            Tu código de verificación para AciertaPeru es: {verification_code}
+
+            Este código expirará en 20 minutos.
+
+            Saludos,
+            Equipo AciertaPeru
+        """),
+        priority=EmailOutbox.PRIORIDAD_VERIFICACION,
+    ),
+    "2fa": EmailSpec(
+        template="emails/login_2fa_code.html",
+        subject="Código de Acceso - Verificación de Seguridad - AciertaPeru",
+        resend_subject="Código de Acceso (Reenviado) - AciertaPeru",
+        text=dedent("""
+            Hola {user_name},
+
+            Se ha detectado un intento de acceso a tu cuenta desde la IP: {ip_address}
+
+            Tu código de verificación 2FA para AciertaPeru es: {verification_code}
+
+            Este código expirará en 5 minutos.
+
+            Si no fuiste tú quien intentó acceder, cambia tu contraseña inmediatamente.
+
+            Saludos,
+            Equipo AciertaPeru
+        """),
+        resend_text=dedent("""
+            Hola {user_name},
+
+            Tu código de verificación 2FA para AciertaPeru es: {verification_code}
+
+            Este código expirará en 5 minutos.
+
+            Saludos,
+            Equipo AciertaPeru
+        """),
+        priority=EmailOutbox.PRIORIDAD_2FA,
+    ),
+}
+
+
+class EmailRenderer:
+    """
+    Renderizado de los correos con código. Cada plantilla se renderiza una vez
+    por worker con marcadores en lugar de las variables y se parte en
+    fragmentos fijos; por mensaje solo se insertan los datos del usuario
+    (escapados). En DEBUG se recompila en cada envío para ver los cambios.
+    La URL absoluta del logo se arma una vez desde settings.SITE_URL, nunca
+    desde el Host de la petición (ALLOWED_HOSTS acepta cualquiera en prod).
+
+    Los mensajes con código no se guardan: cada reenvío genera un código nuevo
+    y vuelve a renderizar con los textos "reenviado".
+    """
+
+    _skeletons = {}
+    _logo_url = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _compile(name):
+        """Lista alterna [texto, campo, texto, campo, ..., texto]."""
+        context = {field: _FIELD_MARK.format(field) for field in MESSAGE_FIELDS}
+        return _FIELD_RE.split(get_template(name).render(context))
+
+    @classmethod
+    def _get_skeleton(cls, name):
+        if settings.DEBUG:
+            return cls._compile(name)
+        skeleton = cls._skeletons.get(name)
+        if skeleton is None:
+            with cls._lock:
+                skeleton = cls._skeletons.get(name)
+                if skeleton is None:
+                    skeleton = cls._compile(name)
+                    cls._skeletons[name] = skeleton
+        return skeleton
+
+    @classmethod
+    def _fill(cls, name, context):
+        parts = cls._get_skeleton(name)[:]
+        for index in range(1, len(parts), 2):
+            parts[index] = escape(context.get(parts[index], ""))
+        return "".join(parts)
+
+    @classmethod
+    def get_logo_url(cls, request):
+        if not settings.SITE_URL:
+            # Desarrollo: sin SITE_URL configurado se usa el host de la petición
+            return request.build_absolute_uri(static("logo.png"))
+        if cls._logo_url is None:
+            cls._logo_url = urljoin(settings.SITE_URL, static("logo.png"))
+        return cls._logo_url
+
+    @classmethod
+    def render(cls, kind, request, user, code, resend=False, **extra):
+        """Retorna el mensaje del tipo `kind`; con resend=True usa los textos de reenvío."""
+        spec = EMAIL_SPECS[kind]
+        context = {
+            "user_name": user.first_name or user.username,
+            "verification_code": code,
+            "user_email": user.email,
+            "logo_url": cls.get_logo_url(request),
+            **extra,
+        }
+        subject, text = (spec.resend_subject, spec.resend_text) if resend else (spec.subject, spec.text)
+        return RenderedEmail(subject, text.format(**context), cls._fill(spec.template, context), spec.priority)
@@ -1,185 +1,97 @@
 import string
-import random
+import secrets
 import logging
-from django.core.mail import EmailMultiAlternatives
-from django.core.cache import cache
-from django.template.loader import render_to_string
-from django.conf import settings
-from threading import Thread
 from django.utils import timezone
 
+from users_app.services.email_outbox_service import EmailOutboxService
+from users_app.services.email_renderer import EmailRenderer
+from users_app.services.geoip_service import GeoIPService
+from users_app.services.otp_service import OtpService
+
+# Vigencia de los códigos (segundos)
+VERIFY_CODE_TIMEOUT = 20 * 60
+TWO_FA_CODE_TIMEOUT = 5 * 60
+
 def generate_verification_code(longitud=6):
     """Genera un código de verificación alfanumérico"""
-    return ''.join(random.choices(string.ascii_uppercase + string.digits, k=longitud))
+    alphabet = string.ascii_uppercase + string.digits
+    return ''.join(secrets.choice(alphabet) for _ in range(longitud))
 
 def get_location_from_ip(ip_address):
-    """Obtiene ubicación estimada desde IP (implementar con servicio real si es necesario)"""
-    # Por ahora retorna un placeholder, se puede integrar con servicios como ipinfo.io
-    return "Lima, Perú"
-
-def send_verification_code(request, user):
+    """Obtiene ubicación estimada desde IP con la base GeoIP local (sin red)"""
+    return GeoIPService.describe(ip_address)
+
+def _enqueue(user, message):
+    EmailOutboxService.enqueue(
+        to_email=user.email,
+        subject=message.subject,
+        body_text=message.body_text,
+        body_html=message.body_html,
+        priority=message.priority,
+    )
+
+def send_verification_code(request, user, resend=False):
     """Envía código de verificación con plantilla HTML para registro"""
     logging.info(f"Enviando código de verificación a {user.email}")
     
     try:
         # Generar código
         codigo = generate_verification_code()
-        logging.info(f"Código generado: {codigo} para {user.email}")
-        
-        # Guardar en caché
-        cache.set(f'verify:{user.email}', codigo, timeout=20*60)  # 20 minutos
-        logging.debug(f"Código guardado en caché para {user.email}: {codigo}")
-        
-        from django.templatetags.static import static
-        logo_url = request.build_absolute_uri(static('logo.png'))
-        # Preparar contexto para la plantilla
-        context = {
-            'user_name': user.first_name or user.username,
-            'verification_code': codigo,
-            'user_email': user.email,
-            'logo_url': logo_url,
-        }
-        
-        # Renderizar plantilla HTML
-        html_content = render_to_string('emails/verification_code.html', context)
-        
-        # Contenido de texto plano como respaldo
-        text_content = f"""
-        Hola {user.first_name or user.username},
-
-        Tu código de verificación para AciertaPeru es: {codigo}
-
-        Este código expirará en 20 minutos.
-
-        Si no solicitaste este código, puedes ignorar este mensaje.
-
-        Saludos,
-        Equipo AciertaPeru
-        """
         
-        # Crear email con contenido HTML y texto
-        email = EmailMultiAlternatives(
-            subject='Código de Verificación - AciertaPeru',
-            body=text_content,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            to=[user.email]
-        )
+        # Guardar en caché (solo el hash del código)
+        OtpService.issue("verify", user.email, codigo, timeout=VERIFY_CODE_TIMEOUT)
         
-        # Adjuntar contenido HTML
-        email.attach_alternative(html_content, "text/html")
+        # Renderizar correo
+        message = EmailRenderer.render("verification", request, user, codigo, resend=resend)
         
-        # Enviar email
-        email.send()
+        # Encolar email (lo envía el worker send_outbox)
+        _enqueue(user, message)
         
-        logging.info(f"Código de verificación enviado exitosamente a {user.email}")
+        logging.info(f"Código de verificación encolado para {user.email}")
         
     except Exception as e:
         logging.error(f"Error enviando código de verificación a {user.email}: {e}")
         raise
 
-def send_2fa_code(request, user, ip_address):
+def send_2fa_code(request, user, ip_address, resend=False):
     """Envía código 2FA para login con información de seguridad"""
     logging.info(f"Enviando código 2FA a {user.email}")
     
     try:
         # Generar código
         codigo = generate_verification_code()
-        logging.info(f"Código 2FA generado: {codigo} para {user.email}")
-        
-        # Guardar en caché con tiempo menor (5 minutos)
-        cache.set(f'2fa:{user.email}', codigo, timeout=5*60)  # 5 minutos
-        logging.debug(f"Código 2FA guardado en caché para {user.email}: {codigo}")
-        
-        from django.templatetags.static import static
-        logo_url = request.build_absolute_uri(static('logo.png'))
         
-        # Preparar contexto para la plantilla
-        context = {
-            'user_name': user.first_name or user.username,
-            'verification_code': codigo,
-            'user_email': user.email,
-            'logo_url': logo_url,
-            'ip_address': ip_address,
-            'login_time': timezone.now().strftime('%d/%m/%Y %H:%M:%S'),
-            'location': get_location_from_ip(ip_address),
-        }
-        
-        # Renderizar plantilla HTML específica para 2FA
-        html_content = render_to_string('emails/login_2fa_code.html', context)
-        
-        # Contenido de texto plano como respaldo
-        text_content = f"""
-        Hola {user.first_name or user.username},
-
-        Se ha detectado un intento de acceso a tu cuenta desde la IP: {ip_address}
-
-        Tu código de verificación 2FA para AciertaPeru es: {codigo}
-
-        Este código expirará en 5 minutos.
-
-        Si no fuiste tú quien intentó acceder, cambia tu contraseña inmediatamente.
-
-        Saludos,
-        Equipo AciertaPeru
-        """
+        # Guardar en caché con tiempo menor (5 minutos), solo el hash del código
+        OtpService.issue("2fa", user.email, codigo, timeout=TWO_FA_CODE_TIMEOUT)
         
-        # Crear email con contenido HTML y texto
-        email = EmailMultiAlternatives(
-            subject='Código de Acceso - Verificación de Seguridad - AciertaPeru',
-            body=text_content,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            to=[user.email]
+        # Renderizar correo 2FA
+        message = EmailRenderer.render(
+            "2fa", request, user, codigo, resend=resend,
+            ip_address=ip_address,
+            login_time=timezone.now().strftime('%d/%m/%Y %H:%M:%S'),
+            location=get_location_from_ip(ip_address),
         )
         
-        # Adjuntar contenido HTML
-        email.attach_alternative(html_content, "text/html")
+        # Encolar email con prioridad máxima (lo envía el worker send_outbox)
+        _enqueue(user, message)
         
-        # Enviar email
-        email.send()
-        
-        logging.info(f"Código 2FA enviado exitosamente a {user.email}")
+        logging.info(f"Código 2FA encolado para {user.email}")
         
     except Exception as e:
         logging.error(f"Error enviando código 2FA a {user.email}: {e}")
         raise
 
-def send_verification_code_async(request, user):
-    """Versión asíncrona del envío de código"""
-    def send_email():
-        try:
-            send_verification_code(request, user)
-        except Exception as e:
-            logging.error(f"Error en envío asíncrono para {user.email}: {e}")
-    
-    # Ejecutar en hilo separado
-    thread = Thread(target=send_email)
-    thread.daemon = True
-    thread.start()
-    logging.info(f"Envío asíncrono iniciado para {user.email}")
-
-def send_2fa_code_async(request, user, ip_address):
-    """Versión asíncrona del envío de código 2FA"""
-    def send_email():
-        try:
-            send_2fa_code(request, user, ip_address)
-        except Exception as e:
-            logging.error(f"Error en envío asíncrono 2FA para {user.email}: {e}")
-    
-    # Ejecutar en hilo separado
-    thread = Thread(target=send_email)
-    thread.daemon = True
-    thread.start()
-    logging.info(f"Envío asíncrono 2FA iniciado para {user.email}")
+def _verify(purpose, user, codigo_enviado):
+    result = OtpService.verify(purpose, user.email, codigo_enviado)
+    if result == OtpService.EXHAUSTED:
+        logging.warning(f"Intentos agotados para el código {purpose} de {user.email}")
+    return result == OtpService.VERIFIED
 
 def verify_code(user, codigo_enviado):
     """Verifica el código ingresado por el usuario para registro"""
     try:
-        codigo_guardado = cache.get(f'verify:{user.email}')
-        logging.debug(f"Verificando código para {user.email}. Código guardado: {codigo_guardado}, Código enviado: {codigo_enviado}")
-        
-        if codigo_guardado and codigo_enviado.upper() == codigo_guardado.upper():
+        if _verify("verify", user, codigo_enviado):
             # No activar aquí - se hace en la vista
-            cache.delete(f'verify:{user.email}')
             logging.info(f"Código verificado exitosamente para {user.email}")
             return True
         
@@ -193,11 +105,7 @@ def verify_code(user, codigo_enviado):
 def verify_2fa_code(user, codigo_enviado):
     """Verifica el código 2FA ingresado por el usuario para login"""
     try:
-        codigo_guardado = cache.get(f'2fa:{user.email}')
-        logging.debug(f"Verificando código 2FA para {user.email}. Código guardado: {codigo_guardado}, Código enviado: {codigo_enviado}")
-        
-        if codigo_guardado and codigo_enviado.upper() == codigo_guardado.upper():
-            cache.delete(f'2fa:{user.email}')
+        if _verify("2fa", user, codigo_enviado):
             logging.info(f"Código 2FA verificado exitosamente para {user.email}")
             return True
         
@@ -211,51 +119,12 @@ def verify_2fa_code(user, codigo_enviado):
 def resend_verification_code(request, user):
     """Reenvía código de verificación para registro"""
     try:
-        # Verificar si hay un código activo
-        existing_code = cache.get(f'verify:{user.email}')
-        if existing_code:
-            logging.info(f"Reenviando código existente a {user.email}")
-            
-            # Usar el código existente
-            from django.templatetags.static import static
-            logo_url = request.build_absolute_uri(static('logo.png'))
-            context = {
-                'user_name': user.first_name or user.username,
-                'verification_code': existing_code,
-                'user_email': user.email,
-                'logo_url': logo_url,
-            }
-            
-            html_content = render_to_string('emails/verification_code.html', context)
-            text_content = f"""
-            Hola {user.first_name or user.username},
+        # Siempre un código nuevo: reemplaza al anterior, que deja de ser válido.
+        # No se guarda el mensaje renderizado (contiene el código en claro).
+        logging.info(f"Generando nuevo código para {user.email}")
+        send_verification_code(request, user, resend=True)
+        return True
 
-            Tu código de verificación para AciertaPeru es: {existing_code}
-
-            Este código expirará en 20 minutos.
-
-            Saludos,
-            Equipo AciertaPeru
-            """
-            
-            email = EmailMultiAlternatives(
-                subject='Código de Verificación (Reenviado) - AciertaPeru',
-                body=text_content,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                to=[user.email]
-            )
-            
-            email.attach_alternative(html_content, "text/html")
-            email.send()
-            
-            logging.info(f"Código reenviado exitosamente a {user.email}")
-            return True
-        else:
-            # Generar nuevo código
-            logging.info(f"Generando nuevo código para {user.email}")
-            send_verification_code(request, user)
-            return True
-            
     except Exception as e:
         logging.error(f"Error reenviando código a {user.email}: {e}")
         return False
@@ -263,54 +132,11 @@ def resend_verification_code(request, user):
 def resend_2fa_code(request, user, ip_address):
     """Reenvía código 2FA para login"""
     try:
-        # Verificar si hay un código activo
-        existing_code = cache.get(f'2fa:{user.email}')
-        if existing_code:
-            logging.info(f"Reenviando código 2FA existente a {user.email}")
-            
-            # Usar el código existente
-            from django.templatetags.static import static
-            logo_url = request.build_absolute_uri(static('logo.png'))
-            context = {
-                'user_name': user.first_name or user.username,
-                'verification_code': existing_code,
-                'user_email': user.email,
-                'logo_url': logo_url,
-                'ip_address': ip_address,
-                'login_time': timezone.now().strftime('%d/%m/%Y %H:%M:%S'),
-                'location': get_location_from_ip(ip_address),
-            }
-            
-            html_content = render_to_string('emails/login_2fa_code.html', context)
-            text_content = f"""
-            Hola {user.first_name or user.username},
-
-            Tu código de verificación 2FA para AciertaPeru es: {existing_code}
+        # Siempre un código nuevo: reemplaza al anterior, que deja de ser válido
+        logging.info(f"Generando nuevo código 2FA para {user.email}")
+        send_2fa_code(request, user, ip_address, resend=True)
+        return True
 
-            Este código expirará en 5 minutos.
-
-            Saludos,
-            Equipo AciertaPeru
-            """
-            
-            email = EmailMultiAlternatives(
-                subject='Código de Acceso (Reenviado) - AciertaPeru',
-                body=text_content,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                to=[user.email]
-            )
-            
-            email.attach_alternative(html_content, "text/html")
-            email.send()
-            
-            logging.info(f"Código 2FA reenviado exitosamente a {user.email}")
-            return True
-        else:
-            # Generar nuevo código
-            logging.info(f"Generando nuevo código 2FA para {user.email}")
-            send_2fa_code(request, user, ip_address)
-            return True
-            
     except Exception as e:
         logging.error(f"Error reenviando código 2FA a {user.email}: {e}")
-        return False
\ No newline at end of file
+        return False
@@ -0,0 +1,164 @@
+import bisect
+import ipaddress
+import logging
+import mmap
+import os
+import struct
+import threading
+from functools import lru_cache
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+# Formato binario generado por `manage.py build_geoip` (little endian):
+#   cabecera  MAGIC(8) | n_rangos(u32) | n_etiquetas(u32) | reservado(u32 x2)
+#   prefijos  65537 x u32      (primer rango cuyo inicio cae en cada /16)
+#   inicios   n_rangos x u32   (IPv4 como entero, ordenados)
+#   fines     n_rangos x u32
+#   etiqueta  n_rangos x u32   (índice en la tabla de etiquetas)
+#   offsets   (n_etiquetas + 1) x u32
+#   textos    etiquetas UTF-8 concatenadas ("Ciudad, Región, País")
+MAGIC = b"GEOIPv4\x00"
+HEADER = struct.Struct("<8sIIII")
+PREFIX_COUNT = 65537
+
+
+def write_database(path, ranges):
+    """
+    Escribe la tabla a `path` de forma atómica. `ranges` es un iterable de
+    (inicio, fin, etiqueta) con IPv4 como enteros.
+    """
+    ranges = sorted(ranges)
+    labels = {}
+    label_indexes = []
+    for _, _, label in ranges:
+        label_indexes.append(labels.setdefault(label, len(labels)))
+
+    blobs = [label.encode() for label in labels]
+    offsets = [0]
+    for blob in blobs:
+        offsets.append(offsets[-1] + len(blob))
+
+    count = len(ranges)
+
+    # Índice por /16: acota el bisect a los rangos que empiezan en el mismo bloque
+    prefixes = []
+    index = 0
+    for prefix in range(PREFIX_COUNT):
+        while index < count and ranges[index][0] >> 16 < prefix:
+            index += 1
+        prefixes.append(index)
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as output:
+        output.write(HEADER.pack(MAGIC, count, len(blobs), 0, 0))
+        output.write(struct.pack(f"<{PREFIX_COUNT}I", *prefixes))
+        output.write(struct.pack(f"<{count}I", *(start for start, _, _ in ranges)))
+        output.write(struct.pack(f"<{count}I", *(end for _, end, _ in ranges)))
+        output.write(struct.pack(f"<{count}I", *label_indexes))
+        output.write(struct.pack(f"<{len(offsets)}I", *offsets))
+        output.write(b"".join(blobs))
+    os.replace(tmp_path, path)
+    return count, len(blobs)
+
+
+class GeoIPDatabase:
+    """
+    Tabla de rangos IPv4 mapeada en memoria (mmap de solo lectura): los
+    workers de gunicorn comparten las mismas páginas del page cache y la
+    búsqueda es un bisect sobre memoryviews, sin copiar la tabla.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as source:
+            self._mmap = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, count, label_count, _, _ = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} no es una base GeoIP válida")
+
+        view = memoryview(self._mmap)
+        offset = HEADER.size
+        self.prefixes = view[offset:offset + PREFIX_COUNT * 4].cast("I")
+        offset += PREFIX_COUNT * 4
+        table_size = count * 4
+        self.starts = view[offset:offset + table_size].cast("I")
+        offset += table_size
+        self.ends = view[offset:offset + table_size].cast("I")
+        offset += table_size
+        self.label_indexes = view[offset:offset + table_size].cast("I")
+        offset += table_size
+        self.label_offsets = view[offset:offset + (label_count + 1) * 4].cast("I")
+        self._labels_start = offset + (label_count + 1) * 4
+        self.count = count
+
+    def lookup(self, ip_int):
+        prefix = ip_int >> 16
+        index = bisect.bisect_right(
+            self.starts, ip_int, self.prefixes[prefix], self.prefixes[prefix + 1]
+        ) - 1
+        if index < 0 or ip_int > self.ends[index]:
+            return None
+        label = self.label_indexes[index]
+        start = self._labels_start + self.label_offsets[label]
+        end = self._labels_start + self.label_offsets[label + 1]
+        return self._mmap[start:end].decode()
+
+
+class GeoIPService:
+    """
+    Geolocalización de IPs sin llamadas de red. La base (GEOIP_DATABASE_PATH)
+    se abre una vez por worker; si no existe, las consultas retornan None.
+    Solo IPv4; IPv6 y rangos privados se informan como desconocidos.
+    """
+
+    UNKNOWN = "Ubicación desconocida"
+
+    _database = None
+    _loaded = False
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_database(cls):
+        if not cls._loaded:
+            with cls._lock:
+                if not cls._loaded:
+                    path = settings.GEOIP_DATABASE_PATH
+                    try:
+                        cls._database = GeoIPDatabase(path)
+                    except FileNotFoundError:
+                        logger.warning(f"Base GeoIP no encontrada en {path}; ubicaciones desactivadas")
+                    except (OSError, ValueError) as e:
+                        logger.error(f"No se pudo cargar la base GeoIP {path}: {e}")
+                    cls._loaded = True
+        return cls._database
+
+    @staticmethod
+    @lru_cache(maxsize=settings.GEOIP_CACHE_SIZE)
+    def lookup(ip_address):
+        """Retorna "Ciudad, Región, País" o None."""
+        try:
+            address = ipaddress.IPv4Address(ip_address)
+        except (TypeError, ValueError):
+            return None
+        if address.is_private or address.is_loopback:
+            return None
+        database = GeoIPService.get_database()
+        if database is None:
+            return None
+        return database.lookup(int(address))
+
+    @staticmethod
+    def describe(ip_address):
+        return GeoIPService.lookup(ip_address) or GeoIPService.UNKNOWN
+
+    @classmethod
+    def reset(cls):
+        """Vuelve a abrir la base en la próxima consulta (tras build_geoip)."""
+        with cls._lock:
+            cls._database = None
+            cls._loaded = False
+        cls.lookup.cache_clear()
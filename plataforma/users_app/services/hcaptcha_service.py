@@ -0,0 +1,164 @@
+import logging
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class HCaptchaVerifier:
+    """
+    Verificador de hCaptcha con:
+    - una requests.Session por worker con pool keep-alive (sin handshake TLS
+      en cada login),
+    - presupuesto de latencia estricto (connect/read timeout),
+    - circuit breaker: tras `failure_threshold` errores seguidos deja de
+      llamar a hCaptcha durante `reset_timeout` segundos y falla rápido; luego
+      deja pasar una petición de prueba (half-open).
+    - contadores de latencia y errores para monitoreo.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        verify_url,
+        secret,
+        timeout,
+        connect_timeout,
+        failure_threshold,
+        reset_timeout,
+        pool_size,
+    ):
+        self.verify_url = verify_url
+        self.secret = secret
+        self.timeout = (connect_timeout, timeout)
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._stats = {
+            "requests": 0,
+            "successes": 0,
+            "rejections": 0,
+            "errors": 0,
+            "short_circuits": 0,
+            "latency_total_ms": 0.0,
+            "latency_max_ms": 0.0,
+        }
+
+    def _allow_request(self):
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    self._stats["short_circuits"] += 1
+                    return False
+                self._state = self.HALF_OPEN
+            # HALF_OPEN: una sola petición de prueba a la vez
+            if self._probe_in_flight:
+                self._stats["short_circuits"] += 1
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def _record(self, latency_ms, error):
+        with self._lock:
+            self._stats["requests"] += 1
+            self._stats["latency_total_ms"] += latency_ms
+            self._stats["latency_max_ms"] = max(self._stats["latency_max_ms"], latency_ms)
+            self._probe_in_flight = False
+
+            if error:
+                self._stats["errors"] += 1
+                self._consecutive_failures += 1
+                if (
+                    self._state == self.HALF_OPEN
+                    or self._consecutive_failures >= self.failure_threshold
+                ):
+                    if self._state != self.OPEN:
+                        logger.warning(
+                            f"hCaptcha: circuito abierto tras {self._consecutive_failures} errores"
+                        )
+                    self._state = self.OPEN
+                    self._opened_at = time.monotonic()
+            else:
+                self._consecutive_failures = 0
+                self._state = self.CLOSED
+
+    def verify(self, token):
+        """Retorna (success, error_message), igual que verify_hcaptcha."""
+        if not self._allow_request():
+            return False, "Verificación Captcha no disponible. Intenta en unos segundos."
+
+        start = time.perf_counter()
+        try:
+            response = self.session.post(
+                self.verify_url,
+                data={"secret": self.secret, "response": token},
+                timeout=self.timeout,
+            )
+            response.raise_for_status()
+            result = response.json()
+        except (requests.RequestException, ValueError) as e:
+            self._record((time.perf_counter() - start) * 1000, error=True)
+            logger.error(f"Error verificando hCaptcha: {e}")
+            return False, "Error al verificar Captcha"
+
+        self._record((time.perf_counter() - start) * 1000, error=False)
+        if result.get("success"):
+            with self._lock:
+                self._stats["successes"] += 1
+            return True, None
+
+        with self._lock:
+            self._stats["rejections"] += 1
+        return False, "Verificación Captcha fallida"
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["state"] = self._state
+        requests_count = stats["requests"]
+        stats["latency_avg_ms"] = (
+            round(stats["latency_total_ms"] / requests_count, 2) if requests_count else 0.0
+        )
+        stats["latency_total_ms"] = round(stats["latency_total_ms"], 2)
+        stats["latency_max_ms"] = round(stats["latency_max_ms"], 2)
+        return stats
+
+
+_verifier = None
+_verifier_lock = threading.Lock()
+
+
+def get_hcaptcha_verifier():
+    global _verifier
+    if _verifier is None:
+        with _verifier_lock:
+            if _verifier is None:
+                _verifier = HCaptchaVerifier(
+                    verify_url=settings.HCAPTCHA_VERIFY_URL,
+                    secret=settings.HCAPTCHA_SECRET,
+                    timeout=settings.HCAPTCHA_TIMEOUT,
+                    connect_timeout=settings.HCAPTCHA_CONNECT_TIMEOUT,
+                    failure_threshold=settings.HCAPTCHA_CIRCUIT_FAILURES,
+                    reset_timeout=settings.HCAPTCHA_CIRCUIT_RESET,
+                    pool_size=settings.HCAPTCHA_POOL_SIZE,
+                )
+    return _verifier
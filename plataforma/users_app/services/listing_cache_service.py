@@ -0,0 +1,86 @@
+import hashlib
+import json
+import time
+
+from django.core.cache import cache
+
+_MISSING = object()
+
+# Filtros que no distinguen mayúsculas (la búsqueda es case-insensitive en todos los backends)
+CASE_INSENSITIVE_FILTERS = ("search",)
+
+
+class ListingCacheService:
+    """
+    Cache de los listados de administración. La clave combina el listado
+    (`scope`, p.ej. "users_admin"), sus filtros normalizados y un contador
+    de generación por cada modelo del que dependen los datos: cualquier
+    alta, edición o baja incrementa el contador (bump) y las entradas
+    anteriores dejan de usarse sin tener que borrarlas una por una; expiran
+    solas por timeout.
+    """
+
+    @staticmethod
+    def _generation_key(model):
+        return f"listing_generation:{model._meta.label_lower}"
+
+    @staticmethod
+    def _initial_generation():
+        # Si el contador se pierde (eviction) no vuelve a empezar en un valor
+        # ya usado, que reactivaría entradas viejas
+        return time.time_ns() // 1_000_000
+
+    @staticmethod
+    def generations(models):
+        keys = [ListingCacheService._generation_key(model) for model in models]
+        values = cache.get_many(keys)
+        for key in keys:
+            if key not in values:
+                cache.add(key, ListingCacheService._initial_generation(), timeout=None)
+                values[key] = cache.get(key)
+        return [values[key] for key in keys]
+
+    @staticmethod
+    def bump(*models):
+        """Invalida los listados que dependen de `models`."""
+        for model in models:
+            key = ListingCacheService._generation_key(model)
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.set(key, ListingCacheService._initial_generation(), timeout=None)
+
+    @staticmethod
+    def normalize(filters):
+        """Descarta filtros vacíos y pasa a minúsculas los que no distinguen mayúsculas."""
+        normalized = {}
+        for name, value in filters.items():
+            if name in CASE_INSENSITIVE_FILTERS and isinstance(value, str):
+                value = value.lower()
+            if value in ("", None):
+                continue
+            normalized[name] = value
+        return normalized
+
+    @staticmethod
+    def key(scope, filters, models=()):
+        payload = json.dumps(
+            [ListingCacheService.normalize(filters), ListingCacheService.generations(models)],
+            sort_keys=True,
+            default=str,
+        )
+        digest = hashlib.md5(payload.encode()).hexdigest()
+        return f"listing:{scope}:{digest}"
+
+    @staticmethod
+    def get_or_set(scope, filters, compute, timeout, models=()):
+        """
+        Retorna el valor cacheado o lo calcula con `compute()` (None también
+        se cachea). `models` son los modelos cuyos cambios lo invalidan.
+        """
+        key = ListingCacheService.key(scope, filters, models)
+        value = cache.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            cache.set(key, value, timeout=timeout)
+        return value
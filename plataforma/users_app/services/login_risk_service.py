@@ -0,0 +1,223 @@
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from config.utils import get_redis_connection_or_none
+from users_app.models import LogBlockedUser, LoginIncorrect, SessionUser
+from users_app.services.helpers import (
+    get_last_reset_or_24h,
+    exists_login_block_record,
+)
+
+
+LoginRiskState = namedtuple(
+    "LoginRiskState", ["failed_attempts", "first_failure", "ip_count", "block_logged"]
+)
+
+
+class LoginRiskTracker:
+    """
+    Estado de riesgo de login por usuario en el cache compartido:
+    - intentos fallidos (contador) y hora del primer fallo, con TTL de 24h,
+    - IPs de inicio de sesión de las últimas 24h, una por clave (ranura) con
+      su propio TTL; cada IP nueva ocupa una ranura libre con cache.add, así
+      dos workers no se pisan la lista,
+    - marca de bloqueo ya registrado hoy.
+
+    Todas las comprobaciones del login se responden con un solo get_many.
+    Si el cache no tiene el estado del usuario se reconstruye una vez desde la
+    BD (mismas reglas que users_app.services.helpers); un reinicio escrito en
+    la BD lo descarta (reset, desde signals). Los registros de auditoría
+    (LoginIncorrect, LogBlockedUser) se escriben en el momento: son la fuente
+    de esa reconstrucción y no pueden quedar en memoria de un worker.
+    """
+
+    MAX_FAILED_ATTEMPTS = 5
+    MAX_DISTINCT_IPS = 5
+    WINDOW = timedelta(hours=24)
+
+    @staticmethod
+    def _keys(user_id):
+        prefix = f"login_risk:{user_id}"
+        return (
+            f"{prefix}:fails",
+            f"{prefix}:first_fail",
+            f"{prefix}:blocked",
+            f"{prefix}:hydrated",
+        )
+
+    @classmethod
+    def _ip_keys(cls, user_id):
+        # Basta con MAX_DISTINCT_IPS ranuras: al llenarse ya corresponde el baneo
+        return [f"login_risk:{user_id}:ip:{slot}" for slot in range(cls.MAX_DISTINCT_IPS)]
+
+    @classmethod
+    def _window_seconds(cls):
+        return int(cls.WINDOW.total_seconds())
+
+    @classmethod
+    def _hydrate(cls, user_id):
+        """Carga el estado desde la BD (solo cuando el cache no lo tiene)."""
+        fails_key, first_key, blocked_key, hydrated_key = cls._keys(user_id)
+        ip_keys = cls._ip_keys(user_id)
+        now = time.time()
+        values = {}
+
+        window_start = get_last_reset_or_24h(user_id, True)
+        failures = LoginIncorrect.objects.filter(user_id=user_id, login_time__gte=window_start)
+        failed_attempts = failures.count()
+        first_failure = None
+        if failed_attempts:
+            first_failure = failures.order_by("login_time").values_list("login_time", flat=True).first()
+            ttl = int(first_failure.timestamp() + cls._window_seconds() - now)
+            if ttl > 0:
+                cache.set_many(
+                    {fails_key: failed_attempts, first_key: int(first_failure.timestamp())},
+                    timeout=ttl,
+                )
+                values[fails_key] = failed_attempts
+                values[first_key] = int(first_failure.timestamp())
+        if fails_key not in values:
+            cache.delete_many([fails_key, first_key])
+
+        ip_window_start = get_last_reset_or_24h(user_id, False)
+        ips = {}
+        sessions = SessionUser.objects.filter(
+            user_id=user_id, login_time__gte=ip_window_start
+        ).values_list("ip_address", "login_time")
+        for ip_address, login_time in sessions:
+            ips[ip_address] = max(ips.get(ip_address, 0), int(login_time.timestamp()))
+        recent = sorted(ips.items(), key=lambda item: item[1], reverse=True)[:len(ip_keys)]
+        for ip_key, (ip_address, seen) in zip(ip_keys, recent):
+            ttl = int(seen + cls._window_seconds() - now)
+            if ttl > 0:
+                cache.set(ip_key, ip_address, timeout=ttl)
+                values[ip_key] = ip_address
+        cache.delete_many([ip_key for ip_key in ip_keys if ip_key not in values])
+
+        if exists_login_block_record(user_id, is_login_attempt=True):
+            values[blocked_key] = timezone.localdate().isoformat()
+
+        values[hydrated_key] = 1
+        cache.set_many(
+            {key: values[key] for key in (blocked_key, hydrated_key) if key in values},
+            timeout=cls._window_seconds(),
+        )
+        return values
+
+    @classmethod
+    def _get_values(cls, user_id):
+        keys = cls._keys(user_id)
+        values = cache.get_many([*keys, *cls._ip_keys(user_id)])
+        if keys[3] not in values:
+            values = cls._hydrate(user_id)
+        return values
+
+    @classmethod
+    def _ips(cls, user_id, values):
+        """IPs vigentes por ranura ({clave: ip})."""
+        return {key: values[key] for key in cls._ip_keys(user_id) if key in values}
+
+    @classmethod
+    def get_state(cls, user_id):
+        fails_key, first_key, blocked_key, _ = cls._keys(user_id)
+        values = cls._get_values(user_id)
+        return LoginRiskState(
+            failed_attempts=values.get(fails_key, 0),
+            first_failure=values.get(first_key),
+            ip_count=len(set(cls._ips(user_id, values).values())),
+            block_logged=values.get(blocked_key) == timezone.localdate().isoformat(),
+        )
+
+    @classmethod
+    def is_locked_out(cls, state):
+        return state.failed_attempts >= cls.MAX_FAILED_ATTEMPTS
+
+    @classmethod
+    def has_multiple_ips(cls, state):
+        return state.ip_count >= cls.MAX_DISTINCT_IPS
+
+    @classmethod
+    def remaining_block_time(cls, state):
+        if not state.first_failure:
+            return timedelta(0)
+        return datetime.fromtimestamp(state.first_failure, tz=dt_timezone.utc) + cls.WINDOW - timezone.now()
+
+    @classmethod
+    def record_failure(cls, user, ip_address):
+        fails_key, first_key, *_ = cls._keys(user.id)
+        window = cls._window_seconds()
+        now = int(time.time())
+        cls._get_values(user.id)
+
+        client = get_redis_connection_or_none()
+        if client is not None:
+            pipe = client.pipeline(transaction=False)
+            pipe.set(cache.make_key(fails_key), 0, ex=window, nx=True)
+            pipe.incr(cache.make_key(fails_key))
+            pipe.set(cache.make_key(first_key), now, ex=window, nx=True)
+            pipe.execute()
+        else:
+            cache.add(fails_key, 0, timeout=window)
+            cache.add(first_key, now, timeout=window)
+            try:
+                cache.incr(fails_key)
+            except ValueError:
+                cache.add(fails_key, 1, timeout=window)
+
+        LoginIncorrect.objects.create(user=user, ip_address=ip_address)
+
+    @classmethod
+    def record_lockout(cls, user, ip_address, state):
+        """Registra el bloqueo por intentos, como máximo una vez al día."""
+        if state.block_logged:
+            return
+        _, _, blocked_key, _ = cls._keys(user.id)
+        cache.set(blocked_key, timezone.localdate().isoformat(), timeout=cls._window_seconds())
+        LogBlockedUser.objects.create(
+            user=user, ip_address=ip_address, is_login_attempt=True, is_active=True
+        )
+
+    @classmethod
+    def record_ban(cls, user, ip_address):
+        LogBlockedUser.objects.create(
+            user=user, ip_address=ip_address, is_login_attempt=False, is_active=True
+        )
+
+    @classmethod
+    def record_login_ip(cls, user_id, ip_address):
+        """
+        Agrega la IP de un inicio de sesión exitoso. Una IP ya registrada solo
+        renueva el TTL de su ranura; una nueva se guarda con cache.add en la
+        primera ranura libre (si otro worker la ocupó antes, prueba la
+        siguiente). Con todas ocupadas no hace falta guardarla.
+        """
+        window = cls._window_seconds()
+        ips = cls._ips(user_id, cls._get_values(user_id))
+        for key, ip in ips.items():
+            if ip == ip_address and cache.touch(key, timeout=window):
+                return
+
+        ip_keys = cls._ip_keys(user_id)
+        for index, key in enumerate(ip_keys):
+            if key in ips or not cache.add(key, ip_address, timeout=window):
+                continue
+            # Dos logins simultáneos desde la misma IP nueva pueden ocupar dos
+            # ranuras: se queda la de menor índice y se libera la otra
+            earlier = cache.get_many(ip_keys[:index])
+            if ip_address in earlier.values():
+                cache.delete(key)
+            return
+
+    @classmethod
+    def reset(cls, user_id):
+        """
+        Descarta el estado cacheado del usuario; la próxima consulta lo
+        reconstruye desde la BD. Se llama al escribir un reinicio
+        (LogBlockedUser con is_active=False), que de otro modo no se vería
+        hasta que venciera la marca de hidratado.
+        """
+        cache.delete_many([*cls._keys(user_id), *cls._ip_keys(user_id)])
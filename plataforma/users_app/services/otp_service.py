@@ -0,0 +1,116 @@
+import hashlib
+import hmac
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from config.utils import get_redis_connection_or_none
+
+
+# Verificación atómica en Redis: compara el hash, consume el código si
+# coincide y si no suma un intento; al llegar al máximo lo elimina.
+_VERIFY_SCRIPT = """
+local stored = redis.call('HGET', KEYS[1], 'h')
+if not stored then
+    return -1
+end
+if stored == ARGV[1] then
+    redis.call('DEL', KEYS[1])
+    return 1
+end
+local attempts = redis.call('HINCRBY', KEYS[1], 'a', 1)
+if attempts >= tonumber(ARGV[2]) then
+    redis.call('DEL', KEYS[1])
+    return -2
+end
+return 0
+"""
+
+
+class OtpService:
+    """
+    Códigos de un solo uso (registro y 2FA). Se guarda solo el HMAC del código
+    junto con el contador de intentos en una única entrada con expiración.
+    La verificación compara y consume en un solo viaje al cache: script Lua
+    en Redis; en LocMem (local) bajo un lock del proceso.
+    """
+
+    VERIFIED = 1
+    INVALID = 0
+    MISSING = -1
+    EXHAUSTED = -2
+
+    _lock = threading.Lock()
+    _script = None
+    _script_client = None
+
+    @staticmethod
+    def _cache_key(purpose, email):
+        return f"otp:{purpose}:{email.lower()}"
+
+    @staticmethod
+    def _hash(purpose, email, code):
+        message = f"{purpose}:{email.lower()}:{code.strip().upper()}".encode()
+        return hmac.new(settings.SECRET_KEY.encode(), message, hashlib.sha256).hexdigest()
+
+    @classmethod
+    def _get_script(cls, client):
+        if cls._script is None or cls._script_client is not client:
+            cls._script = client.register_script(_VERIFY_SCRIPT)
+            cls._script_client = client
+        return cls._script
+
+    @classmethod
+    def issue(cls, purpose, email, code, timeout):
+        """Guarda un código nuevo (reemplaza al anterior y reinicia los intentos)."""
+        key = cls._cache_key(purpose, email)
+        code_hash = cls._hash(purpose, email, code)
+
+        client = get_redis_connection_or_none()
+        if client is not None:
+            raw_key = cache.make_key(key)
+            pipe = client.pipeline(transaction=True)
+            pipe.delete(raw_key)
+            pipe.hset(raw_key, mapping={"h": code_hash, "a": 0})
+            pipe.expire(raw_key, timeout)
+            pipe.execute()
+            return
+
+        entry = {"hash": code_hash, "attempts": 0, "expires": time.time() + timeout}
+        cache.set(key, entry, timeout=timeout)
+
+    @classmethod
+    def verify(cls, purpose, email, code):
+        """
+        Retorna VERIFIED (código consumido), INVALID, MISSING (no hay código o
+        expiró) o EXHAUSTED (se agotaron los intentos y se descartó el código).
+        """
+        key = cls._cache_key(purpose, email)
+        code_hash = cls._hash(purpose, email, code or "")
+        max_attempts = settings.OTP_MAX_ATTEMPTS
+
+        client = get_redis_connection_or_none()
+        if client is not None:
+            script = cls._get_script(client)
+            return int(script(keys=[cache.make_key(key)], args=[code_hash, max_attempts]))
+
+        with cls._lock:
+            entry = cache.get(key)
+            if entry is None:
+                return cls.MISSING
+            if hmac.compare_digest(entry["hash"], code_hash):
+                cache.delete(key)
+                return cls.VERIFIED
+            entry["attempts"] += 1
+            remaining = int(entry["expires"] - time.time())
+            if entry["attempts"] >= max_attempts or remaining <= 0:
+                cache.delete(key)
+                return cls.EXHAUSTED if entry["attempts"] >= max_attempts else cls.MISSING
+            cache.set(key, entry, timeout=remaining)
+            return cls.INVALID
+
+    @classmethod
+    def discard(cls, purpose, email):
+        cache.delete(cls._cache_key(purpose, email))
@@ -1,8 +1,96 @@
+import base64
+import binascii
+import json
+import math
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
 from django.core.paginator import Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Q
 
 
 class PaginationService:
 
+    @staticmethod
+    def _to_int(value, default):
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return default
+
+    @staticmethod
+    def get_page(params):
+        return max(PaginationService._to_int(params.get("page"), 1), 1)
+
+    @staticmethod
+    def get_per_page(params):
+        """per_page del request acotado a [1, PAGINATION_MAX_PER_PAGE]."""
+        per_page = PaginationService._to_int(
+            params.get("per_page"), settings.PAGINATION_DEFAULT_PER_PAGE
+        )
+        return min(max(per_page, 1), settings.PAGINATION_MAX_PER_PAGE)
+
+    @staticmethod
+    def is_cursor_mode(params):
+        """El modo cursor es opcional: se activa enviando ?cursor= (vacío = primera página)."""
+        return "cursor" in params
+
+    @staticmethod
+    def get_position(params):
+        """Página (modo offset) o cursor (modo keyset) pedido; sirve para claves de cache."""
+        if PaginationService.is_cursor_mode(params):
+            return {"mode": "cursor", "cursor": params.get("cursor") or ""}
+        return {"mode": "offset", "page": PaginationService.get_page(params)}
+
+    @staticmethod
+    def paginate(queryset, params, sort_field, descending=False, count=None, fields=None,
+                 unique_sort=False):
+        """
+        Ordena por sort_field (desempatando por pk) y pagina por offset o por
+        cursor según los params. `unique_sort` indica que sort_field es una
+        anotación sin valores repetidos y no necesita desempate.
+        `count(queryset) -> (total, exacto)` reemplaza al COUNT(*) del Paginator
+        en el modo offset. Con `fields` las filas son tuplas de values_list (solo
+        esas columnas) en lugar de instancias del modelo.
+        """
+        per_page = PaginationService.get_per_page(params)
+        if PaginationService.is_cursor_mode(params):
+            return PaginationService.paginate_cursor(
+                queryset, sort_field, descending, params.get("cursor"), per_page, fields
+            )
+
+        page = PaginationService.get_page(params)
+        queryset = queryset.order_by(
+            *PaginationService.get_ordering(queryset.model, sort_field, descending, unique_sort)
+        )
+        rows = queryset.values_list(*fields) if fields else queryset
+        if count is None:
+            return PaginationService.paginate_queryset(rows, page, per_page)
+        total, total_exact = count(queryset)
+        return PaginationService.paginate_counted(rows, page, per_page, total, total_exact)
+
+    @staticmethod
+    def get_ordering(model, sort_field, descending=False, unique=False):
+        """
+        Orden del modo offset: desempata por pk salvo que sort_field sea único
+        (pk, campo unique o una anotación marcada con `unique`, como el rowid
+        de FTS5). Sin desempate, las filas con el mismo valor (p.ej. el mismo
+        rank de búsqueda) pueden repetirse o saltarse entre páginas.
+        """
+        prefix = "-" if descending else ""
+        ordering = [f"{prefix}{sort_field}"]
+        if unique:
+            return ordering
+        try:
+            field = model._meta.get_field(sort_field)
+            unique = field.primary_key or field.unique
+        except FieldDoesNotExist:
+            unique = False
+        if not unique:
+            ordering.append(f"{prefix}{model._meta.pk.name}")
+        return ordering
+
     @staticmethod
     def paginate_queryset(queryset, page=1, per_page=10):
         """
@@ -14,8 +102,151 @@ class PaginationService:
         return {
             "data": list(page_obj.object_list),
             "total": paginator.count,
+            "total_exact": True,
             "per_page": per_page,
             "current_page": page_obj.number,
             "from": page_obj.start_index(),
             "to": page_obj.end_index(),
+            "next_cursor": None,
+            "prev_cursor": None,
+        }
+
+    @staticmethod
+    def paginate_counted(queryset, page, per_page, total, total_exact=True):
+        """Como paginate_queryset pero con un total ya calculado (o estimado)."""
+        last_page = max(math.ceil(total / per_page), 1)
+        page = min(page, last_page)
+        offset = (page - 1) * per_page
+        rows = list(queryset[offset:offset + per_page])
+
+        return {
+            "data": rows,
+            "total": total,
+            "total_exact": total_exact,
+            "per_page": per_page,
+            "current_page": page,
+            "from": offset + 1 if rows else 0,
+            "to": offset + len(rows),
+            "next_cursor": None,
+            "prev_cursor": None,
+        }
+
+    @staticmethod
+    def encode_cursor(value, pk, backwards=False):
+        payload = json.dumps({"v": value, "k": pk, "b": backwards}, cls=DjangoJSONEncoder)
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """Retorna (valor, pk, hacia_atrás) o None si el cursor es inválido."""
+        if not cursor:
+            return None
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            return payload["v"], payload["k"], bool(payload.get("b"))
+        except (binascii.Error, ValueError, TypeError, KeyError):
+            return None
+
+    @staticmethod
+    def _is_nullable(model, sort_field):
+        """Una anotación (no es campo del modelo) se considera nullable."""
+        try:
+            return model._meta.get_field(sort_field).null
+        except FieldDoesNotExist:
+            return True
+
+    @staticmethod
+    def paginate_cursor(queryset, sort_field, descending=False, cursor=None, per_page=10, fields=None):
+        """
+        Paginación por keyset sobre (sort_field, pk): cada página filtra a partir
+        de la última fila vista en lugar de usar OFFSET y no ejecuta COUNT(*),
+        así el costo no depende de la profundidad. Si sort_field admite NULL
+        (p.ej. email) esas filas van al final en orden ascendente (al inicio en
+        descendente) en todos los motores. Un cursor inválido se trata como la
+        primera página. Si se pasan
+        `fields` deben incluir sort_field y el pk.
+
+        Mantiene las claves del payload de paginate_queryset; total,
+        current_page, from y to van en None porque no se cuentan filas.
+        """
+        pk_name = queryset.model._meta.pk.name
+        if fields:
+            sort_index, pk_index = fields.index(sort_field), fields.index(pk_name)
+
+            def row_key(row):
+                return row[sort_index], row[pk_index]
+        else:
+            field = queryset.model._meta.get_field(sort_field)
+
+            def row_key(row):
+                return field.value_from_object(row), row.pk
+
+        nullable = PaginationService._is_nullable(queryset.model, sort_field)
+        decoded = PaginationService.decode_cursor(cursor)
+        if decoded and decoded[0] is None and not nullable:
+            decoded = None
+        backwards = decoded[2] if decoded else False
+
+        # Hacia atrás se recorre con el orden invertido y luego se da vuelta la página
+        reverse = descending != backwards
+        prefix = "-" if reverse else ""
+        if nullable:
+            sort_expr = F(sort_field)
+            ordering = [sort_expr.desc(nulls_first=True) if reverse else sort_expr.asc(nulls_last=True)]
+        else:
+            ordering = [f"{prefix}{sort_field}"]
+        if sort_field != pk_name:
+            ordering.append(f"{prefix}{pk_name}")
+        qs = queryset.order_by(*ordering)
+
+        if decoded:
+            value, pk, _ = decoded
+            lookup = "lt" if reverse else "gt"
+            if sort_field == pk_name:
+                qs = qs.filter(**{f"{pk_name}__{lookup}": pk})
+            elif value is None:
+                # Dentro del bloque de NULLs solo desempata el pk; en orden
+                # invertido vienen después todas las filas con valor
+                after = Q(**{f"{sort_field}__isnull": True, f"{pk_name}__{lookup}": pk})
+                if reverse:
+                    after |= Q(**{f"{sort_field}__isnull": False})
+                qs = qs.filter(after)
+            else:
+                after = (
+                    Q(**{f"{sort_field}__{lookup}": value})
+                    | Q(**{sort_field: value, f"{pk_name}__{lookup}": pk})
+                )
+                if nullable and not reverse:
+                    after |= Q(**{f"{sort_field}__isnull": True})
+                qs = qs.filter(after)
+
+        if fields:
+            qs = qs.values_list(*fields)
+        rows = list(qs[:per_page + 1])
+        has_more = len(rows) > per_page
+        rows = rows[:per_page]
+        if backwards:
+            rows.reverse()
+
+        def cursor_for(row, to_previous):
+            return PaginationService.encode_cursor(*row_key(row), backwards=to_previous)
+
+        next_cursor = prev_cursor = None
+        if rows:
+            if backwards or has_more:
+                next_cursor = cursor_for(rows[-1], False)
+            if (decoded and not backwards) or (backwards and has_more):
+                prev_cursor = cursor_for(rows[0], True)
+
+        return {
+            "data": rows,
+            "total": None,
+            "total_exact": False,
+            "per_page": per_page,
+            "current_page": None,
+            "from": None,
+            "to": None,
+            "next_cursor": next_cursor,
+            "prev_cursor": prev_cursor,
         }
@@ -0,0 +1,86 @@
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.forms import ValidationError
+
+from users_app.models import User
+from users_app.services.role_registry import RoleRegistry
+
+
+class PendingRegistrationService:
+    """
+    Registros a la espera de verificar el correo. Los datos ya validados (con
+    la contraseña hasheada) se guardan en el cache con la misma vigencia que
+    el código; el User se crea recién al verificar, así los registros
+    abandonados no escriben en la base de datos.
+    """
+
+    FIELDS = ("first_name", "last_name", "email", "username", "phone_number", "password")
+
+    @staticmethod
+    def _cache_key(email):
+        return f"pending_registration:{email.lower()}"
+
+    @staticmethod
+    def save(user, timeout, owner):
+        """
+        Guarda un User sin persistir (UserRegistrationForm.save(commit=False)).
+        `owner` identifica la sesión que se registró: solo ella puede
+        reemplazar el registro pendiente de ese correo mientras no expire. Si
+        otra sesión lo intenta se rechaza, para que nadie cambie la contraseña
+        de un registro ajeno antes de que su dueño lo verifique.
+        """
+        key = PendingRegistrationService._cache_key(user.email)
+        data = {field: getattr(user, field) for field in PendingRegistrationService.FIELDS}
+        data["owner"] = owner
+        if cache.add(key, data, timeout=timeout):
+            return
+
+        current = cache.get(key)
+        if current is not None and current.get("owner") != owner:
+            raise ValidationError({"email": ["Ya hay un registro pendiente de verificación para este correo."]})
+        cache.set(key, data, timeout=timeout)
+
+    @staticmethod
+    def get(email):
+        return cache.get(PendingRegistrationService._cache_key(email))
+
+    @staticmethod
+    def touch(email, timeout):
+        """Extiende la vigencia del registro (p.ej. al reenviar un código nuevo)."""
+        return cache.touch(PendingRegistrationService._cache_key(email), timeout=timeout)
+
+    @staticmethod
+    def discard(email):
+        cache.delete(PendingRegistrationService._cache_key(email))
+
+    @staticmethod
+    def build_user(data):
+        """User sin guardar con los datos pendientes (para renderizar correos)."""
+        return User(**{field: data[field] for field in PendingRegistrationService.FIELDS})
+
+    @staticmethod
+    def create_user(data):
+        """
+        Crea el usuario verificado. Vuelve a comprobar que el correo y el nombre
+        de usuario sigan libres, ya que pudieron registrarse mientras tanto.
+        """
+        default_role = RoleRegistry.get_by_name("CLIENTE")
+        if default_role is None:
+            raise ValidationError("No se encontró el rol CLIENTE. Contacte al administrador.")
+
+        try:
+            with transaction.atomic():
+                if User.objects.filter(email=data["email"]).exists():
+                    raise ValidationError("Este correo ya está en uso.")
+                if User.objects.filter(username=data["username"]).exists():
+                    raise ValidationError("Este nombre de usuario ya existe.")
+
+                user = PendingRegistrationService.build_user(data)
+                user.current_role = default_role
+                user.estado = "ACTIVO"
+                user.is_superuser = False
+                user.save(force_insert=True)
+        except IntegrityError:
+            raise ValidationError("Este correo ya está en uso.")
+
+        return user
@@ -6,6 +6,8 @@ from users_app.forms.profile_forms import (
     DeleteAccountForm,
 )
 from users_app.models import SessionUser
+from users_app.services.geoip_service import GeoIPService
+from users_app.services.trusted_device_service import TrustedDeviceService
 
 class ProfileService:
 
@@ -33,6 +35,7 @@ class ProfileService:
             return {
                 "id": session.id,
                 "ip_address": session.ip_address or "No registrada",
+                "location": session.location or GeoIPService.describe(session.ip_address),
                 "login_time": session.login_time.strftime("%d/%m/%Y, %H:%M:%S"),
             }
 
@@ -64,6 +67,9 @@ class ProfileService:
 
         user.password = make_password(form.cleaned_data["new_password"])
         user.save(update_fields=["password"])
+        # Los dispositivos de confianza ya no coinciden con la nueva contraseña;
+        # se borran explícitamente para no dejar entradas huérfanas
+        TrustedDeviceService.revoke_all(user.id)
         return {"message": "Contraseña cambiada con éxito."}
 
     @staticmethod
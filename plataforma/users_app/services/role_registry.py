@@ -0,0 +1,129 @@
+import threading
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+from users_app.models import Role, RolePermission
+
+
+# Bits de la matriz rol x módulo x acción
+PERMISSION_BITS = {
+    "can_read": 1,
+    "can_create": 2,
+    "can_update": 4,
+    "can_delete": 8,
+}
+
+_Snapshot = namedtuple("_Snapshot", ["version", "roles", "roles_by_name", "bits"])
+
+
+class RoleRegistry:
+    """
+    Copia en memoria (por worker) de los roles y de su matriz de permisos,
+    compilada a un bitset por (rol, módulo). Cualquier cambio de roles o
+    permisos incrementa un contador de versión en el cache compartido; cada
+    worker lo revisa como máximo cada ROLE_REGISTRY_CHECK_INTERVAL segundos y
+    recompila solo si cambió. Las consultas no tocan la base de datos.
+    """
+
+    VERSION_KEY = "role_registry:version"
+
+    _snapshot = None
+    _next_check = 0.0
+    _lock = threading.Lock()
+
+    @classmethod
+    def _current_version(cls):
+        version = cache.get(cls.VERSION_KEY)
+        if version is None:
+            cache.add(cls.VERSION_KEY, 1, timeout=None)
+            version = cache.get(cls.VERSION_KEY, 1)
+        return version
+
+    @classmethod
+    def _load(cls, version):
+        roles = {role.id_rol: role for role in Role.objects.all()}
+        roles_by_name = {role.name.upper(): role for role in roles.values()}
+
+        bits = {}
+        for permission in RolePermission.objects.all():
+            mask = 0
+            for field, bit in PERMISSION_BITS.items():
+                if getattr(permission, field):
+                    mask |= bit
+            bits[(permission.role_id, permission.module)] = mask
+
+        return _Snapshot(version, roles, roles_by_name, bits)
+
+    @classmethod
+    def _get_snapshot(cls):
+        now = time.monotonic()
+        snapshot = cls._snapshot
+        if snapshot is not None and now < cls._next_check:
+            return snapshot
+
+        with cls._lock:
+            snapshot = cls._snapshot
+            if snapshot is not None and now < cls._next_check:
+                return snapshot
+            version = cls._current_version()
+            if snapshot is None or snapshot.version != version:
+                snapshot = cls._load(version)
+                cls._snapshot = snapshot
+            cls._next_check = now + settings.ROLE_REGISTRY_CHECK_INTERVAL
+            return snapshot
+
+    @classmethod
+    def invalidate(cls):
+        """Publica un cambio de roles/permisos a todos los workers."""
+        cache.add(cls.VERSION_KEY, 1, timeout=None)
+        try:
+            cache.incr(cls.VERSION_KEY)
+        except ValueError:
+            cache.set(cls.VERSION_KEY, 1, timeout=None)
+        cls._next_check = 0.0
+
+    @classmethod
+    def reset(cls):
+        """Descarta la copia local (p.ej. tras leer roles con otro cache activo)."""
+        with cls._lock:
+            cls._snapshot = None
+            cls._next_check = 0.0
+
+    @classmethod
+    def version(cls):
+        return cls._get_snapshot().version
+
+    @classmethod
+    def has_permission(cls, role_id, module, permission):
+        bit = PERMISSION_BITS[permission]
+        return bool(cls._get_snapshot().bits.get((role_id, module), 0) & bit)
+
+    @classmethod
+    def get_role(cls, role_id):
+        return cls._get_snapshot().roles.get(role_id)
+
+    @classmethod
+    def get_by_name(cls, name):
+        return cls._get_snapshot().roles_by_name.get(name.upper())
+
+    @classmethod
+    def all_roles(cls):
+        return list(cls._get_snapshot().roles.values())
+
+    @classmethod
+    def get_module_permissions(cls, role_id, module):
+        mask = cls._get_snapshot().bits.get((role_id, module), 0)
+        return {field: bool(mask & bit) for field, bit in PERMISSION_BITS.items()}
+
+    @classmethod
+    def roles_with_permission(cls, module, permission):
+        snapshot = cls._get_snapshot()
+        bit = PERMISSION_BITS[permission]
+        return [
+            role
+            for role_id, role in snapshot.roles.items()
+            if snapshot.bits.get((role_id, module), 0) & bit
+        ]
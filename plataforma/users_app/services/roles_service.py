@@ -1,8 +1,15 @@
+import json
 from django.core.exceptions import ValidationError
-from users_app.models import Role
+from django.db import transaction
+from users_app.models import Role, RolePermission
 from users_app.forms.role_form import RoleForm
 from users_app.forms.role_update_form import RoleUpdateForm
+from users_app.services.listing_cache_service import ListingCacheService
 from users_app.services.pagination_service import PaginationService
+from users_app.services.role_registry import PERMISSION_BITS, RoleRegistry
+from users_app.services.user_count_service import UserCountService
+from config.permissions import get_restricted_modules
+from django.conf import settings
 from django.db.models import Q
 
 
@@ -12,7 +19,10 @@ class RolesService:
         form = RoleForm(data)
         if not form.is_valid():
             raise ValidationError(form.errors)
-        return form.save()
+        role = form.save()
+        RoleRegistry.invalidate()
+        ListingCacheService.bump(Role)
+        return role
 
     @staticmethod
     def update_role(role_id, data):
@@ -24,7 +34,10 @@ class RolesService:
         form = RoleUpdateForm(data, instance=role, role_id=role.id_rol)
         if not form.is_valid():
             raise ValidationError(form.errors)
-        return form.save()
+        role = form.save()
+        RoleRegistry.invalidate()
+        ListingCacheService.bump(Role)
+        return role
 
     @staticmethod
     def delete_role(role_id):
@@ -33,6 +46,10 @@ class RolesService:
             role.delete()
         except Role.DoesNotExist:
             raise ValidationError({"id": ["Rol no encontrado."]})
+        # El SET_NULL mueve a sus usuarios sin pasar por save()
+        UserCountService.reset()
+        RoleRegistry.invalidate()
+        ListingCacheService.bump(Role)
 
     @staticmethod
     def get_role_data(role_id):
@@ -44,38 +61,74 @@ class RolesService:
         return {
             "id": str(role.id_rol),
             "name": role.name,
+            "permissions": RolesService.get_role_permissions(role.id_rol),
         }
 
+    @staticmethod
+    def get_role_permissions(role_id):
+        return [
+            {"module": module, **RoleRegistry.get_module_permissions(role_id, module)}
+            for module in get_restricted_modules("users_app.urls")
+        ]
+
+    @staticmethod
+    def update_role_permissions(role_id, data):
+        try:
+            role = Role.objects.get(id_rol=role_id)
+        except (Role.DoesNotExist, ValidationError, ValueError):
+            raise ValidationError({"id": ["Rol no encontrado."]})
+
+        permissions = data.get("permissions") or []
+        if isinstance(permissions, str):
+            try:
+                permissions = json.loads(permissions)
+            except ValueError:
+                raise ValidationError({"permissions": ["Formato de permisos inválido."]})
+        if not isinstance(permissions, list):
+            raise ValidationError({"permissions": ["Formato de permisos inválido."]})
+
+        modules = set(get_restricted_modules("users_app.urls"))
+        for item in permissions:
+            if not isinstance(item, dict) or item.get("module") not in modules:
+                raise ValidationError({"permissions": [f"Módulo desconocido: {item}"]})
+
+        with transaction.atomic():
+            for item in permissions:
+                RolePermission.objects.update_or_create(
+                    role=role,
+                    module=item["module"],
+                    defaults={field: bool(item.get(field)) for field in PERMISSION_BITS},
+                )
+        RoleRegistry.invalidate()
+        return role
+
     @staticmethod
     def get_roles(params):
-        page = int(params.get("page", 1))
-        per_page = int(params.get("per_page", 10))
+        per_page = PaginationService.get_per_page(params)
         search = params.get("search", "")
         sort_by = params.get("sort_by", "id")
         sort_direction = params.get("sort_direction", "asc")
 
-        qs = Role.objects.all()
-        if search:
-            qs = qs.filter(Q(name__icontains=search))
-
         allowed_sort_fields = {
             "id": "id_rol",
             "name": "name",
         }
 
         sort_field = allowed_sort_fields.get(sort_by, "id_rol")
-        order = f"{'-' if sort_direction == 'desc' else ''}{sort_field}"
-        qs = qs.order_by(order)
 
-        paginated = PaginationService.paginate_queryset(qs, page, per_page)
-
-        paginated["data"] = [
+        paginated = ListingCacheService.get_or_set(
+            "roles_admin",
             {
-                "id": r.id_rol,
-                "name": r.name,
-            }
-            for r in paginated["data"]
-        ]
+                "search": search,
+                "sort_field": sort_field,
+                "sort_direction": sort_direction,
+                "per_page": per_page,
+                **PaginationService.get_position(params),
+            },
+            lambda: RolesService._get_roles_page(params, search, sort_field, sort_direction),
+            timeout=settings.LISTING_CACHE_TIMEOUT,
+            models=(Role,),
+        )
 
         paginated["filters"] = {
             "search": search,
@@ -85,3 +138,23 @@ class RolesService:
         }
 
         return paginated
+
+    @staticmethod
+    def _get_roles_page(params, search, sort_field, sort_direction):
+        qs = Role.objects.all()
+        if search:
+            qs = qs.filter(Q(name__icontains=search))
+
+        paginated = PaginationService.paginate(
+            qs, params, sort_field, descending=sort_direction == "desc"
+        )
+
+        paginated["data"] = [
+            {
+                "id": r.id_rol,
+                "name": r.name,
+            }
+            for r in paginated["data"]
+        ]
+
+        return paginated
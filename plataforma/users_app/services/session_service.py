@@ -0,0 +1,79 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from users_app.models import SessionUser
+from users_app.services.geoip_service import GeoIPService
+from users_app.services.login_risk_service import LoginRiskTracker
+
+
+class SessionService:
+    """
+    Registro de la última sesión (SessionUser) de cada usuario.
+    Lectura en tres niveles: memoria del worker (TTL corto), cache compartido
+    y, solo si ambos fallan, la base de datos.
+    """
+
+    _local = {}
+    _local_lock = threading.Lock()
+    _local_max_entries = 10000
+
+    @staticmethod
+    def _cache_key(user_id):
+        return f"latest_session:{user_id}"
+
+    @staticmethod
+    def _remember(user_id, session_id):
+        expires = time.monotonic() + settings.SESSION_VALIDITY_LOCAL_TTL
+        with SessionService._local_lock:
+            if len(SessionService._local) >= SessionService._local_max_entries:
+                SessionService._local.clear()
+            SessionService._local[str(user_id)] = (session_id, expires)
+
+    @staticmethod
+    def register_login(user, ip_address, user_agent):
+        """Crea el SessionUser del login y lo publica como la sesión vigente."""
+        session_user = SessionUser.objects.create(
+            user=user,
+            ip_address=ip_address,
+            user_agent=user_agent,
+            location=GeoIPService.lookup(ip_address) or "",
+        )
+        session_id = str(session_user.id)
+        cache.set(
+            SessionService._cache_key(user.id),
+            session_id,
+            timeout=settings.SESSION_COOKIE_AGE,
+        )
+        SessionService._remember(user.id, session_id)
+        LoginRiskTracker.record_login_ip(user.id, ip_address)
+        return session_user
+
+    @staticmethod
+    def get_latest_session_id(user_id):
+        """
+        Id (str) de la última sesión del usuario, o "" si nunca inició sesión.
+        """
+        local = SessionService._local.get(str(user_id))
+        if local and local[1] > time.monotonic():
+            return local[0]
+
+        cache_key = SessionService._cache_key(user_id)
+        session_id = cache.get(cache_key)
+        if session_id is None:
+            latest_session = (
+                SessionUser.objects.filter(user_id=user_id)
+                .order_by("-login_time")
+                .values_list("id", flat=True)
+                .first()
+            )
+            session_id = str(latest_session) if latest_session else ""
+            # add y no set: un register_login concurrente pudo dejar ya un id
+            # más nuevo, que no debe pisarse con el leído de la BD
+            if not cache.add(cache_key, session_id, timeout=settings.SESSION_COOKIE_AGE):
+                session_id = cache.get(cache_key, session_id)
+
+        SessionService._remember(user_id, session_id)
+        return session_id
@@ -0,0 +1,152 @@
+import hashlib
+import hmac
+import secrets
+import time
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+
+from config.utils import get_client_ip, get_client_subnet
+
+
+class TrustedDeviceService:
+    """
+    Dispositivos de confianza: si el usuario marca "Recordar este dispositivo"
+    al completar el 2FA se emite una cookie firmada (httponly) que permite
+    omitir el correo 2FA en los siguientes logins desde el mismo navegador y
+    rango de IP.
+
+    La credencial es la cookie; el User-Agent y la subred solo la atan además
+    al contexto en que se emitió (no son secretos). El servidor guarda cada
+    dispositivo en su propia clave de cache (ranura) con
+    (device_id, huella, rango_ip, expira, tag_password): un dispositivo nuevo
+    ocupa una ranura libre con cache.add, así dos logins simultáneos no se
+    pisan. Las claves llevan una generación por usuario; revocar todo es
+    incrementarla. El tag de la contraseña invalida todos los dispositivos al
+    cambiarla.
+    """
+
+    SALT = "users_app.trusted_device"
+
+    @staticmethod
+    def _generation_key(user_id):
+        return f"trusted_devices_gen:{user_id}"
+
+    @staticmethod
+    def _generation(user_id):
+        key = TrustedDeviceService._generation_key(user_id)
+        generation = cache.get(key)
+        if generation is None:
+            # Si el contador expira no vuelve a un valor ya usado
+            cache.add(key, time.time_ns() // 1_000_000, timeout=settings.TRUSTED_DEVICE_AGE)
+            generation = cache.get(key)
+        return generation
+
+    @staticmethod
+    def _slot_keys(user_id, generation):
+        return [
+            f"trusted_device:{user_id}:{generation}:{slot}"
+            for slot in range(settings.TRUSTED_DEVICE_MAX_PER_USER)
+        ]
+
+    @staticmethod
+    def is_enabled():
+        return settings.TRUSTED_DEVICE_AGE > 0
+
+    @staticmethod
+    def _fingerprint(request):
+        user_agent = request.META.get("HTTP_USER_AGENT", "")
+        return hashlib.sha256(user_agent.encode()).hexdigest()[:16]
+
+    @staticmethod
+    def _password_tag(user):
+        return hmac.new(
+            settings.SECRET_KEY.encode(), user.password.encode(), hashlib.sha256
+        ).hexdigest()[:16]
+
+    @staticmethod
+    def is_trusted(request, user):
+        if not TrustedDeviceService.is_enabled():
+            return False
+        token = request.COOKIES.get(settings.TRUSTED_DEVICE_COOKIE_NAME)
+        if not token:
+            return False
+        try:
+            payload = signing.loads(
+                token, salt=TrustedDeviceService.SALT, max_age=settings.TRUSTED_DEVICE_AGE
+            )
+        except signing.BadSignature:
+            return False
+        if payload.get("u") != str(user.id):
+            return False
+
+        slot_keys = TrustedDeviceService._slot_keys(user.id, TrustedDeviceService._generation(user.id))
+        slot = payload.get("s")
+        if not isinstance(slot, int) or not 0 <= slot < len(slot_keys):
+            return False
+        entry = cache.get(slot_keys[slot])
+        if entry is None:
+            return False
+
+        device_id, fingerprint, ip_range, expires, password_tag = entry
+        return (
+            hmac.compare_digest(device_id, str(payload.get("d", "")))
+            and expires > time.time()
+            and fingerprint == TrustedDeviceService._fingerprint(request)
+            and ip_range == get_client_subnet(get_client_ip(request))
+            and hmac.compare_digest(password_tag, TrustedDeviceService._password_tag(user))
+        )
+
+    @staticmethod
+    def issue(request, user):
+        """Registra el dispositivo actual y retorna el token para la cookie."""
+        device_id = secrets.token_urlsafe(9)
+        now = time.time()
+        age = settings.TRUSTED_DEVICE_AGE
+        generation = TrustedDeviceService._generation(user.id)
+        cache.touch(TrustedDeviceService._generation_key(user.id), timeout=age)
+        entry = (
+            device_id,
+            TrustedDeviceService._fingerprint(request),
+            get_client_subnet(get_client_ip(request)),
+            int(now + age),
+            TrustedDeviceService._password_tag(user),
+        )
+
+        slot_keys = TrustedDeviceService._slot_keys(user.id, generation)
+        slot = next(
+            (index for index, key in enumerate(slot_keys) if cache.add(key, entry, timeout=age)),
+            None,
+        )
+        if slot is None:
+            # Sin ranuras libres se reemplaza el dispositivo que expira antes
+            current = cache.get_many(slot_keys)
+            slot = min(
+                range(len(slot_keys)),
+                key=lambda index: current[slot_keys[index]][3] if slot_keys[index] in current else 0,
+            )
+            cache.set(slot_keys[slot], entry, timeout=age)
+
+        return signing.dumps(
+            {"u": str(user.id), "s": slot, "d": device_id}, salt=TrustedDeviceService.SALT
+        )
+
+    @staticmethod
+    def set_cookie(response, token):
+        response.set_cookie(
+            settings.TRUSTED_DEVICE_COOKIE_NAME,
+            token,
+            max_age=settings.TRUSTED_DEVICE_AGE,
+            httponly=True,
+            secure=settings.SESSION_COOKIE_SECURE,
+            samesite="Lax",
+        )
+
+    @staticmethod
+    def revoke_all(user_id):
+        key = TrustedDeviceService._generation_key(user_id)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns() // 1_000_000, timeout=settings.TRUSTED_DEVICE_AGE)
@@ -0,0 +1,100 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+
+from users_app.models import User
+
+
+# Campos por los que se busca el prefijo, en orden de prioridad
+PREFIX_FIELDS = ("email", "first_name", "last_name")
+
+RESULT_FIELDS = ("id", "first_name", "last_name", "email", "estado")
+
+
+class UserAutocompleteService:
+    """
+    Sugerencias para el buscador de usuarios: coincidencia por prefijo de
+    email, nombre o apellido, en minúsculas. Se busca sobre las copias en
+    minúsculas que User.save() guarda con str.lower (email_lower, ...), no
+    con LOWER() de la base: el de SQLite deja "Á" o "Ñ" sin cambiar. Cada
+    campo se consulta por separado con LIMIT sobre su índice, así el costo
+    no depende del tamaño de la tabla ni de lo común que sea el prefijo.
+
+    Los prefijos cortos (hasta USER_AUTOCOMPLETE_CACHE_MAX_LENGTH), que son
+    los que escriben todos y los que más filas tocan, se guardan en el cache
+    durante USER_AUTOCOMPLETE_CACHE_TIMEOUT segundos.
+    """
+
+    @staticmethod
+    def normalize(term):
+        return (term or "").strip().lower()[:100]
+
+    @staticmethod
+    def _cache_key(scope, term):
+        digest = hashlib.md5(term.encode()).hexdigest()
+        return f"user_autocomplete:{scope}:{digest}"
+
+    @staticmethod
+    def _prefix_filter(field, term):
+        """
+        SQLite usa el índice de la columna solo con rangos (no con LIKE);
+        Postgres lo hace con LIKE 'prefijo%' sobre el índice varchar_pattern_ops.
+        """
+        column = User.LOWERCASE_FIELDS[field]
+        if connection.vendor == "sqlite":
+            upper_bound = term[:-1] + chr(ord(term[-1]) + 1)
+            return column, {f"{column}__gte": term, f"{column}__lt": upper_bound}
+        return column, {f"{column}__startswith": term}
+
+    @staticmethod
+    def _search(term, role_id, limit):
+        queryset = User.objects.all()
+        if role_id is not None:
+            queryset = queryset.filter(current_role_id=role_id)
+
+        results = {}
+        for field in PREFIX_FIELDS:
+            if len(results) >= limit:
+                break
+            column, lookups = UserAutocompleteService._prefix_filter(field, term)
+            rows = (
+                queryset.filter(**lookups)
+                .exclude(id__in=list(results))
+                .order_by(column)
+                .values_list(*RESULT_FIELDS)[:limit - len(results)]
+            )
+            for user_id, first_name, last_name, email, estado in rows:
+                results[user_id] = {
+                    "id": str(user_id),
+                    "name": f"{first_name} {last_name or ''}".strip(),
+                    "email": email,
+                    "estado": estado,
+                }
+        return list(results.values())
+
+    @staticmethod
+    def suggest(term, scope, role_id=None):
+        """
+        Retorna hasta USER_AUTOCOMPLETE_LIMIT usuarios cuyo email, nombre o
+        apellido empieza por `term`. `scope` separa los caches de cada
+        listado (p.ej. clientes filtrados por rol).
+        """
+        term = UserAutocompleteService.normalize(term)
+        if len(term) < settings.USER_AUTOCOMPLETE_MIN_LENGTH:
+            return []
+
+        cacheable = len(term) <= settings.USER_AUTOCOMPLETE_CACHE_MAX_LENGTH
+        if cacheable:
+            key = UserAutocompleteService._cache_key(scope, term)
+            results = cache.get(key)
+            if results is not None:
+                return results
+
+        results = UserAutocompleteService._search(
+            term, role_id, settings.USER_AUTOCOMPLETE_LIMIT
+        )
+        if cacheable:
+            cache.set(key, results, timeout=settings.USER_AUTOCOMPLETE_CACHE_TIMEOUT)
+        return results
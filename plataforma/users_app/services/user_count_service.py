@@ -0,0 +1,249 @@
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.db.models import Count, F
+
+from users_app.models import Role, User
+from users_app.services.listing_cache_service import ListingCacheService
+from users_app.services.role_registry import RoleRegistry
+
+
+class UserCountService:
+    """
+    Totales de los listados de usuarios sin recorrer la tabla en cada página.
+
+    - Sin búsqueda (solo rol/estado): contadores por (rol, estado) en el cache
+      compartido, mantenidos por las señales de User al crear, eliminar o
+      cambiar rol/estado. Si falta alguno se recalculan todos con un GROUP BY;
+      expiran cada USER_COUNT_CACHE_TIMEOUT para acotar desvíos por escrituras
+      que no pasan por save() (p.ej. el SET_NULL al eliminar un rol).
+    - Con búsqueda: COUNT acotado a LISTING_COUNT_EXACT_LIMIT filas. Si se
+      supera y la tabla es muy grande (reltuples de Postgres sobre
+      LISTING_COUNT_ESTIMATE_MIN_ROWS) se usa la estimación del planner.
+
+    count() retorna (total, es_exacto); facets() los conteos por estado y rol.
+    """
+
+    @staticmethod
+    def _bucket_key(role_id, estado):
+        return f"user_count:{role_id or 'none'}:{estado}"
+
+    @staticmethod
+    def _buckets():
+        role_ids = [role.id_rol for role in RoleRegistry.all_roles()] + [None]
+        estados = [estado for estado, _ in User.ESTADO_CHOICES]
+        return {
+            UserCountService._bucket_key(role_id, estado): (role_id, estado)
+            for role_id in role_ids
+            for estado in estados
+        }
+
+    @staticmethod
+    def _hydrate(buckets):
+        counts = dict.fromkeys(buckets, 0)
+        rows = User.objects.order_by().values_list("current_role_id", "estado").annotate(n=Count("pk"))
+        for role_id, estado, total in rows:
+            key = UserCountService._bucket_key(role_id, estado)
+            if key in counts:
+                counts[key] = total
+        cache.set_many(counts, timeout=settings.USER_COUNT_CACHE_TIMEOUT)
+        return counts
+
+    @staticmethod
+    def _cached_counts():
+        """{(rol, estado): total} desde los contadores del cache."""
+        buckets = UserCountService._buckets()
+        counts = cache.get_many(list(buckets))
+        if len(counts) < len(buckets):
+            counts = UserCountService._hydrate(buckets)
+        return {bucket: counts[key] for key, bucket in buckets.items()}
+
+    @staticmethod
+    def get_cached(role_id=None, estado=""):
+        """Total de usuarios del rol (None = todos) y estado ("" = todos)."""
+        return sum(
+            total
+            for (bucket_role, bucket_estado), total in UserCountService._cached_counts().items()
+            if (role_id is None or bucket_role == role_id)
+            and (not estado or bucket_estado == estado)
+        )
+
+    @staticmethod
+    def estimate(queryset):
+        """Filas estimadas por el planner de Postgres, o None si no aplica."""
+        connection = connections[queryset.db]
+        if connection.vendor != "postgresql":
+            return None
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+            if row is None or row[0] < settings.LISTING_COUNT_ESTIMATE_MIN_ROWS:
+                return None
+
+            sql, params = queryset.order_by().query.sql_with_params()
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    @staticmethod
+    def count(queryset, filtered, role_id=None, estado=""):
+        """
+        `queryset` ya filtrado; `filtered` indica filtros que los contadores
+        no cubren (búsqueda). role_id/estado describen el resto de filtros.
+        """
+        if not filtered and (role_id is None or RoleRegistry.get_role(role_id)):
+            return UserCountService.get_cached(role_id, estado), True
+
+        limit = settings.LISTING_COUNT_EXACT_LIMIT
+        capped = queryset.order_by()[:limit + 1].count()
+        if capped <= limit:
+            return capped, True
+
+        estimate = UserCountService.estimate(queryset)
+        if estimate is not None:
+            return max(estimate, capped), False
+        return queryset.count(), True
+
+    @staticmethod
+    def _grouped(queryset):
+        """
+        {(rol, estado): total} de `queryset` en un solo GROUP BY sobre a lo
+        sumo LISTING_COUNT_EXACT_LIMIT + 1 filas; None si hay más (contarlas
+        costaría lo mismo que el COUNT que count() evita).
+        """
+        limit = settings.LISTING_COUNT_EXACT_LIMIT
+        matches = queryset.order_by().values(
+            faceta_rol=F("current_role_id"), faceta_estado=F("estado")
+        )[:limit + 1]
+        sql, params = matches.query.sql_with_params()
+
+        connection = connections[queryset.db]
+        quote = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT {quote('faceta_rol')}, {quote('faceta_estado')}, COUNT(*) "
+                f"FROM ({sql}) {quote('coincidencias')} GROUP BY 1, 2",
+                params,
+            )
+            rows = cursor.fetchall()
+
+        if sum(total for _, _, total in rows) > limit:
+            return None
+        to_role_id = Role._meta.pk.to_python
+        return {
+            (to_role_id(role_id) if role_id is not None else None, estado): total
+            for role_id, estado, total in rows
+        }
+
+    @staticmethod
+    def _facets_from(counts, estado=""):
+        """
+        Por estado: todas las filas (el filtro de estado no se aplica a su
+        propia faceta). Por rol: las del estado seleccionado, si hay uno.
+        """
+        estados = {value: 0 for value, _ in User.ESTADO_CHOICES}
+        roles = {}
+        for (role_id, bucket_estado), total in counts.items():
+            if bucket_estado in estados:
+                estados[bucket_estado] += total
+            if total and (not estado or bucket_estado == estado):
+                roles[role_id] = roles.get(role_id, 0) + total
+
+        role_facets = []
+        for role_id, total in sorted(roles.items(), key=lambda item: -item[1]):
+            role = RoleRegistry.get_role(role_id) if role_id else None
+            role_facets.append({
+                "id": str(role_id) if role_id else None,
+                "name": role.name if role else "Sin rol",
+                "count": total,
+            })
+        return {"estado": estados, "roles": role_facets}
+
+    @staticmethod
+    def facets(scope, queryset, search="", role_id=None, estado=""):
+        """
+        Conteos por estado y por rol para la barra lateral del listado.
+        `queryset` es el del listado sin el filtro de estado. Sin búsqueda
+        salen de los contadores por (rol, estado); con búsqueda, de un GROUP
+        BY cacheado LISTING_FACETS_CACHE_TIMEOUT bajo la clave del listado
+        (ListingCacheService, se invalida al cambiar un usuario o un rol). Retorna None si la búsqueda supera
+        LISTING_COUNT_EXACT_LIMIT coincidencias.
+        """
+        if not search:
+            counts = {
+                bucket: total
+                for bucket, total in UserCountService._cached_counts().items()
+                if role_id is None or bucket[0] == role_id
+            }
+            return UserCountService._facets_from(counts, estado)
+
+        def compute():
+            counts = UserCountService._grouped(queryset)
+            return None if counts is None else UserCountService._facets_from(counts, estado)
+
+        return ListingCacheService.get_or_set(
+            f"{scope}:facets",
+            {"search": search, "status": estado},
+            compute,
+            timeout=settings.LISTING_FACETS_CACHE_TIMEOUT,
+            models=(User, Role),
+        )
+
+    # Mantenimiento incremental (llamado desde users_app.signals)
+
+    @staticmethod
+    def _add(role_id, estado, delta):
+        key = UserCountService._bucket_key(role_id, estado)
+        try:
+            cache.incr(key, delta)
+        except ValueError:
+            # Contador ausente: se recalcula completo en la próxima lectura
+            pass
+
+    @staticmethod
+    def remember(instance):
+        """Guarda el (rol, estado) con que se cargó la instancia."""
+        values = instance.__dict__
+        if "current_role_id" in values and "estado" in values:
+            instance._count_bucket = (values["current_role_id"], values["estado"])
+        else:
+            instance._count_bucket = None
+
+    @staticmethod
+    def on_saved(instance, created):
+        new = (instance.current_role_id, instance.estado)
+        old = None if created else getattr(instance, "_count_bucket", None)
+        instance._count_bucket = new
+        if old == new:
+            return
+
+        def apply():
+            if created:
+                UserCountService._add(*new, 1)
+            elif old is None:
+                # Instancia cargada con campos diferidos: no se conoce el bucket anterior
+                UserCountService.reset()
+            else:
+                UserCountService._add(*old, -1)
+                UserCountService._add(*new, 1)
+
+        transaction.on_commit(apply)
+
+    @staticmethod
+    def on_deleted(instance):
+        role_id, estado = getattr(instance, "_count_bucket", None) or (
+            instance.current_role_id, instance.estado
+        )
+        transaction.on_commit(lambda: UserCountService._add(role_id, estado, -1))
+
+    @staticmethod
+    def reset():
+        cache.delete_many(list(UserCountService._buckets()))
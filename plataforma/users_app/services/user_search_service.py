@@ -0,0 +1,224 @@
+import threading
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+
+from users_app.models import User
+
+
+# Campos buscables (los mismos que filtraba el icontains original)
+SEARCH_FIELDS = ("first_name", "last_name", "email")
+
+
+class IcontainsSearchBackend:
+    """LIKE '%término%' por columna; recorre la tabla completa."""
+
+    name = "icontains"
+
+    def search(self, queryset, term):
+        query = Q()
+        for field in SEARCH_FIELDS:
+            query |= Q(**{f"{field}__icontains": term})
+        return queryset.filter(query), None
+
+    def index(self, instance):
+        pass
+
+    def remove(self, pk):
+        pass
+
+    def rebuild(self):
+        return 0
+
+
+class PostgresTrigramSearchBackend(IcontainsSearchBackend):
+    """
+    Mismo filtro icontains, acelerado por los índices GIN gin_trgm_ops sobre
+    UPPER(columna) de la migración 0005, y ordenado por similitud trigram.
+    Los índices se mantienen solos; no hay nada que sincronizar.
+    """
+
+    name = "postgres_trigram"
+
+    def search(self, queryset, term):
+        from django.contrib.postgres.search import TrigramSimilarity
+        from django.db.models.functions import Greatest
+
+        queryset, _ = super().search(queryset, term)
+        rank = Greatest(*(TrigramSimilarity(field, term) for field in SEARCH_FIELDS))
+        return queryset.annotate(search_rank=rank), UserSearchService.RANK_FIELD
+
+
+class SqliteFtsSearchBackend(IcontainsSearchBackend):
+    """
+    Tabla FTS5 con tokenizer trigram (usuarios_fts), equivalente a buscar una
+    subcadena sin distinguir mayúsculas pero resuelta por índice. El rowid de
+    cada fila sale de usuarios_busqueda (user_id -> rowid) para poder
+    actualizar y borrar por clave. Se sincroniza desde las señales de User;
+    `manage.py rebuild_user_search` la regenera si se desfasó.
+    Términos de menos de 3 caracteres no tienen trigramas y usan icontains.
+
+    bm25 se calcula para cada coincidencia, así que solo se ordena por
+    relevancia si hay hasta USER_SEARCH_RANK_LIMIT; con términos más
+    frecuentes se ordena por rowid (indexados más recientes primero), orden
+    que FTS5 entrega sin materializar todas las coincidencias. El rowid es
+    único por usuario, así que ese orden no lleva desempate por pk (que
+    obligaría a ordenar todas las coincidencias); bm25 sí lo lleva.
+    """
+
+    name = "sqlite_fts5"
+
+    def search(self, queryset, term):
+        if len(term) < 3:
+            return super().search(queryset, term)
+
+        phrase = '"{}"'.format(term.replace('"', '""'))
+        limit = settings.USER_SEARCH_RANK_LIMIT
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT COUNT(*) FROM (SELECT 1 FROM usuarios_fts WHERE usuarios_fts MATCH %s LIMIT %s)",
+                [phrase, limit + 1],
+            )
+            matches = cursor.fetchone()[0]
+        if matches <= limit:
+            rank_field, rank = UserSearchService.RANK_FIELD, "-usuarios_fts.rank"
+        else:
+            rank_field, rank = UserSearchService.ROWID_RANK_FIELD, "usuarios_fts.rowid"
+
+        queryset = queryset.extra(
+            select={rank_field: rank},
+            tables=["usuarios_busqueda", "usuarios_fts"],
+            where=[
+                "usuarios_busqueda.user_id = usuarios.id",
+                "usuarios_fts.rowid = usuarios_busqueda.id",
+                "usuarios_fts MATCH %s",
+            ],
+            params=[phrase],
+        )
+        return queryset, rank_field
+
+    def _db_id(self, pk):
+        return User._meta.pk.get_db_prep_value(pk, connection)
+
+    def index(self, instance):
+        user_id = self._db_id(instance.pk)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO usuarios_busqueda (user_id) VALUES (%s) ON CONFLICT (user_id) DO NOTHING",
+                [user_id],
+            )
+            cursor.execute("SELECT id FROM usuarios_busqueda WHERE user_id = %s", [user_id])
+            rowid = cursor.fetchone()[0]
+            cursor.execute("DELETE FROM usuarios_fts WHERE rowid = %s", [rowid])
+            cursor.execute(
+                "INSERT INTO usuarios_fts (rowid, nombre, apellido, email) VALUES (%s, %s, %s, %s)",
+                [rowid, instance.first_name, instance.last_name, instance.email],
+            )
+
+    def remove(self, pk):
+        user_id = self._db_id(pk)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "DELETE FROM usuarios_fts WHERE rowid = "
+                "(SELECT id FROM usuarios_busqueda WHERE user_id = %s)",
+                [user_id],
+            )
+            cursor.execute("DELETE FROM usuarios_busqueda WHERE user_id = %s", [user_id])
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM usuarios_fts")
+            cursor.execute("DELETE FROM usuarios_busqueda")
+            cursor.execute("INSERT INTO usuarios_busqueda (user_id) SELECT id FROM usuarios")
+            cursor.execute(
+                "INSERT INTO usuarios_fts (rowid, nombre, apellido, email) "
+                "SELECT b.id, u.nombre, u.last_name, u.email "
+                "FROM usuarios_busqueda b JOIN usuarios u ON u.id = b.user_id"
+            )
+            cursor.execute("INSERT INTO usuarios_fts (usuarios_fts) VALUES ('optimize')")
+            cursor.execute("SELECT COUNT(*) FROM usuarios_busqueda")
+            return cursor.fetchone()[0]
+
+
+class UserSearchService:
+    """
+    Búsqueda de usuarios de los listados de administración. El backend se
+    elige una vez por proceso según USER_SEARCH_BACKEND ("auto" o
+    "icontains") y lo que la migración 0005 pudo crear en la base:
+    pg_trgm en Postgres, FTS5 trigram en SQLite; si no, icontains.
+    """
+
+    RANK_FIELD = "search_rank"
+    # Rank que no repite valores entre filas (rowid de FTS5): ordena sin desempate
+    ROWID_RANK_FIELD = "search_rowid"
+
+    _backend = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _detect():
+        if settings.USER_SEARCH_BACKEND == "icontains":
+            return IcontainsSearchBackend()
+
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+                if cursor.fetchone():
+                    return PostgresTrigramSearchBackend()
+            elif connection.vendor == "sqlite":
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'usuarios_fts'")
+                if cursor.fetchone():
+                    return SqliteFtsSearchBackend()
+        return IcontainsSearchBackend()
+
+    @classmethod
+    def get_backend(cls):
+        if cls._backend is None:
+            with cls._lock:
+                if cls._backend is None:
+                    cls._backend = cls._detect()
+        return cls._backend
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls._backend = None
+
+    @classmethod
+    def search(cls, queryset, term):
+        """
+        Filtra por `term`. Retorna (queryset, rank_field): el nombre del campo
+        de relevancia que trae el queryset (mayor = más relevante) o None si
+        el backend no ordena por relevancia.
+        """
+        return cls.get_backend().search(queryset, term)
+
+    @classmethod
+    def is_unique_rank(cls, rank_field):
+        return rank_field == cls.ROWID_RANK_FIELD
+
+    # Sincronización (llamada desde users_app.signals)
+
+    @staticmethod
+    def remember(instance):
+        values = instance.__dict__
+        if all(field in values for field in SEARCH_FIELDS):
+            instance._search_values = tuple(values[field] for field in SEARCH_FIELDS)
+        else:
+            instance._search_values = None
+
+    @classmethod
+    def on_saved(cls, instance, created):
+        current = tuple(getattr(instance, field) for field in SEARCH_FIELDS)
+        if created or current != getattr(instance, "_search_values", None):
+            cls.get_backend().index(instance)
+        instance._search_values = current
+
+    @classmethod
+    def on_deleted(cls, instance):
+        cls.get_backend().remove(instance.pk)
+
+    @classmethod
+    def rebuild(cls):
+        return cls.get_backend().rebuild()
@@ -0,0 +1,98 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+from users_app.models import User
+from users_app.services.role_registry import RoleRegistry
+
+
+class UserSnapshotService:
+    """
+    Copia compacta de la fila del usuario autenticado en el cache compartido.
+    El backend de autenticación reconstruye request.user desde aquí sin
+    consultar la BD, y el rol se toma del RoleRegistry en memoria.
+
+    La copia se invalida cuando el usuario se guarda o elimina (signals) y
+    cuando cambia la versión de roles/permisos. Cada usuario tiene además un
+    contador de versión que invalidate() incrementa: la copia lleva la
+    versión leída antes de consultar la BD, así una petición que leyó la fila
+    antes de un cambio no puede dejar en cache una copia vieja.
+
+    No se guarda la contraseña (queda como campo diferido y se carga de la BD
+    si algo la usa); para verificar la sesión se guarda su hash de sesión.
+    """
+
+    _field_names = None
+
+    @staticmethod
+    def _cache_key(user_id):
+        return f"user_snapshot:{user_id}"
+
+    @staticmethod
+    def _version_key(user_id):
+        return f"user_snapshot_version:{user_id}"
+
+    @staticmethod
+    def _initial_version():
+        # Si el contador expira no vuelve a un valor ya usado por una copia vigente
+        return time.time_ns() // 1_000_000
+
+    @classmethod
+    def _get_field_names(cls):
+        if cls._field_names is None:
+            cls._field_names = [
+                field.attname for field in User._meta.concrete_fields if field.attname != "password"
+            ]
+        return cls._field_names
+
+    @classmethod
+    def version(cls, user_id):
+        """Versión actual; se lee antes de consultar la BD y se pasa a store()."""
+        key = cls._version_key(user_id)
+        version = cache.get(key)
+        if version is None:
+            cache.add(key, cls._initial_version(), timeout=settings.USER_SNAPSHOT_TIMEOUT)
+            version = cache.get(key)
+        return version
+
+    @classmethod
+    def store(cls, user, version):
+        if version is None:
+            return
+        snapshot = {
+            "version": version,
+            "role_version": RoleRegistry.version(),
+            "auth_hash": user.get_session_auth_hash(),
+            "values": [getattr(user, name) for name in cls._get_field_names()],
+        }
+        cache.set(cls._cache_key(user.pk), snapshot, timeout=settings.USER_SNAPSHOT_TIMEOUT)
+
+    @classmethod
+    def load(cls, user_id):
+        """Devuelve un User reconstruido desde el cache, o None si no hay copia válida."""
+        snapshot_key, version_key = cls._cache_key(user_id), cls._version_key(user_id)
+        values = cache.get_many([snapshot_key, version_key])
+        snapshot = values.get(snapshot_key)
+        if (
+            not snapshot
+            or snapshot.get("version") != values.get(version_key)
+            or snapshot.get("role_version") != RoleRegistry.version()
+        ):
+            return None
+
+        user = User.from_db(DEFAULT_DB_ALIAS, cls._get_field_names(), snapshot["values"])
+        user._snapshot_auth_hash = snapshot["auth_hash"]
+        role = RoleRegistry.get_role(user.current_role_id) if user.current_role_id else None
+        User._meta.get_field("current_role").set_cached_value(user, role)
+        return user
+
+    @classmethod
+    def invalidate(cls, user_id):
+        key = cls._version_key(user_id)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, cls._initial_version(), timeout=settings.USER_SNAPSHOT_TIMEOUT)
+        cache.delete(cls._cache_key(user_id))
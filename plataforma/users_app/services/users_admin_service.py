@@ -1,11 +1,20 @@
-from django.db.models import Q
+from users_app.services.listing_cache_service import ListingCacheService
 from users_app.services.pagination_service import PaginationService
 from users_app.forms.users_update_form import UserUpdateForm
 from users_app.forms.users_form import UserForm
-from users_app.models import User, Role
+from users_app.models import Role, User
+from users_app.services.role_registry import RoleRegistry
+from users_app.services.user_autocomplete_service import UserAutocompleteService
+from users_app.services.user_count_service import UserCountService
+from users_app.services.user_search_service import UserSearchService
+from django.conf import settings
 from django.core.exceptions import ValidationError
 
 
+# Columnas del listado (en el orden en que se desempaquetan las filas)
+LIST_FIELDS = ("id", "first_name", "last_name", "email", "current_role__name", "estado", "credits")
+
+
 class UsersAdminService:
 
     @staticmethod
@@ -56,52 +65,41 @@ class UsersAdminService:
             "phone_number": user.phone_number,
             "estado": user.estado,
             "is_superuser": user.is_superuser,
-            "current_rank": str(user.current_rank.id) if user.current_rank else None,
-            "current_role": (
-                str(user.current_role.id_rol) if user.current_role else None
-            )
+            "current_rank": None,  # aún no existe un modelo de rangos
+            "current_role": str(user.current_role_id) if user.current_role_id else None,
         }
 
     @staticmethod
     def get_users_for_frontend(params):
-        page = int(params.get("page", 1))
-        per_page = int(params.get("per_page", 10))
+        per_page = PaginationService.get_per_page(params)
         search = params.get("search", "")
-        sort_by = params.get("sort_by", "id")
+        sort_by = params.get("sort_by", "")
         sort_direction = params.get("sort_direction", "asc")
         estado = params.get("status", "")
 
-        qs = User.objects.all()
-        if search:
-            qs = qs.filter(
-                Q(first_name__icontains=search)
-                | Q(last_name__icontains=search)
-                | Q(email__icontains=search)
-            )
-        if estado:
-            qs = qs.filter(estado=estado)
-
         allowed_sort_fields = ["id", "first_name", "email", "estado"]
         if sort_by not in allowed_sort_fields:
-            sort_by = "id"
-        order = f"{'-' if sort_direction == 'desc' else ''}{sort_by}"
-        qs = qs.order_by(order)
-
-        paginated = PaginationService.paginate_queryset(qs, page, per_page)
+            sort_by = ""
 
-        paginated["data"] = [
+        # Mismo resultado para los mismos filtros hasta que cambie un usuario o un rol
+        paginated = ListingCacheService.get_or_set(
+            "users_admin",
             {
-                "id": str(u.id),
-                "name": f"{u.first_name} {u.last_name}",
-                "email": u.email,
-                "role": u.current_role.name if u.current_role else "Sin rol",
-                "rank": u.current_rank.name if u.current_rank else "Sin rango",
-                "estado": u.estado,
-                "credits": u.credits,
-            }
-            for u in paginated["data"]
-        ]
-
+                "search": search,
+                "status": estado,
+                "sort_by": sort_by,
+                "sort_direction": sort_direction,
+                "per_page": per_page,
+                **PaginationService.get_position(params),
+            },
+            lambda: UsersAdminService._get_users_page(
+                params, search, sort_by, sort_direction, estado
+            ),
+            timeout=settings.LISTING_CACHE_TIMEOUT,
+            models=(User, Role),
+        )
+
+        # Fuera del cache: devuelve los filtros tal como llegaron (la clave ignora mayúsculas)
         paginated["filters"] = {
             "search": search,
             "per_page": per_page,
@@ -112,7 +110,60 @@ class UsersAdminService:
 
         return paginated
 
+    @staticmethod
+    def _get_users_page(params, search, sort_by, sort_direction, estado):
+        qs = User.objects.all()
+        rank_field = None
+        if search:
+            qs, rank_field = UserSearchService.search(qs, search)
+        facets = UserCountService.facets(
+            "users_admin", qs, search=search, role_id=None, estado=estado
+        )
+        if estado:
+            qs = qs.filter(estado=estado)
+
+        sort_field = sort_by or "id"
+        descending = sort_direction == "desc"
+        unique_sort = False
+        # Sin orden explícito, los resultados de una búsqueda van por relevancia
+        if not sort_by and rank_field and not PaginationService.is_cursor_mode(params):
+            sort_field, descending = rank_field, True
+            unique_sort = UserSearchService.is_unique_rank(rank_field)
+
+        paginated = PaginationService.paginate(
+            qs,
+            params,
+            sort_field,
+            descending=descending,
+            unique_sort=unique_sort,
+            fields=LIST_FIELDS,
+            count=lambda queryset: UserCountService.count(
+                queryset, filtered=bool(search), role_id=None, estado=estado
+            ),
+        )
+
+        paginated["data"] = [
+            {
+                "id": str(user_id),
+                "name": f"{first_name} {last_name}",
+                "email": email,
+                "role": role_name or "Sin rol",
+                "rank": "Sin rango",
+                "estado": estado,
+                "credits": credits,
+            }
+            for user_id, first_name, last_name, email, role_name, estado, credits in paginated["data"]
+        ]
+
+        paginated["facets"] = facets
+
+        return paginated
+
+    @staticmethod
+    def autocomplete(term):
+        return UserAutocompleteService.suggest(term, scope="users_admin")
+
     @staticmethod
     def get_roles_and_ranks():
-        roles = [{"id": str(r.id_rol), "name": r.name} for r in Role.objects.all()]
+        roles = [{"id": str(r.id_rol), "name": r.name} for r in RoleRegistry.all_roles()]
         return {"roles": roles}
@@ -0,0 +1,80 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from users_app.models import LogBlockedUser, User
+from users_app.services.listing_cache_service import ListingCacheService
+from users_app.services.login_risk_service import LoginRiskTracker
+from users_app.services.trusted_device_service import TrustedDeviceService
+from users_app.services.user_count_service import UserCountService
+from users_app.services.user_search_service import UserSearchService
+from users_app.services.user_snapshot_service import UserSnapshotService
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_snapshot(sender, instance, **kwargs):
+    # Se invalida ya y otra vez al confirmar: una petición que lea la fila
+    # antes del commit guardaría la versión vieja con la versión ya incrementada
+    user_id = instance.pk
+    UserSnapshotService.invalidate(user_id)
+    transaction.on_commit(lambda: UserSnapshotService.invalidate(user_id))
+
+
+@receiver(post_save, sender=User)
+def revoke_trusted_devices_on_ban(sender, instance, **kwargs):
+    # Cubre el baneo por múltiples IPs y el baneo desde administración
+    if instance.estado == "BANEADO":
+        TrustedDeviceService.revoke_all(instance.pk)
+
+
+@receiver(post_init, sender=User)
+def remember_loaded_values(sender, instance, **kwargs):
+    UserCountService.remember(instance)
+    UserSearchService.remember(instance)
+
+
+@receiver(post_save, sender=User)
+def update_user_counts_on_save(sender, instance, created, **kwargs):
+    UserCountService.on_saved(instance, created)
+
+
+@receiver(post_delete, sender=User)
+def update_user_counts_on_delete(sender, instance, **kwargs):
+    UserCountService.on_deleted(instance)
+
+
+@receiver(post_save, sender=User)
+def update_search_index_on_save(sender, instance, created, **kwargs):
+    UserSearchService.on_saved(instance, created)
+
+
+@receiver(post_delete, sender=User)
+def update_search_index_on_delete(sender, instance, **kwargs):
+    UserSearchService.on_deleted(instance)
+
+
+# Campos que muestran o filtran los listados de usuarios
+LISTED_USER_FIELDS = {"first_name", "last_name", "email", "current_role", "estado", "credits"}
+
+
+@receiver(post_save, sender=User)
+def bump_listing_cache_on_save(sender, instance, created, update_fields, **kwargs):
+    # Altas, ediciones y baneos pasan todos por save(); el login solo guarda
+    # last_login y no debe invalidar los listados
+    if update_fields and not LISTED_USER_FIELDS & set(update_fields):
+        return
+    transaction.on_commit(lambda: ListingCacheService.bump(User))
+
+
+@receiver(post_delete, sender=User)
+def bump_listing_cache_on_delete(sender, instance, **kwargs):
+    transaction.on_commit(lambda: ListingCacheService.bump(User))
+
+
+@receiver(post_save, sender=LogBlockedUser)
+def reset_login_risk_on_unblock(sender, instance, **kwargs):
+    # Un reinicio (is_active=False) cambia la ventana de intentos/IPs del usuario
+    if not instance.is_active:
+        user_id = instance.user_id
+        transaction.on_commit(lambda: LoginRiskTracker.reset(user_id))
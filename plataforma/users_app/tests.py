@@ -1,3 +1,581 @@
-from django.test import TestCase
+import base64
+import json
+from io import StringIO
 
-# Create your tests here.
+from cryptography.hazmat.primitives import serialization
+from django.conf import settings
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.core import mail
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from config.crypto import OAEP_PADDING, get_keyring
+from config.middleware.login_gate import login_gate
+from config.utils import create_decrypted_data
+from users_app.ids import uuid7
+from users_app.models import EmailOutbox, LogBlockedUser, Role, User
+from users_app.services import email_service
+from users_app.services.auth_service import complete_2fa_login
+from users_app.services.customers_seller_service import CustomerSellerService
+from users_app.services.email_outbox_service import EmailOutboxService
+from users_app.services.email_renderer import EmailRenderer
+from users_app.services.otp_service import OtpService
+from users_app.services.login_risk_service import LoginRiskTracker
+from users_app.services.pagination_service import PaginationService
+from users_app.services.pending_registration_service import PendingRegistrationService
+from users_app.services.role_registry import RoleRegistry
+from users_app.services.trusted_device_service import TrustedDeviceService
+from users_app.services.user_search_service import IcontainsSearchBackend, UserSearchService
+from users_app.services.user_snapshot_service import UserSnapshotService
+from users_app.services.users_admin_service import UsersAdminService
+
+
+def reset_caches():
+    """
+    Limpia el cache entre tests conservando el contador de versión de
+    RoleRegistry: si volviera a empezar, un snapshot de roles de otra clase
+    de tests con la misma versión se seguiría usando.
+    """
+    version = cache.get(RoleRegistry.VERSION_KEY, 0)
+    cache.clear()
+    cache.set(RoleRegistry.VERSION_KEY, version, timeout=None)
+    RoleRegistry.invalidate()
+
+
+class ListingQueryCountTests(TestCase):
+    """Los listados hacen un número fijo de consultas sin importar per_page."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_role = Role.objects.create(name="ADMINISTRADOR")
+        cls.cliente_role = Role.objects.create(name="CLIENTE")
+        User.objects.bulk_create(
+            User(
+                email=f"user{i}@example.com",
+                username=f"user{i}",
+                first_name=f"Nombre{i}",
+                last_name="Apellido",
+                estado="BANEADO" if i % 5 == 0 else "ACTIVO",
+                current_role=cls.cliente_role if i % 2 else cls.admin_role,
+            )
+            for i in range(60)
+        )
+        # bulk_create no dispara las señales que mantienen el índice de búsqueda
+        UserSearchService.reset()
+        UserSearchService.rebuild()
+
+    def setUp(self):
+        reset_caches()
+        # Primera carga: snapshot de roles y contadores por (rol, estado)
+        UsersAdminService.get_users_for_frontend({})
+        CustomerSellerService.get_customers_for_frontend({})
+
+    def assertListingQueries(self, listing, params, expected):
+        for per_page in (5, 25):
+            with self.assertNumQueries(expected):
+                result = listing({**params, "per_page": per_page})
+            self.assertEqual(len(result["data"]), per_page)
+
+    def test_users_listing(self):
+        self.assertListingQueries(UsersAdminService.get_users_for_frontend, {}, 1)
+        self.assertListingQueries(
+            UsersAdminService.get_users_for_frontend, {"status": "ACTIVO", "sort_by": "email"}, 1
+        )
+
+    def search_queries(self):
+        # COUNT acotado + página (+ sondeo de frecuencia del término en FTS5)
+        return 3 if UserSearchService.get_backend().name == "sqlite_fts5" else 2
+
+    def test_users_listing_with_search(self):
+        # La primera búsqueda agrega el GROUP BY de facets; luego sale del cache
+        with self.assertNumQueries(self.search_queries() + 1):
+            UsersAdminService.get_users_for_frontend({"search": "user"})
+        self.assertListingQueries(
+            UsersAdminService.get_users_for_frontend, {"search": "user"}, self.search_queries()
+        )
+
+    def test_users_listing_cursor(self):
+        self.assertListingQueries(
+            UsersAdminService.get_users_for_frontend, {"cursor": "", "sort_by": "first_name"}, 1
+        )
+
+    def test_ranked_search_pages_do_not_overlap(self):
+        # bm25 (con empates) y, sobre el límite, el orden por rowid de FTS5
+        for rank_limit in (2000, 10):
+            reset_caches()
+            with override_settings(USER_SEARCH_RANK_LIMIT=rank_limit):
+                ids = [
+                    row["id"]
+                    for page in range(1, 10)
+                    for row in UsersAdminService.get_users_for_frontend(
+                        {"search": "user", "per_page": 7, "page": page}
+                    )["data"]
+                ]
+            self.assertEqual(len(ids), 60)
+            self.assertEqual(len(set(ids)), 60)
+
+    def test_customers_listing(self):
+        self.assertListingQueries(CustomerSellerService.get_customers_for_frontend, {}, 1)
+        CustomerSellerService.get_customers_for_frontend({"search": "user"})
+        self.assertListingQueries(
+            CustomerSellerService.get_customers_for_frontend, {"search": "user"}, self.search_queries()
+        )
+
+    def test_listing_rows(self):
+        result = UsersAdminService.get_users_for_frontend({"sort_by": "email", "per_page": 60})
+        self.assertEqual(result["total"], 60)
+        self.assertTrue(result["total_exact"])
+        row = next(row for row in result["data"] if row["email"] == "user1@example.com")
+        self.assertEqual(row["name"], "Nombre1 Apellido")
+        self.assertEqual(row["role"], "CLIENTE")
+        self.assertEqual(row["rank"], "Sin rango")
+
+        customers = CustomerSellerService.get_customers_for_frontend({"status": "BANEADO"})
+        self.assertEqual(customers["total"], 6)
+        self.assertTrue(all(row["role"] == "CLIENTE" for row in customers["data"]))
+
+    def test_facets(self):
+        facets = UsersAdminService.get_users_for_frontend({"status": "BANEADO"})["facets"]
+        self.assertEqual(facets["estado"], {"ACTIVO": 48, "BANEADO": 12})
+        self.assertEqual(
+            {role["name"]: role["count"] for role in facets["roles"]},
+            {"ADMINISTRADOR": 6, "CLIENTE": 6},
+        )
+
+        # Con búsqueda: mismos conteos con un GROUP BY, cacheado por filtros normalizados
+        searched = UsersAdminService.get_users_for_frontend({"search": "Nombre1", "status": "BANEADO"})
+        self.assertEqual(searched["facets"]["estado"], {"ACTIVO": 9, "BANEADO": 2})
+        with self.assertNumQueries(self.search_queries()):
+            cached = UsersAdminService.get_users_for_frontend(
+                {"search": "NOMBRE1", "status": "BANEADO", "page": 2}
+            )
+        self.assertEqual(cached["facets"], searched["facets"])
+
+        customers = CustomerSellerService.get_customers_for_frontend({})["facets"]
+        self.assertEqual(customers["estado"], {"ACTIVO": 24, "BANEADO": 6})
+        self.assertEqual([role["name"] for role in customers["roles"]], ["CLIENTE"])
+
+    def test_listing_cache(self):
+        params = {"search": "Nombre1", "per_page": 5}
+        first = UsersAdminService.get_users_for_frontend(params)
+        with self.assertNumQueries(0):
+            cached = UsersAdminService.get_users_for_frontend({**params, "search": "NOMBRE1"})
+        self.assertEqual(cached["data"], first["data"])
+        self.assertEqual(cached["filters"]["search"], "NOMBRE1")
+
+        # Guardar solo last_login (login) no invalida; editar un usuario sí
+        user = User.objects.get(email="user1@example.com")
+        with self.captureOnCommitCallbacks(execute=True):
+            user.save(update_fields=["last_login"])
+        with self.assertNumQueries(0):
+            UsersAdminService.get_users_for_frontend(params)
+        user.first_name = "Otro"
+        with self.captureOnCommitCallbacks(execute=True):
+            user.save()
+        refreshed = UsersAdminService.get_users_for_frontend(params)
+        self.assertNotIn(str(user.id), [row["id"] for row in refreshed["data"]])
+
+    def test_user_data(self):
+        user = User.objects.get(email="user1@example.com")
+        with self.assertNumQueries(1):
+            data = UsersAdminService.get_user_data(user.id)
+        self.assertEqual(data["current_role"], str(self.cliente_role.id_rol))
+
+
+class UserSearchTests(TestCase):
+    """El backend activo devuelve lo mismo que icontains y se sincroniza con save/delete."""
+
+    @classmethod
+    def setUpTestData(cls):
+        UserSearchService.reset()
+        for first_name, last_name, email in (
+            ("María", "Quispe", "mquispe@example.com"),
+            ("Rosa", "Quispe Mamani", "rosa@example.com"),
+            ("Juan", None, "juan.rodriguez@example.com"),
+        ):
+            User.objects.create(
+                email=email, username=email, first_name=first_name, last_name=last_name
+            )
+
+    def search_ids(self, backend, term):
+        queryset, _ = backend.search(User.objects.all(), term)
+        return set(queryset.values_list("id", flat=True))
+
+    def test_matches_icontains(self):
+        backend = UserSearchService.get_backend()
+        for term in ("quispe", "QUI", "rodri", "example", "ju", "nadie", 'a"b'):
+            self.assertEqual(
+                self.search_ids(backend, term), self.search_ids(IcontainsSearchBackend(), term)
+            )
+
+    def test_index_follows_save_and_delete(self):
+        user = User.objects.get(email="rosa@example.com")
+        user.first_name = "Rocío"
+        user.save()
+        result = UsersAdminService.get_users_for_frontend({"search": "rocío"})
+        self.assertEqual([row["email"] for row in result["data"]], ["rosa@example.com"])
+
+        # El cache del listado se invalida al confirmar la transacción
+        with self.captureOnCommitCallbacks(execute=True):
+            user.delete()
+        self.assertEqual(UsersAdminService.get_users_for_frontend({"search": "rocío"})["total"], 0)
+
+
+class UserAutocompleteTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.cliente_role = Role.objects.create(name="CLIENTE")
+        cls.admin_role = Role.objects.create(name="ADMINISTRADOR")
+        for email, first_name, last_name, role in (
+            ("mquispe@example.com", "María", "Quispe", cls.cliente_role),
+            ("rosa@example.com", "Rosa", "Quispe", cls.admin_role),
+            ("quique@example.com", "Enrique", "Flores", cls.cliente_role),
+        ):
+            User.objects.create(
+                email=email, username=email, first_name=first_name,
+                last_name=last_name, current_role=role,
+            )
+
+    def setUp(self):
+        reset_caches()
+
+    def emails(self, results):
+        return [result["email"] for result in results]
+
+    def test_prefix_match(self):
+        # Primero coincidencias por email, luego por nombre y apellido
+        self.assertEqual(
+            self.emails(UsersAdminService.autocomplete("QUI")),
+            ["quique@example.com", "mquispe@example.com", "rosa@example.com"],
+        )
+        self.assertEqual(self.emails(UsersAdminService.autocomplete("ros")), ["rosa@example.com"])
+        self.assertEqual(UsersAdminService.autocomplete("q"), [])
+        self.assertEqual(UsersAdminService.autocomplete("uispe"), [])
+
+    def test_accented_uppercase_prefix(self):
+        # LOWER() de SQLite no pasa "Á" ni "Ñ" a minúsculas; str.lower sí
+        angel = User.objects.create(
+            email="angel@example.com", username="angel", first_name="ÁNGEL",
+            last_name="Ñahui", current_role=self.cliente_role,
+        )
+        self.assertEqual(self.emails(UsersAdminService.autocomplete("Áng")), ["angel@example.com"])
+        self.assertEqual(self.emails(UsersAdminService.autocomplete("ñah")), ["angel@example.com"])
+        self.assertEqual(self.emails(CustomerSellerService.autocomplete("ÑAHUI")), ["angel@example.com"])
+
+        angel.last_name = "Ñaupari"
+        angel.save(update_fields=["last_name"])
+        self.assertEqual(self.emails(UsersAdminService.autocomplete("ÑAUP")), ["angel@example.com"])
+
+    def test_customers_scope(self):
+        self.assertEqual(
+            self.emails(CustomerSellerService.autocomplete("qui")),
+            ["quique@example.com", "mquispe@example.com"],
+        )
+
+    def test_short_prefixes_are_cached(self):
+        UsersAdminService.autocomplete("qui")
+        with self.assertNumQueries(0):
+            UsersAdminService.autocomplete(" Qui ")
+
+
+class HotQueryIndexTests(TestCase):
+
+    def test_hot_queries_use_indexes(self):
+        # --strict falla si alguna consulta frecuente recorre una tabla completa
+        call_command("explain_hot_queries", "--strict", stdout=StringIO())
+
+
+class UUID7Tests(TestCase):
+
+    def test_ids_follow_creation_order(self):
+        ids = [uuid7() for _ in range(1000)]
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(len(set(ids)), len(ids))
+        self.assertTrue(all(value.version == 7 for value in ids))
+
+        first = User.objects.create(email="a@example.com", username="a")
+        second = User.objects.create(email="b@example.com", username="b")
+        self.assertLess(first.id, second.id)
+        self.assertEqual(list(User.objects.values_list("id", flat=True)), [first.id, second.id])
+
+
+class PendingRegistrationTests(TestCase):
+
+    def setUp(self):
+        reset_caches()
+
+    def pending_user(self, password):
+        return User(
+            email="nuevo@example.com", username="nuevo", first_name="Nuevo",
+            last_name="", phone_number="", password=password,
+        )
+
+    def test_other_session_cannot_replace_pending_registration(self):
+        PendingRegistrationService.save(self.pending_user("hash-dueno"), timeout=60, owner="sesion-a")
+        with self.assertRaises(ValidationError):
+            PendingRegistrationService.save(self.pending_user("hash-otro"), timeout=60, owner="sesion-b")
+        self.assertEqual(PendingRegistrationService.get("nuevo@example.com")["password"], "hash-dueno")
+
+        # La misma sesión sí puede volver a enviar el formulario
+        PendingRegistrationService.save(self.pending_user("hash-nuevo"), timeout=60, owner="sesion-a")
+        pending = PendingRegistrationService.get("nuevo@example.com")
+        self.assertEqual(PendingRegistrationService.build_user(pending).password, "hash-nuevo")
+
+
+class ResendCodeTests(TestCase):
+
+    def setUp(self):
+        reset_caches()
+        self.request = RequestFactory().get("/resend-code/")
+        self.user = User(email="codigo@example.com", username="codigo", first_name="Codigo")
+
+    def sent_code(self, resend):
+        rows = EmailOutbox.objects.filter(subject__contains="Reenviado")
+        if not resend:
+            rows = EmailOutbox.objects.exclude(pk__in=rows)
+        return rows.get().body_text.split("es: ")[1].split()[0]
+
+    def test_resend_issues_a_new_code(self):
+        email_service.send_verification_code(self.request, self.user)
+        self.assertTrue(email_service.resend_verification_code(self.request, self.user))
+        first, second = self.sent_code(resend=False), self.sent_code(resend=True)
+
+        # El código anterior queda reemplazado por el nuevo
+        if first != second:
+            self.assertFalse(email_service.verify_code(self.user, first))
+        self.assertTrue(email_service.verify_code(self.user, second))
+
+    @override_settings(SITE_URL="https://aciertaperu.example")
+    def test_logo_url_ignores_request_host(self):
+        EmailRenderer._logo_url = None
+        request = RequestFactory().get("/resend-code/", HTTP_HOST="otro-host.example")
+        try:
+            self.assertTrue(
+                EmailRenderer.get_logo_url(request).startswith("https://aciertaperu.example/")
+            )
+        finally:
+            EmailRenderer._logo_url = None
+
+
+class EmailOutboxTests(TestCase):
+
+    def test_send_batch_claims_sends_and_clears_bodies(self):
+        first = EmailOutboxService.enqueue("a@example.com", "Código", "Tu código es: ABC123")
+        second = EmailOutboxService.enqueue("b@example.com", "Código", "Tu código es: XYZ789")
+
+        # Reservado por otro worker: no se toma hasta que vence la reserva
+        claimed = EmailOutboxService.claim(batch_size=1)
+        self.assertEqual(len(claimed), 1)
+        self.assertEqual(EmailOutbox.objects.filter(estado="ENVIANDO").count(), 1)
+
+        sent, failed = EmailOutboxService.send_batch(EmailOutboxService.get_connection(), batch_size=10)
+        self.assertEqual((sent, failed), (1, 0))
+        self.assertEqual(len(mail.outbox), 1)
+
+        EmailOutboxService.release(claimed)
+        EmailOutboxService.send_batch(EmailOutboxService.get_connection(), batch_size=10)
+        for item in (first, second):
+            item.refresh_from_db()
+            self.assertEqual(item.estado, "ENVIADO")
+            self.assertEqual(item.body_text, "")
+        self.assertEqual(len(mail.outbox), 2)
+
+
+class CursorPaginationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.bulk_create(
+            User(email=None if i % 3 == 0 else f"user{i}@example.com", username=f"user{i}")
+            for i in range(10)
+        )
+
+    def walk(self, descending):
+        pages, cursor = [], ""
+        while cursor is not None:
+            page = PaginationService.paginate_cursor(
+                User.objects.all(), "email", descending, cursor, per_page=3, fields=("id", "email")
+            )
+            pages.append(page)
+            cursor = page["next_cursor"]
+        return pages
+
+    def test_nullable_sort_field(self):
+        for descending in (False, True):
+            pages = self.walk(descending)
+            rows = [row for page in pages for row in page["data"]]
+            self.assertEqual(len(rows), 10)
+            self.assertEqual(len({row[0] for row in rows}), 10)
+            emails = [row[1] for row in rows]
+            # NULL al final en ascendente y al inicio en descendente
+            self.assertEqual(emails.count(None), 4)
+            nulls = [None] * 4
+            self.assertEqual(emails[-4:] if not descending else emails[:4], nulls)
+            values = [email for email in emails if email is not None]
+            self.assertEqual(values, sorted(values, reverse=descending))
+
+            # Volver con prev_cursor desde la última página repite las anteriores
+            previous = PaginationService.paginate_cursor(
+                User.objects.all(), "email", descending, pages[-1]["prev_cursor"],
+                per_page=3, fields=("id", "email"),
+            )
+            self.assertEqual(previous["data"], pages[-2]["data"])
+
+
+class LoginRiskTrackerTests(TestCase):
+
+    def setUp(self):
+        reset_caches()
+        self.user = User.objects.create(email="riesgo@example.com", username="riesgo")
+
+    def test_login_ips_are_counted_once(self):
+        for ip_address in ("10.0.0.1", "10.0.0.2", "10.0.0.1", "10.0.0.3"):
+            LoginRiskTracker.record_login_ip(self.user.id, ip_address)
+        state = LoginRiskTracker.get_state(self.user.id)
+        self.assertEqual(state.ip_count, 3)
+        self.assertFalse(LoginRiskTracker.has_multiple_ips(state))
+
+        # Una ranura ocupada por otro worker entre la lectura y el add
+        cache.add(LoginRiskTracker._ip_keys(self.user.id)[3], "10.0.0.4")
+        LoginRiskTracker.record_login_ip(self.user.id, "10.0.0.5")
+        state = LoginRiskTracker.get_state(self.user.id)
+        self.assertEqual(state.ip_count, 5)
+        self.assertTrue(LoginRiskTracker.has_multiple_ips(state))
+
+    def test_reset_row_clears_cached_lockout(self):
+        for _ in range(LoginRiskTracker.MAX_FAILED_ATTEMPTS):
+            LoginRiskTracker.record_failure(self.user, "10.0.0.1")
+        self.assertTrue(LoginRiskTracker.is_locked_out(LoginRiskTracker.get_state(self.user.id)))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            LogBlockedUser.objects.create(user=self.user, is_login_attempt=True, is_active=False)
+        self.assertFalse(LoginRiskTracker.is_locked_out(LoginRiskTracker.get_state(self.user.id)))
+
+
+class UserSnapshotTests(TestCase):
+
+    def setUp(self):
+        reset_caches()
+        self.user = User.objects.create(email="snap@example.com", username="snap")
+        self.user.set_password("clave-segura-123")
+        self.user.save()
+
+    def test_snapshot_without_password(self):
+        UserSnapshotService.store(self.user, UserSnapshotService.version(self.user.pk))
+        self.assertNotIn(self.user.password, str(cache.get(UserSnapshotService._cache_key(self.user.pk))))
+
+        cached = UserSnapshotService.load(self.user.pk)
+        self.assertEqual(cached.get_session_auth_hash(), self.user.get_session_auth_hash())
+        # La contraseña se carga de la BD solo si se usa; save() no la pisa
+        cached.first_name = "Snap"
+        cached.save()
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password("clave-segura-123"))
+
+    def test_snapshot_read_before_commit_is_discarded(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.first_name = "Nuevo"
+            self.user.save()
+            # Otra petición lee la fila vieja antes del commit y la guarda
+            stale = User.objects.get(pk=self.user.pk)
+            stale.first_name = "Viejo"
+            UserSnapshotService.store(stale, UserSnapshotService.version(self.user.pk))
+        self.assertIsNone(UserSnapshotService.load(self.user.pk))
+
+    def test_stale_store_after_invalidate(self):
+        version = UserSnapshotService.version(self.user.pk)
+        UserSnapshotService.invalidate(self.user.pk)
+        UserSnapshotService.store(self.user, version)
+        self.assertIsNone(UserSnapshotService.load(self.user.pk))
+
+
+class LoginGateTests(TestCase):
+
+    def setUp(self):
+        reset_caches()
+        self.gate = login_gate(lambda request: HttpResponse("ok"))
+
+    def test_body_limits(self):
+        request = RequestFactory().post("/login/", data="{}", content_type="application/json")
+        self.assertEqual(self.gate(request).status_code, 200)
+
+        # Chunked: sin Content-Length no se puede aplicar el límite
+        request = RequestFactory().post("/login/", data="{}", content_type="application/json")
+        del request.META["CONTENT_LENGTH"]
+        request.META["HTTP_TRANSFER_ENCODING"] = "chunked"
+        self.assertEqual(self.gate(request).status_code, 411)
+
+        request = RequestFactory().post(
+            "/login/", data="x" * (settings.LOGIN_GATE_MAX_BODY + 1), content_type="text/plain"
+        )
+        self.assertEqual(self.gate(request).status_code, 413)
+
+
+class DecryptedDataTests(TestCase):
+
+    def post(self, plaintext):
+        public_key = get_keyring().current_key().public_key()
+        payload = base64.b64encode(public_key.encrypt(plaintext.encode(), OAEP_PADDING)).decode()
+        body = json.dumps({"payload": payload, "kid": get_keyring().current_kid, "next": "/"})
+        return RequestFactory().post("/login/", data=body, content_type="application/json")
+
+    def test_payload_encodings(self):
+        data = create_decrypted_data(self.post(json.dumps({"email": "a@example.com"})))
+        self.assertEqual(data, {"email": "a@example.com", "next": "/"})
+
+        # Clientes con el bundle anterior codifican el JSON dos veces
+        legacy = create_decrypted_data(self.post(json.dumps(json.dumps({"email": "a@example.com"}))))
+        self.assertEqual(legacy, {"email": "a@example.com", "next": "/"})
+
+    def test_shared_public_key_matches_current_kid(self):
+        # El frontend cifra con la clave que comparte el servidor, no con la del bundle
+        info = get_keyring().public_key_info()
+        self.assertEqual(info["kid"], get_keyring().current_kid)
+        public_key = serialization.load_der_public_key(base64.b64decode(info["spki"]))
+        payload = base64.b64encode(public_key.encrypt(b'{"email": "b@example.com"}', OAEP_PADDING)).decode()
+        body = json.dumps({"payload": payload, "kid": info["kid"], "next": "/"})
+        request = RequestFactory().post("/login/", data=body, content_type="application/json")
+        self.assertEqual(create_decrypted_data(request)["email"], "b@example.com")
+
+
+class TrustedDeviceTests(TestCase):
+
+    def setUp(self):
+        reset_caches()
+        self.user = User.objects.create(email="confianza@example.com", username="confianza")
+
+    def request(self, token=None):
+        request = RequestFactory().post("/verify-2fa/", HTTP_USER_AGENT="Navegador/1.0")
+        SessionMiddleware(lambda request: None).process_request(request)
+        if token:
+            request.COOKIES[settings.TRUSTED_DEVICE_COOKIE_NAME] = token
+        return request
+
+    def login_2fa(self, remember_device):
+        request = self.request()
+        request.session.update({
+            "pending_2fa_user_email": self.user.email,
+            "pending_2fa_ip": "10.0.0.1",
+        })
+        OtpService.issue("2fa", self.user.email, "ABC123", timeout=60)
+        success, _ = complete_2fa_login(request, "ABC123", remember_device=remember_device)
+        self.assertTrue(success)
+        return getattr(request, "trusted_device_token", None)
+
+    def test_device_is_trusted_only_when_requested(self):
+        self.assertIsNone(self.login_2fa(remember_device=False))
+        token = self.login_2fa(remember_device=True)
+        self.assertTrue(TrustedDeviceService.is_trusted(self.request(token), self.user))
+
+    def test_devices_do_not_overwrite_each_other(self):
+        tokens = [TrustedDeviceService.issue(self.request(), self.user) for _ in range(2)]
+        for token in tokens:
+            self.assertTrue(TrustedDeviceService.is_trusted(self.request(token), self.user))
+
+        TrustedDeviceService.revoke_all(self.user.id)
+        for token in tokens:
+            self.assertFalse(TrustedDeviceService.is_trusted(self.request(token), self.user))
@@ -38,6 +38,11 @@ urlpatterns = [
         users_admin_views.users_admin_show_view,
         name="users_admin_show",
     ),
+    path(
+        "administrador/usuarios/autocomplete/",
+        users_admin_views.users_admin_autocomplete_view,
+        name="users_admin_autocomplete",
+    ),
     path(
         "administrador/usuarios/update/",
         users_admin_views.users_admin_update_view,
@@ -73,6 +78,11 @@ urlpatterns = [
         roles_admin_views.roles_admin_destroy_view,
         name="roles_admin_destroy",
     ),
+    path(
+        "administrador/roles/permissions/update/",
+        roles_admin_views.roles_admin_update_permissions_view,
+        name="roles_admin_update_permissions",
+    ),
     # rutas de gestion clientes sellers
     path(
         "vendedor/clientes/",
@@ -89,6 +99,11 @@ urlpatterns = [
         customers_seller_views.customers_seller_show_view,
         name="customers_seller_show",
     ),
+    path(
+        "vendedor/clientes/autocomplete/",
+        customers_seller_views.customers_seller_autocomplete_view,
+        name="customers_seller_autocomplete",
+    ),
     path(
         "vendedor/clientes/update/",
         customers_seller_views.customers_seller_update_view,
@@ -13,6 +13,7 @@ from users_app.services.auth_service import (
     resend_registration_code_service,
     resend_2fa_code_service
 )
+from users_app.services.trusted_device_service import TrustedDeviceService
 from inertia import InertiaResponse
 
 logger = logging.getLogger(__name__)
@@ -74,10 +75,15 @@ def verify_2fa_view(request):
             return redirect('login_2fa')
         
         # Verificar código usando el servicio
-        success, message = complete_2fa_login(request, code)
+        remember_device = data.get("remember_device") in (True, "true", "on", "1")
+        success, message = complete_2fa_login(request, code, remember_device=remember_device)
         if success:
             request.session["success"] = "¡Acceso verificado exitosamente! Bienvenido."
-            return redirect('dashboard')
+            response = redirect('dashboard')
+            token = getattr(request, "trusted_device_token", None)
+            if token:
+                TrustedDeviceService.set_cookie(response, token)
+            return response
         else:
             request.session["errors"] = {"code": [message]} if "Incorrecto" in message or "Código" in message else {"__all__": message}
             return redirect('login_2fa')
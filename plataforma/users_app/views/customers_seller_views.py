@@ -1,5 +1,6 @@
 from django.core.exceptions import ValidationError
-from django.views.decorators.http import require_POST
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET, require_POST
 from django.contrib.auth.decorators import login_required
 from users_app.services.customers_seller_service import CustomerSellerService
 from config.utils import create_decrypted_data
@@ -35,6 +36,16 @@ def customers_seller_show_view(request, user_id):
     return redirect(request.META.get("HTTP_REFERER", "customers_seller_index"))
 
 
+@login_required(login_url="/")
+@require_GET
+def customers_seller_autocomplete_view(request):
+    try:
+        results = CustomerSellerService.autocomplete(request.GET.get("q", ""))
+    except ValidationError:
+        results = []
+    return JsonResponse({"results": results})
+
+
 @login_required(login_url="/")
 @require_POST
 def customers_seller_store_view(request):
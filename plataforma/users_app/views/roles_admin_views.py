@@ -61,3 +61,14 @@ def roles_admin_destroy_view(request):
     except ValidationError as e:
         request.session["errors"] = e.message_dict
     return redirect(request.META.get("HTTP_REFERER", "roles_admin_index"))
+
+
+@login_required(login_url='/')
+@require_POST
+def roles_admin_update_permissions_view(request):
+    data = create_decrypted_data(request)
+    try:
+        RolesService.update_role_permissions(data.get("id"), data)
+    except ValidationError as e:
+        request.session["errors"] = e.message_dict
+    return redirect(request.META.get("HTTP_REFERER", "roles_admin_index"))
@@ -1,5 +1,6 @@
 from django.core.exceptions import ValidationError
-from django.views.decorators.http import require_POST
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET, require_POST
 from users_app.services.users_admin_service import UsersAdminService
 from django.contrib.auth.decorators import login_required
 from config.utils import create_decrypted_data
@@ -38,6 +39,13 @@ def users_admin_show_view(request, user_id):
     return redirect(request.META.get("HTTP_REFERER", "users_admin_index"))
 
 
+@login_required(login_url="/")
+@require_GET
+def users_admin_autocomplete_view(request):
+    results = UsersAdminService.autocomplete(request.GET.get("q", ""))
+    return JsonResponse({"results": results})
+
+
 @login_required(login_url="/")
 @require_POST
 def users_admin_store_view(request):